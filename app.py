@@ -7,32 +7,39 @@
 - Supabase (DB_TYPE=supabase)
 """
 
+import re
 import sqlite3
 import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, date, timedelta
 from pathlib import Path
-from collections import defaultdict
+from collections import Counter, defaultdict
 
 import pandas as pd
 import numpy as np
 import streamlit as st
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 
 # 加入分析模組
 import sys
-sys.path.insert(0, str(Path(__file__).parent))
+_HERE = Path(__file__).resolve().parent  # 專案根目錄（只解析一次）
+sys.path.insert(0, str(_HERE))
 from src.finance.analyzer import TechnicalAnalyzer
 from src.finance.portfolio_strategy import PortfolioStrategy
 from src.finance.macro_database import MacroDatabase
 from src.finance.cycle_analyzer import MarketCycleAnalyzer
 from src.finance.cycle_strategy import CycleBasedStrategySelector
 from src.finance.cycle_backtest import CycleBacktester
-from src.finance.sentiment_backtest import SentimentBacktester, DailyHotStocksAnalyzer
+from src.finance.sentiment_backtest import SentimentBacktester, DailyHotStocksAnalyzer, SENTIMENT_THRESHOLD
+from src.utils.keyword_matcher import KeywordMatcher
 
 # ==================== 資料層初始化 ====================
 # 使用統一的資料抽象層，透過 DB_TYPE 環境變數選擇後端
 from src.data import get_client, get_client_info
+from src.data.sqlite_client import READ_PRAGMAS
 
 # 延遲初始化資料客戶端
 DATA_CLIENT = None
@@ -140,6 +147,10 @@ UNRELIABLE_SOURCES = [
 ]
 
 
+# PTT 發文時間格式 "YYYY-MM-DD HH:MM:SS"，擷取 HH:MM
+PTT_TIME_RE = re.compile(r"\d{4}-\d{2}-\d{2} (\d{2}:\d{2}):\d{2}$")
+
+
 def extract_ptt_push_count(content: str) -> int:
     """從 PTT 內容字串提取推文數
 
@@ -230,9 +241,8 @@ st.set_page_config(
 )
 
 # 資料庫路徑 (優先使用完整資料庫，若不存在則使用示範資料庫)
-_base_path = Path(__file__).parent
-DB_PATH = _base_path / "news.db" if (_base_path / "news.db").exists() else _base_path / "demo_news.db"
-FINANCE_DB_PATH = _base_path / "finance.db" if (_base_path / "finance.db").exists() else _base_path / "demo_finance.db"
+DB_PATH = _HERE / "news.db" if (_HERE / "news.db").exists() else _HERE / "demo_news.db"
+FINANCE_DB_PATH = _HERE / "finance.db" if (_HERE / "finance.db").exists() else _HERE / "demo_finance.db"
 DEMO_MODE = not USE_SUPABASE and "demo" in str(DB_PATH)
 
 # 新聞分類關鍵字
@@ -404,6 +414,25 @@ TECH_SUPPLY_CHAIN_KEYWORDS = {
     ],
 }
 
+
+def _build_category_index(groups: dict) -> dict:
+    """建立反向索引：關鍵字 -> ((分類群組, 類別), ...)（同一關鍵字可能屬於多個類別）"""
+    index = {}
+    for group, categories in groups.items():
+        for category, keywords in categories.items():
+            for kw in keywords:
+                index.setdefault(kw, []).append((group, category))
+    return {kw: tuple(pairs) for kw, pairs in index.items()}
+
+
+KW2CAT = _build_category_index({
+    "macro": MACRO_KEYWORDS,
+    "industry": INDUSTRY_KEYWORDS,
+    "tech_supply_chain": TECH_SUPPLY_CHAIN_KEYWORDS,
+})
+# 三組分類關鍵字合併為單一比對器，每則新聞只需掃描一次
+CATEGORY_MATCHER = KeywordMatcher(KW2CAT)
+
 # 情緒分析關鍵字
 POSITIVE_KEYWORDS = [
     "surge", "soar", "jump", "gain", "rise", "rally", "record high", "beat", "exceed",
@@ -424,262 +453,337 @@ NEGATIVE_KEYWORDS = [
     "rate hike", "hike rate", "hikes rate", "升息", "緊縮", "hawkish", "tightening"
 ]
 
+# 正負面關鍵字合併為單一比對器，每則新聞只需掃描一次
+SENTIMENT_MATCHER = KeywordMatcher({
+    **dict.fromkeys(POSITIVE_KEYWORDS, "pos"),
+    **dict.fromkeys(NEGATIVE_KEYWORDS, "neg"),
+})
+
+
+def get_news_texts(news_items: list) -> list:
+    """合併每則新聞的 title + content 並轉小寫（同一批新聞只需計算一次）"""
+    return [(n["title"] + " " + (n["content"] or "")).lower() for n in news_items]
+
+
+def search_titles(news_items: list, search_term: str) -> list:
+    """標題包含搜尋字串的新聞（不分大小寫，搜尋字串只轉換一次）"""
+    term = search_term.lower()
+    return [n for n in news_items if term in n["title"].lower()]
+
+
+def build_news_frame(news_items: list) -> pd.DataFrame:
+    """
+    新聞列表轉為 DataFrame（每欄一個陣列），並預先建立 text_lower 欄位
+    (title + content 轉小寫)，供 str.contains 等向量化比對使用
+    """
+    df = pd.DataFrame(news_items)
+    for col in ("title", "content", "published_at", "collected_at"):
+        if col not in df.columns:
+            df[col] = None
+    df["text_lower"] = (df["title"].fillna("").astype(str) + " "
+                        + df["content"].fillna("").astype(str)).str.lower()
+    return df
+
+
+def count_sentiment_keywords(texts: list) -> tuple:
+    """
+    批次計算每則新聞的正/負面關鍵字數（每個關鍵字每則最多計一次）
+    Returns: (positive, negative) 兩個與 texts 等長的 int32 陣列
+    """
+    polarities = [SENTIMENT_MATCHER.find(text).values() for text in texts]
+    positive = np.fromiter((sum(p == "pos" for p in hits) for hits in polarities),
+                           dtype=np.int32, count=len(texts))
+    negative = np.fromiter((len(hits) for hits in polarities),
+                           dtype=np.int32, count=len(texts)) - positive
+    return positive, negative
+
+
+# 情緒燈號（門檻 SENTIMENT_THRESHOLD 與回測模組共用：超過為正面、低於負值為負面，其餘中性）
+SENTIMENT_LIGHTS = np.array(["🔴", "🟡", "🟢"])
+
+# 個股新聞列表的情緒標記只掃描內容前段（列表本身只顯示前 300 字）
+SENTIMENT_SCAN_CHARS = 2000
 
-def analyze_sentiment(news_items: list) -> tuple:
+
+def sentiment_level(scores):
+    """
+    情緒分數轉為等級 0=負面 / 1=中性 / 2=正面（無分支，可傳入單一分數或陣列）
+    可直接作為 SENTIMENT_LIGHTS 等三元素對照陣列的索引
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    return 1 + (scores > SENTIMENT_THRESHOLD).astype(np.int8) - (scores < -SENTIMENT_THRESHOLD).astype(np.int8)
+
+
+def analyze_sentiment(news_items: list, texts: list = None) -> tuple:
     """
     分析新聞情緒，回傳 (燈號, 分數)
     🟢 正面 | 🟡 中性 | 🔴 負面
+
+    texts: 預先計算的 get_news_texts(news_items)，省略時自動計算
     """
     if not news_items:
         return "🟡", 0
 
-    positive_count = 0
-    negative_count = 0
+    if texts is None:
+        texts = get_news_texts(news_items)
 
-    for news in news_items:
-        text = (news["title"] + " " + (news["content"] or "")).lower()
-
-        for kw in POSITIVE_KEYWORDS:
-            if kw in text:
-                positive_count += 1
-
-        for kw in NEGATIVE_KEYWORDS:
-            if kw in text:
-                negative_count += 1
+    positive, negative = count_sentiment_keywords(texts)
+    positive_count = int(positive.sum())
+    negative_count = int(negative.sum())
 
     total = positive_count + negative_count
     if total == 0:
         return "🟡", 0
 
     score = (positive_count - negative_count) / total
+    return str(SENTIMENT_LIGHTS[sentiment_level(score)]), score
+
+
+# 漲跌幅格式: up 5%, down 3%, +5%, -3%, 漲5%, 跌3%
+PRICE_MOVEMENT_PATTERNS = [
+    r'(up|rise|gain|jump|surge|soar|climb)\s*(\d+(?:\.\d+)?)\s*%',
+    r'(down|fall|drop|decline|plunge|tumble|sink)\s*(\d+(?:\.\d+)?)\s*%',
+    r'[+＋](\d+(?:\.\d+)?)\s*%',
+    r'[-－](\d+(?:\.\d+)?)\s*%',
+    r'漲\s*(\d+(?:\.\d+)?)\s*%',
+    r'跌\s*(\d+(?:\.\d+)?)\s*%',
+    r'(\d+(?:\.\d+)?)\s*%\s*(higher|lower|up|down)',
+]
 
-    if score > 0.2:
-        return "🟢", score
-    elif score < -0.2:
-        return "🔴", score
-    else:
-        return "🟡", score
+
+def _compile_alternation(patterns: list) -> tuple:
+    """
+    將多個 regex 合併為單一 alternation，每個格式外包一層群組
+    Returns: (compiled regex, {外層群組 index: 內層群組 index tuple})
+    """
+    groups = {}
+    index = 1
+    for pattern in patterns:
+        inner_count = re.compile(pattern).groups
+        groups[index] = tuple(range(index + 1, index + 1 + inner_count))
+        index += 1 + inner_count
+    return re.compile("|".join(f"({p})" for p in patterns)), groups
+
+
+# 以 match.lastindex (外層群組) 判斷命中哪個格式
+PRICE_MOVEMENT_RE, _PRICE_MOVEMENT_GROUPS = _compile_alternation(PRICE_MOVEMENT_PATTERNS)
 
 
 def extract_price_movements(text: str) -> list:
-    """從文字中提取股價漲跌幅"""
-    import re
+    """從文字中提取股價漲跌幅（單次掃描，依出現順序最多回傳 3 個）"""
     movements = []
-    # 匹配各種漲跌幅格式: up 5%, down 3%, +5%, -3%, 漲5%, 跌3%
-    patterns = [
-        r'(up|rise|gain|jump|surge|soar|climb)\s*(\d+(?:\.\d+)?)\s*%',
-        r'(down|fall|drop|decline|plunge|tumble|sink)\s*(\d+(?:\.\d+)?)\s*%',
-        r'[+＋](\d+(?:\.\d+)?)\s*%',
-        r'[-－](\d+(?:\.\d+)?)\s*%',
-        r'漲\s*(\d+(?:\.\d+)?)\s*%',
-        r'跌\s*(\d+(?:\.\d+)?)\s*%',
-        r'(\d+(?:\.\d+)?)\s*%\s*(higher|lower|up|down)',
-    ]
-    for pattern in patterns:
-        matches = re.findall(pattern, text.lower())
-        movements.extend(matches)
-    return movements[:3]  # 最多返回3個
+    for match in PRICE_MOVEMENT_RE.finditer(text.lower()):
+        groups = match.group(*_PRICE_MOVEMENT_GROUPS[match.lastindex])
+        movements.append(groups)
+        if len(movements) >= 3:
+            break
+    return movements
+
+
+# 各產業類別對應的公司（只顯示該產業相關公司；模組載入時建立一次，內容為不可變 tuple）
+CATEGORY_COMPANIES = {
+    # 產業板塊
+    "半導體": (
+        ("nvidia", "NVIDIA"), ("nvda", "NVIDIA"), ("輝達", "NVIDIA"),
+        ("台積電", "台積電"), ("tsmc", "台積電"),
+        ("聯發科", "聯發科"), ("mediatek", "聯發科"),
+        ("amd", "AMD"), ("intel", "Intel"), ("qualcomm", "高通"),
+        ("broadcom", "Broadcom"), ("博通", "Broadcom"),
+        ("asml", "ASML"), ("艾司摩爾", "ASML"),
+        ("micron", "Micron"), ("美光", "Micron"),
+        ("sk hynix", "SK海力士"), ("海力士", "SK海力士"),
+        ("samsung", "三星"), ("三星", "三星"),
+    ),
+    "軟體/雲端": (
+        ("microsoft", "Microsoft"), ("msft", "Microsoft"), ("微軟", "Microsoft"),
+        ("salesforce", "Salesforce"), ("snowflake", "Snowflake"),
+        ("servicenow", "ServiceNow"), ("crowdstrike", "CrowdStrike"),
+        ("datadog", "Datadog"), ("mongodb", "MongoDB"),
+        ("adobe", "Adobe"), ("oracle", "Oracle"),
+    ),
+    "網路/社群": (
+        ("meta", "Meta"), ("facebook", "Meta"),
+        ("alphabet", "Google"), ("googl", "Google"), ("google", "Google"),
+        ("netflix", "Netflix"), ("spotify", "Spotify"),
+        ("snap", "Snap"), ("pinterest", "Pinterest"),
+    ),
+    "硬體/消費電子": (
+        ("apple", "Apple"), ("aapl", "Apple"), ("蘋果", "Apple"),
+        ("samsung", "三星"), ("三星", "三星"),
+        ("sony", "Sony"), ("lg", "LG"),
+        ("鴻海", "鴻海"), ("foxconn", "鴻海"),
+        ("和碩", "和碩"), ("pegatron", "和碩"),
+    ),
+    "AI人工智慧": (
+        ("nvidia", "NVIDIA"), ("nvda", "NVIDIA"), ("輝達", "NVIDIA"),
+        ("openai", "OpenAI"), ("chatgpt", "OpenAI"), ("anthropic", "Anthropic"),
+        ("microsoft", "Microsoft"), ("google", "Google"), ("meta", "Meta"),
+        ("palantir", "Palantir"), ("pltr", "Palantir"),
+    ),
+    "金融": (
+        ("jpmorgan", "JPMorgan"), ("jp morgan", "JPMorgan"),
+        ("goldman sachs", "Goldman"), ("goldman", "Goldman"),
+        ("morgan stanley", "Morgan Stanley"),
+        ("bank of america", "美銀"), ("citigroup", "花旗"),
+        ("berkshire", "Berkshire"), ("visa", "Visa"), ("mastercard", "Mastercard"),
+    ),
+    "醫療保健": (
+        ("unitedhealth", "UnitedHealth"), ("pfizer", "輝瑞"),
+        ("eli lilly", "禮來"), ("novo nordisk", "諾和諾德"),
+        ("johnson & johnson", "J&J"), ("merck", "默克"),
+        ("abbvie", "AbbVie"), ("moderna", "Moderna"),
+    ),
+    "能源": (
+        ("exxon", "Exxon"), ("chevron", "Chevron"),
+        ("conocophillips", "ConocoPhillips"), ("schlumberger", "Schlumberger"),
+        ("台塑化", "台塑化"), ("中油", "中油"),
+    ),
+    "汽車": (
+        ("tesla", "Tesla"), ("tsla", "Tesla"), ("特斯拉", "Tesla"),
+        ("gm", "GM"), ("ford", "Ford"), ("toyota", "豐田"),
+        ("byd", "比亞迪"), ("rivian", "Rivian"), ("lucid", "Lucid"),
+    ),
+    "零售/消費": (
+        ("walmart", "Walmart"), ("amazon", "Amazon"), ("amzn", "Amazon"),
+        ("costco", "Costco"), ("target", "Target"),
+        ("home depot", "Home Depot"), ("starbucks", "Starbucks"),
+    ),
+    "航空/運輸": (
+        ("boeing", "Boeing"), ("airbus", "Airbus"),
+        ("ups", "UPS"), ("fedex", "FedEx"),
+        ("delta", "Delta"), ("united airlines", "United"),
+        ("長榮航", "長榮航"), ("華航", "華航"),
+    ),
+    "通訊服務": (
+        ("verizon", "Verizon"), ("at&t", "AT&T"), ("t-mobile", "T-Mobile"),
+        ("comcast", "Comcast"), ("disney", "Disney"),
+        ("中華電", "中華電"), ("台灣大", "台灣大"), ("遠傳", "遠傳"),
+    ),
+    "工業": (
+        ("caterpillar", "Caterpillar"), ("cat", "Caterpillar"),
+        ("deere", "Deere"), ("john deere", "Deere"),
+        ("honeywell", "Honeywell"), ("general electric", "GE"), ("ge", "GE"),
+        ("siemens", "Siemens"), ("3m", "3M"),
+        ("lockheed", "Lockheed"), ("raytheon", "Raytheon"), ("northrop", "Northrop"),
+        ("union pacific", "Union Pacific"), ("ups", "UPS"),
+    ),
+    "公用事業": (
+        ("nextera", "NextEra"), ("duke energy", "Duke Energy"),
+        ("southern company", "Southern Co"), ("dominion", "Dominion"),
+        ("台電", "台電"),
+    ),
+    "基礎材料": (
+        ("dow", "Dow"), ("basf", "BASF"), ("dupont", "DuPont"), ("linde", "Linde"),
+        ("中鋼", "中鋼"), ("台塑", "台塑"), ("南亞", "南亞"),
+        ("freeport", "Freeport"), ("newmont", "Newmont"),
+        ("台泥", "台泥"), ("亞泥", "亞泥"),
+    ),
+    "鋼鐵/石化/水泥": (
+        ("中鋼", "中鋼"), ("中鴻", "中鴻"), ("豐興", "豐興"),
+        ("台塑", "台塑"), ("南亞", "南亞"), ("台化", "台化"), ("台塑化", "台塑化"),
+        ("台泥", "台泥"), ("亞泥", "亞泥"),
+        ("nucor", "Nucor"), ("us steel", "US Steel"),
+    ),
+    # 科技產業鏈
+    "AI晶片": (
+        ("nvidia", "NVIDIA"), ("nvda", "NVIDIA"), ("輝達", "NVIDIA"),
+        ("amd", "AMD"), ("intel", "Intel"),
+        ("google tpu", "Google TPU"), ("amazon trainium", "AWS"),
+    ),
+    "記憶體": (
+        ("micron", "Micron"), ("美光", "Micron"),
+        ("sk hynix", "SK海力士"), ("海力士", "SK海力士"),
+        ("samsung", "三星"), ("南亞科", "南亞科"),
+    ),
+    "晶圓代工": (
+        ("台積電", "台積電"), ("tsmc", "台積電"),
+        ("globalfoundries", "GlobalFoundries"), ("聯電", "聯電"),
+        ("samsung foundry", "三星"),
+    ),
+    "封測": (
+        ("日月光", "日月光"), ("ase", "日月光"),
+        ("矽品", "矽品"), ("京元電", "京元電"),
+    ),
+    "IC設計": (
+        ("聯發科", "聯發科"), ("mediatek", "聯發科"),
+        ("瑞昱", "瑞昱"), ("聯詠", "聯詠"), ("novatek", "聯詠"),
+        ("高通", "高通"), ("qualcomm", "高通"), ("broadcom", "Broadcom"),
+    ),
+    "伺服器/資料中心": (
+        ("supermicro", "Supermicro"), ("smci", "Supermicro"),
+        ("廣達", "廣達"), ("quanta", "廣達"),
+        ("緯創", "緯創"), ("wistron", "緯創"),
+        ("緯穎", "緯穎"), ("英業達", "英業達"),
+        ("dell", "Dell"), ("hpe", "HPE"),
+    ),
+    "網通設備": (
+        ("cisco", "Cisco"), ("arista", "Arista"),
+        ("juniper", "Juniper"), ("智邦", "智邦"),
+    ),
+    "PCB/散熱": (
+        ("台郡", "台郡"), ("欣興", "欣興"), ("南電", "南電"),
+        ("奇鋐", "奇鋐"), ("雙鴻", "雙鴻"),
+    ),
+    "電源供應": (
+        ("台達電", "台達電"), ("delta", "台達電"),
+        ("光寶", "光寶"), ("群光", "群光"),
+    ),
+    "面板/顯示": (
+        ("友達", "友達"), ("auo", "友達"),
+        ("群創", "群創"), ("innolux", "群創"),
+        ("lg display", "LG Display"),
+    ),
+    "手機供應鏈": (
+        ("鴻海", "鴻海"), ("foxconn", "鴻海"),
+        ("和碩", "和碩"), ("pegatron", "和碩"),
+        ("大立光", "大立光"), ("玉晶光", "玉晶光"),
+    ),
+    "AI應用/平台": (
+        ("openai", "OpenAI"), ("anthropic", "Anthropic"),
+        ("palantir", "Palantir"), ("c3.ai", "C3.ai"),
+    ),
+    "SaaS/雲服務": (
+        ("salesforce", "Salesforce"), ("snowflake", "Snowflake"),
+        ("servicenow", "ServiceNow"), ("workday", "Workday"),
+        ("datadog", "Datadog"), ("mongodb", "MongoDB"),
+    ),
+    "科技巨頭": (
+        ("microsoft", "Microsoft"), ("msft", "Microsoft"), ("微軟", "Microsoft"),
+        ("meta", "Meta"), ("facebook", "Meta"),
+        ("alphabet", "Google"), ("googl", "Google"), ("google", "Google"),
+        ("amazon", "Amazon"), ("amzn", "Amazon"), ("亞馬遜", "Amazon"),
+        ("apple", "Apple"), ("aapl", "Apple"), ("蘋果", "Apple"),
+        ("nvidia", "NVIDIA"), ("nvda", "NVIDIA"), ("輝達", "NVIDIA"),
+        ("tesla", "Tesla"), ("tsla", "Tesla"), ("特斯拉", "Tesla"),
+    ),
+    "AI基礎設施": (
+        ("nvidia", "NVIDIA"), ("nvda", "NVIDIA"),
+        ("supermicro", "Supermicro"), ("smci", "Supermicro"),
+        ("廣達", "廣達"), ("緯創", "緯創"),
+        ("arista", "Arista"), ("vertiv", "Vertiv"),
+    ),
+}
+
+# 每個類別建立一次比對器 (pattern -> 公司名稱)，單次掃描取出所有出現的公司
+COMPANY_MATCHERS = {
+    category: KeywordMatcher(dict(patterns))
+    for category, patterns in CATEGORY_COMPANIES.items()
+}
 
 
 def extract_companies(text: str, category: str) -> list:
     """根據分類提取相關公司名稱"""
 
-    # 各產業類別對應的公司（只顯示該產業相關公司）
-    category_companies = {
-        # 產業板塊
-        "半導體": [
-            ("nvidia", "NVIDIA"), ("nvda", "NVIDIA"), ("輝達", "NVIDIA"),
-            ("台積電", "台積電"), ("tsmc", "台積電"),
-            ("聯發科", "聯發科"), ("mediatek", "聯發科"),
-            ("amd", "AMD"), ("intel", "Intel"), ("qualcomm", "高通"),
-            ("broadcom", "Broadcom"), ("博通", "Broadcom"),
-            ("asml", "ASML"), ("艾司摩爾", "ASML"),
-            ("micron", "Micron"), ("美光", "Micron"),
-            ("sk hynix", "SK海力士"), ("海力士", "SK海力士"),
-            ("samsung", "三星"), ("三星", "三星"),
-        ],
-        "軟體/雲端": [
-            ("microsoft", "Microsoft"), ("msft", "Microsoft"), ("微軟", "Microsoft"),
-            ("salesforce", "Salesforce"), ("snowflake", "Snowflake"),
-            ("servicenow", "ServiceNow"), ("crowdstrike", "CrowdStrike"),
-            ("datadog", "Datadog"), ("mongodb", "MongoDB"),
-            ("adobe", "Adobe"), ("oracle", "Oracle"),
-        ],
-        "網路/社群": [
-            ("meta", "Meta"), ("facebook", "Meta"),
-            ("alphabet", "Google"), ("googl", "Google"), ("google", "Google"),
-            ("netflix", "Netflix"), ("spotify", "Spotify"),
-            ("snap", "Snap"), ("pinterest", "Pinterest"),
-        ],
-        "硬體/消費電子": [
-            ("apple", "Apple"), ("aapl", "Apple"), ("蘋果", "Apple"),
-            ("samsung", "三星"), ("三星", "三星"),
-            ("sony", "Sony"), ("lg", "LG"),
-            ("鴻海", "鴻海"), ("foxconn", "鴻海"),
-            ("和碩", "和碩"), ("pegatron", "和碩"),
-        ],
-        "AI人工智慧": [
-            ("nvidia", "NVIDIA"), ("nvda", "NVIDIA"), ("輝達", "NVIDIA"),
-            ("openai", "OpenAI"), ("chatgpt", "OpenAI"), ("anthropic", "Anthropic"),
-            ("microsoft", "Microsoft"), ("google", "Google"), ("meta", "Meta"),
-            ("palantir", "Palantir"), ("pltr", "Palantir"),
-        ],
-        "金融": [
-            ("jpmorgan", "JPMorgan"), ("jp morgan", "JPMorgan"),
-            ("goldman sachs", "Goldman"), ("goldman", "Goldman"),
-            ("morgan stanley", "Morgan Stanley"),
-            ("bank of america", "美銀"), ("citigroup", "花旗"),
-            ("berkshire", "Berkshire"), ("visa", "Visa"), ("mastercard", "Mastercard"),
-        ],
-        "醫療保健": [
-            ("unitedhealth", "UnitedHealth"), ("pfizer", "輝瑞"),
-            ("eli lilly", "禮來"), ("novo nordisk", "諾和諾德"),
-            ("johnson & johnson", "J&J"), ("merck", "默克"),
-            ("abbvie", "AbbVie"), ("moderna", "Moderna"),
-        ],
-        "能源": [
-            ("exxon", "Exxon"), ("chevron", "Chevron"),
-            ("conocophillips", "ConocoPhillips"), ("schlumberger", "Schlumberger"),
-            ("台塑化", "台塑化"), ("中油", "中油"),
-        ],
-        "汽車": [
-            ("tesla", "Tesla"), ("tsla", "Tesla"), ("特斯拉", "Tesla"),
-            ("gm", "GM"), ("ford", "Ford"), ("toyota", "豐田"),
-            ("byd", "比亞迪"), ("rivian", "Rivian"), ("lucid", "Lucid"),
-        ],
-        "零售/消費": [
-            ("walmart", "Walmart"), ("amazon", "Amazon"), ("amzn", "Amazon"),
-            ("costco", "Costco"), ("target", "Target"),
-            ("home depot", "Home Depot"), ("starbucks", "Starbucks"),
-        ],
-        "航空/運輸": [
-            ("boeing", "Boeing"), ("airbus", "Airbus"),
-            ("ups", "UPS"), ("fedex", "FedEx"),
-            ("delta", "Delta"), ("united airlines", "United"),
-            ("長榮航", "長榮航"), ("華航", "華航"),
-        ],
-        "通訊服務": [
-            ("verizon", "Verizon"), ("at&t", "AT&T"), ("t-mobile", "T-Mobile"),
-            ("comcast", "Comcast"), ("disney", "Disney"),
-            ("中華電", "中華電"), ("台灣大", "台灣大"), ("遠傳", "遠傳"),
-        ],
-        "工業": [
-            ("caterpillar", "Caterpillar"), ("cat", "Caterpillar"),
-            ("deere", "Deere"), ("john deere", "Deere"),
-            ("honeywell", "Honeywell"), ("general electric", "GE"), ("ge", "GE"),
-            ("siemens", "Siemens"), ("3m", "3M"),
-            ("lockheed", "Lockheed"), ("raytheon", "Raytheon"), ("northrop", "Northrop"),
-            ("union pacific", "Union Pacific"), ("ups", "UPS"),
-        ],
-        "公用事業": [
-            ("nextera", "NextEra"), ("duke energy", "Duke Energy"),
-            ("southern company", "Southern Co"), ("dominion", "Dominion"),
-            ("台電", "台電"),
-        ],
-        "基礎材料": [
-            ("dow", "Dow"), ("basf", "BASF"), ("dupont", "DuPont"), ("linde", "Linde"),
-            ("中鋼", "中鋼"), ("台塑", "台塑"), ("南亞", "南亞"),
-            ("freeport", "Freeport"), ("newmont", "Newmont"),
-            ("台泥", "台泥"), ("亞泥", "亞泥"),
-        ],
-        "鋼鐵/石化/水泥": [
-            ("中鋼", "中鋼"), ("中鴻", "中鴻"), ("豐興", "豐興"),
-            ("台塑", "台塑"), ("南亞", "南亞"), ("台化", "台化"), ("台塑化", "台塑化"),
-            ("台泥", "台泥"), ("亞泥", "亞泥"),
-            ("nucor", "Nucor"), ("us steel", "US Steel"),
-        ],
-        # 科技產業鏈
-        "AI晶片": [
-            ("nvidia", "NVIDIA"), ("nvda", "NVIDIA"), ("輝達", "NVIDIA"),
-            ("amd", "AMD"), ("intel", "Intel"),
-            ("google tpu", "Google TPU"), ("amazon trainium", "AWS"),
-        ],
-        "記憶體": [
-            ("micron", "Micron"), ("美光", "Micron"),
-            ("sk hynix", "SK海力士"), ("海力士", "SK海力士"),
-            ("samsung", "三星"), ("南亞科", "南亞科"),
-        ],
-        "晶圓代工": [
-            ("台積電", "台積電"), ("tsmc", "台積電"),
-            ("globalfoundries", "GlobalFoundries"), ("聯電", "聯電"),
-            ("samsung foundry", "三星"),
-        ],
-        "封測": [
-            ("日月光", "日月光"), ("ase", "日月光"),
-            ("矽品", "矽品"), ("京元電", "京元電"),
-        ],
-        "IC設計": [
-            ("聯發科", "聯發科"), ("mediatek", "聯發科"),
-            ("瑞昱", "瑞昱"), ("聯詠", "聯詠"), ("novatek", "聯詠"),
-            ("高通", "高通"), ("qualcomm", "高通"), ("broadcom", "Broadcom"),
-        ],
-        "伺服器/資料中心": [
-            ("supermicro", "Supermicro"), ("smci", "Supermicro"),
-            ("廣達", "廣達"), ("quanta", "廣達"),
-            ("緯創", "緯創"), ("wistron", "緯創"),
-            ("緯穎", "緯穎"), ("英業達", "英業達"),
-            ("dell", "Dell"), ("hpe", "HPE"),
-        ],
-        "網通設備": [
-            ("cisco", "Cisco"), ("arista", "Arista"),
-            ("juniper", "Juniper"), ("智邦", "智邦"),
-        ],
-        "PCB/散熱": [
-            ("台郡", "台郡"), ("欣興", "欣興"), ("南電", "南電"),
-            ("奇鋐", "奇鋐"), ("雙鴻", "雙鴻"),
-        ],
-        "電源供應": [
-            ("台達電", "台達電"), ("delta", "台達電"),
-            ("光寶", "光寶"), ("群光", "群光"),
-        ],
-        "面板/顯示": [
-            ("友達", "友達"), ("auo", "友達"),
-            ("群創", "群創"), ("innolux", "群創"),
-            ("lg display", "LG Display"),
-        ],
-        "手機供應鏈": [
-            ("鴻海", "鴻海"), ("foxconn", "鴻海"),
-            ("和碩", "和碩"), ("pegatron", "和碩"),
-            ("大立光", "大立光"), ("玉晶光", "玉晶光"),
-        ],
-        "AI應用/平台": [
-            ("openai", "OpenAI"), ("anthropic", "Anthropic"),
-            ("palantir", "Palantir"), ("c3.ai", "C3.ai"),
-        ],
-        "SaaS/雲服務": [
-            ("salesforce", "Salesforce"), ("snowflake", "Snowflake"),
-            ("servicenow", "ServiceNow"), ("workday", "Workday"),
-            ("datadog", "Datadog"), ("mongodb", "MongoDB"),
-        ],
-        "科技巨頭": [
-            ("microsoft", "Microsoft"), ("msft", "Microsoft"), ("微軟", "Microsoft"),
-            ("meta", "Meta"), ("facebook", "Meta"),
-            ("alphabet", "Google"), ("googl", "Google"), ("google", "Google"),
-            ("amazon", "Amazon"), ("amzn", "Amazon"), ("亞馬遜", "Amazon"),
-            ("apple", "Apple"), ("aapl", "Apple"), ("蘋果", "Apple"),
-            ("nvidia", "NVIDIA"), ("nvda", "NVIDIA"), ("輝達", "NVIDIA"),
-            ("tesla", "Tesla"), ("tsla", "Tesla"), ("特斯拉", "Tesla"),
-        ],
-        "AI基礎設施": [
-            ("nvidia", "NVIDIA"), ("nvda", "NVIDIA"),
-            ("supermicro", "Supermicro"), ("smci", "Supermicro"),
-            ("廣達", "廣達"), ("緯創", "緯創"),
-            ("arista", "Arista"), ("vertiv", "Vertiv"),
-        ],
-    }
-
-    # 取得該類別的公司列表，如果沒有則使用通用列表
-    company_patterns = category_companies.get(category, [])
-
-    # 如果類別沒有特定公司列表，不提取公司名稱
-    if not company_patterns:
+    # 取得該類別的比對器，類別沒有特定公司列表時不提取公司名稱
+    matcher = COMPANY_MATCHERS.get(category)
+    if matcher is None:
         return []
 
-    text_lower = text.lower()
     companies_found = []
     seen = set()
-    for pattern, company in company_patterns:
-        if pattern in text_lower and company not in seen:
+    # find() 依公司列表順序回傳，維持原本的優先順序
+    for company in matcher.find(text.lower()).values():
+        if company not in seen:
             companies_found.append(company)
             seen.add(company)
             if len(companies_found) >= 3:
@@ -688,46 +792,190 @@ def extract_companies(text: str, category: str) -> list:
     return companies_found
 
 
-def extract_key_event(news_items: list) -> str:
-    """從新聞中提取關鍵事件"""
-    # 事件關鍵字（按優先順序排列）
-    event_keywords = [
-        # 重大事件優先
-        ("layoff", "裁員"), ("cut job", "裁員"), ("job cut", "裁員"),
-        ("plunge", "暴跌"), ("crash", "崩盤"), ("surge", "大漲"), ("soar", "飆漲"),
-        ("record high", "創新高"), ("all-time high", "歷史新高"),
-        # 財報相關
-        ("earnings", "財報"), ("quarterly", "季報"), ("revenue", "營收"),
-        ("profit", "獲利"), ("guidance", "財測"),
-        ("beat", "優於預期"), ("miss", "不如預期"), ("disappoint", "令人失望"),
-        # 公司動態
-        ("acquire", "收購"), ("merger", "合併"), ("buyout", "併購"),
-        ("ipo", "IPO"), ("split", "分拆"),
-        ("launch", "發布新品"), ("unveil", "發表"), ("announce", "宣布"),
-        ("partnership", "合作"), ("contract", "獲得合約"),
-        # 評級變動
-        ("upgrade", "上調評級"), ("downgrade", "下調評級"),
-        ("price target", "目標價調整"),
-        # AI/科技相關
-        ("ai spending", "AI支出"), ("capex", "資本支出"),
-        ("chip", "晶片"), ("semiconductor", "半導體"),
-        # 政策/監管
-        ("fda approv", "FDA核准"), ("antitrust", "反壟斷"),
-        ("tariff", "關稅"), ("sanction", "制裁"), ("ban", "禁令"),
-        # 經濟相關
-        ("rate cut", "降息"), ("rate hike", "升息"),
-        ("inflation", "通膨"), ("recession", "衰退"),
-    ]
+# 事件關鍵字（按優先順序排列）
+EVENT_KEYWORDS = [
+    # 重大事件優先
+    ("layoff", "裁員"), ("cut job", "裁員"), ("job cut", "裁員"),
+    ("plunge", "暴跌"), ("crash", "崩盤"), ("surge", "大漲"), ("soar", "飆漲"),
+    ("record high", "創新高"), ("all-time high", "歷史新高"),
+    # 財報相關
+    ("earnings", "財報"), ("quarterly", "季報"), ("revenue", "營收"),
+    ("profit", "獲利"), ("guidance", "財測"),
+    ("beat", "優於預期"), ("miss", "不如預期"), ("disappoint", "令人失望"),
+    # 公司動態
+    ("acquire", "收購"), ("merger", "合併"), ("buyout", "併購"),
+    ("ipo", "IPO"), ("split", "分拆"),
+    ("launch", "發布新品"), ("unveil", "發表"), ("announce", "宣布"),
+    ("partnership", "合作"), ("contract", "獲得合約"),
+    # 評級變動
+    ("upgrade", "上調評級"), ("downgrade", "下調評級"),
+    ("price target", "目標價調整"),
+    # AI/科技相關
+    ("ai spending", "AI支出"), ("capex", "資本支出"),
+    ("chip", "晶片"), ("semiconductor", "半導體"),
+    # 政策/監管
+    ("fda approv", "FDA核准"), ("antitrust", "反壟斷"),
+    ("tariff", "關稅"), ("sanction", "制裁"), ("ban", "禁令"),
+    # 經濟相關
+    ("rate cut", "降息"), ("rate hike", "升息"),
+    ("inflation", "通膨"), ("recession", "衰退"),
+]
 
-    for news in news_items[:5]:  # 檢查前5則
-        text = (news["title"] + " " + (news["content"] or "")).lower()
-        for keyword, event in event_keywords:
-            if keyword in text:
-                return event
+# 依優先順序建立的比對器：find() 回傳的第一個關鍵字即優先權最高者
+EVENT_MATCHER = KeywordMatcher(dict(EVENT_KEYWORDS))
+
+
+def extract_key_event(news_items: list, texts: list = None) -> str:
+    """從新聞中提取關鍵事件 (texts: 預先計算的 get_news_texts 結果)"""
+    if texts is None:
+        texts = get_news_texts(news_items[:5])
+
+    for text in texts[:5]:  # 檢查前5則
+        hits = EVENT_MATCHER.find(text)
+        if hits:
+            return next(iter(hits.values()))
     return ""
 
 
-def generate_summary(category: str, news_items: list, sentiment: str) -> str:
+# 總經類別：判斷是否為已確認事件（使用過去式或確認性動詞），區分「已宣布」vs「預期」
+ANNOUNCED_WORDS = ("holds", "held", "keeps", "kept", "announces", "announced",
+                   "decides", "decided", "maintains", "maintained", "unchanged")
+
+# 各類別的一句話總結模板：{類別: [(條件, 模板), ...]}
+# 條件為關鍵字組的 tuple，每一組至少命中一個關鍵字才成立（空 tuple 表示必定成立）
+# 依序取第一條成立的規則；模板為 None 表示改用預設總結
+SUMMARY_RULES = {
+    "Fed/利率": [
+        # 利率維持不變（補充：Powell 繼任者相關新聞）
+        ((("hold", "steady", "unchanged", "pause"), ANNOUNCED_WORDS, ("successor", "replace", "candidate")),
+         "Fed 宣布維持利率不變；市場關注 Powell 繼任者人選"),
+        ((("hold", "steady", "unchanged", "pause"), ANNOUNCED_WORDS), "Fed 宣布維持利率不變，暫停降息步調"),
+        ((("hold", "steady", "unchanged", "pause"),), "市場預期 Fed 將維持利率不變"),
+        # 降息
+        ((("cut",), ANNOUNCED_WORDS), "Fed 宣布降息，寬鬆政策啟動"),
+        ((("cut",), ("cuts",)), "Fed 宣布降息，寬鬆政策啟動"),
+        ((("cut",),), "市場預期 Fed 將降息，風險資產可能受惠"),
+        # 升息
+        ((("hike", "raise"), ANNOUNCED_WORDS), "Fed 宣布升息，緊縮政策延續"),
+        ((("hike", "raise"),), "升息預期升溫，債券殖利率走高"),
+        ((), "Fed 政策動態，持續關注利率走向"),
+    ],
+    "通膨": [
+        ((("ease", "cool", "slow", "fell"),), "通膨數據降溫，有利於寬鬆政策預期"),
+        ((("rise", "surge", "hot", "sticky"),), "通膨壓力仍存，可能延後降息時程"),
+        ((("cpi", "pce"),), "通膨數據公布，關注物價趨勢"),
+        ((), "通膨相關消息，觀察物價走勢"),
+    ],
+    "就業": [
+        ((("strong", "beats", "added"),), "就業數據強勁，勞動市場仍具韌性"),
+        ((("layoff", "layoffs"),), "企業裁員消息頻傳，就業市場面臨壓力"),
+        ((("jobless", "unemployment"), ("rise", "higher")), "失業率上升，就業市場降溫"),
+        ((("jobless", "unemployment"), ("fall", "low")), "失業率維持低檔，經濟基本面穩健"),
+        ((("jobless", "unemployment"),), None),
+        ((), "就業市場消息，留意勞動數據"),
+    ],
+    "美元/匯率": [
+        ((("weak", "fall", "drop", "slip"),), "美元走弱，新興市場與大宗商品受惠"),
+        ((("strong", "rise", "surge"),), "美元走強，出口企業與新興市場承壓"),
+        ((("intervention",),), "匯市干預消息，波動加劇"),
+        ((), "匯率市場波動，關注美元走勢"),
+    ],
+    "黃金/避險": [
+        ((("record", "all-time"),), "黃金創歷史新高，避險需求強勁"),
+        ((("surge", "jump", "rally"),), "黃金大漲，避險情緒升溫"),
+        ((("fall", "drop", "retreat"),), "黃金回落，風險偏好回升"),
+        ((), "貴金屬市場波動，觀察避險情緒"),
+    ],
+    "貿易/關稅": [
+        ((("tariff",), ("impose", "announces", "slaps")), "關稅政策實施，貿易摩擦升級"),
+        ((("tariff",), ("threat", "warns", "considers")), "關稅威脅升溫，市場關注後續發展"),
+        ((("tariff",), ("delay", "pause")), "關稅暫緩，市場鬆一口氣"),
+        ((("tariff",),), None),
+        ((("deal", "agreement"),), "貿易協議進展，市場情緒改善"),
+        ((), "貿易政策動態，留意關稅發展"),
+    ],
+    "政府政策": [
+        ((("shutdown",),), "政府關門風險升高，市場不確定性增加"),
+        ((("stimulus", "spending"),), "財政刺激政策動向，關注經濟影響"),
+        ((("debt ceiling", "debt limit"),), "債務上限議題受關注，市場觀望"),
+        ((), "政府政策動態，關注財政走向"),
+    ],
+    "債券/殖利率": [
+        ((("invert", "inverted"),), "殖利率曲線倒掛，衰退擔憂升溫"),
+        ((("rise", "surge", "climb", "jump"),), "殖利率上升，債券價格承壓"),
+        ((("fall", "drop", "retreat"),), "殖利率下滑，資金流向避險資產"),
+        ((), "債券市場消息，留意殖利率變化"),
+    ],
+    "GDP/經濟成長": [
+        ((("recession", "contract"),), "經濟衰退疑慮升溫，防禦性資產受青睞"),
+        ((("growth", "expand"),), "經濟成長穩健，支撐企業獲利預期"),
+        ((), "經濟數據更新，觀察成長動能"),
+    ],
+    "科技/AI": [
+        ((("spend", "invest"),), "AI 投資熱潮持續，科技股受關注"),
+        ((("layoff", "cut"),), "科技業裁員消息頻傳，成本控管為重點"),
+        ((("earn",),), "科技巨頭財報週，AI 支出成焦點"),
+        ((), "科技產業消息，關注 AI 與雲端發展"),
+    ],
+    "醫療保健": [
+        ((("plunge", "drop", "fall"),), "醫療股重挫，政策風險衝擊估值"),
+        ((("fda", "approv"),), "FDA 審批動態，藥廠股價波動"),
+        ((), "醫療產業消息，關注政策與新藥進展"),
+    ],
+    "汽車": [
+        ((("ev", "electric"), ("slow", "cut", "pullback")), "電動車需求放緩，車廠調整策略"),
+        ((("ev", "electric"),), "電動車產業動態，競爭格局變化"),
+        ((("tariff",),), "汽車業面臨關稅壓力，成本上升"),
+        ((), "汽車產業消息，關注電動車發展"),
+    ],
+    "航空/運輸": [
+        ((("layoff", "cut"),), "物流業調整人力，反映需求變化"),
+        ((("earn",),), "運輸業財報公布，關注營運展望"),
+        ((), "運輸產業消息，留意物流與航運趨勢"),
+    ],
+    "金融/銀行": [
+        ((("earn",),), "銀行財報季，關注淨利差與信貸品質"),
+        ((), "金融產業消息，關注銀行財報與利差"),
+    ],
+    "能源": [
+        ((("oil",), ("rise", "surge")), "油價上漲，能源股受惠"),
+        ((("oil",), ("fall", "drop")), "油價下跌，通膨壓力緩解"),
+        ((), "能源產業消息，關注油價走勢"),
+    ],
+    "零售/消費": [
+        ((("spend",), ("strong", "rise")), "消費支出強勁，零售股表現可期"),
+        ((("weak", "slow"),), "消費動能放緩，零售業承壓"),
+        ((), "零售消費消息，觀察消費者信心"),
+    ],
+    "房地產": [
+        ((("mortgage",), ("rate",)), "房貸利率變動，影響購屋需求"),
+        ((), "房地產消息，關注房貸利率影響"),
+    ],
+    "加密貨幣": [
+        ((("surge", "rally", "rise"),), "加密貨幣上漲，市場風險偏好回升"),
+        ((("fall", "drop"),), "加密貨幣回落，投資人轉趨保守"),
+        ((), "加密貨幣市場波動，觀察市場情緒"),
+    ],
+}
+DEFAULT_SUMMARY = "相關消息更新，持續關注後續發展"
+
+# 所有總結規則用到的關鍵字合併為單一比對器
+SUMMARY_MATCHER = KeywordMatcher(
+    kw
+    for rules in SUMMARY_RULES.values()
+    for groups, _ in rules
+    for keywords in groups
+    for kw in keywords
+)
+
+# 產業總結的漲跌方向關鍵字（子字串比對，各編譯成一個 regex 只需掃描一次）
+UP_KEYWORDS = ["up", "rise", "gain", "jump", "surge", "soar", "climb", "higher", "漲"]
+DOWN_KEYWORDS = ["down", "fall", "drop", "decline", "plunge", "tumble", "sink", "lower", "跌"]
+UP_RE = re.compile("|".join(map(re.escape, UP_KEYWORDS)))
+DOWN_RE = re.compile("|".join(map(re.escape, DOWN_KEYWORDS)))
+
+
+def generate_summary(category: str, news_items: list, sentiment: str, texts: list = None) -> str:
     """根據新聞內容生成一句話總結，包含公司名稱、事件和漲跌幅"""
     if not news_items:
         return "今日無相關新聞"
@@ -736,7 +984,9 @@ def generate_summary(category: str, news_items: list, sentiment: str) -> str:
     top_news = news_items[0]["title"]
 
     # 合併所有新聞文字
-    text_all = " ".join([(n["title"] + " " + (n["content"] or "")).lower() for n in news_items])
+    if texts is None:
+        texts = get_news_texts(news_items)
+    text_all = " ".join(texts)
 
     # 總經類別 - 不顯示公司名稱，直接使用模板
     MACRO_CATEGORIES = [
@@ -750,17 +1000,14 @@ def generate_summary(category: str, news_items: list, sentiment: str) -> str:
         companies = extract_companies(text_all, category)
 
         # 提取關鍵事件
-        event = extract_key_event(news_items)
+        event = extract_key_event(news_items, texts)
 
         # 組合總結
         company_str = "、".join(companies[:2]) if companies else ""
 
         # 判斷漲跌方向
-        up_keywords = ["up", "rise", "gain", "jump", "surge", "soar", "climb", "higher", "漲"]
-        down_keywords = ["down", "fall", "drop", "decline", "plunge", "tumble", "sink", "lower", "跌"]
-
-        is_up = any(kw in text_all for kw in up_keywords)
-        is_down = any(kw in text_all for kw in down_keywords)
+        is_up = UP_RE.search(text_all) is not None
+        is_down = DOWN_RE.search(text_all) is not None
 
         # 生成智能總結（僅產業類別）
         if company_str and event:
@@ -780,215 +1027,16 @@ def generate_summary(category: str, news_items: list, sentiment: str) -> str:
         elif event:
             return f"產業{event}消息，影響市場情緒"
 
-    # 總經類別使用專屬模板 - 區分「已宣布」vs「預期」
-
-    # 判斷是否為已確認事件（使用過去式或確認性動詞）
-    announced_words = ["holds", "held", "keeps", "kept", "announces", "announced",
-                       "decides", "decided", "maintains", "maintained", "unchanged"]
-    is_announced = any(w in text_all for w in announced_words)
-
-    # Fed/利率
-    if category == "Fed/利率":
-        # 利率維持不變
-        if any(w in text_all for w in ["hold", "steady", "unchanged", "pause"]):
-            if is_announced:
-                # 補充：Powell 繼任者相關新聞
-                if "successor" in text_all or "replace" in text_all or "candidate" in text_all:
-                    return "Fed 宣布維持利率不變；市場關注 Powell 繼任者人選"
-                return "Fed 宣布維持利率不變，暫停降息步調"
-            else:
-                return "市場預期 Fed 將維持利率不變"
-        # 降息
-        elif "cut" in text_all:
-            if is_announced or "cuts" in text_all:
-                return "Fed 宣布降息，寬鬆政策啟動"
-            else:
-                return "市場預期 Fed 將降息，風險資產可能受惠"
-        # 升息
-        elif "hike" in text_all or "raise" in text_all:
-            if is_announced:
-                return "Fed 宣布升息，緊縮政策延續"
-            else:
-                return "升息預期升溫，債券殖利率走高"
-        else:
-            return "Fed 政策動態，持續關注利率走向"
-
-    # 通膨
-    elif category == "通膨":
-        if "ease" in text_all or "cool" in text_all or "slow" in text_all or "fell" in text_all:
-            return "通膨數據降溫，有利於寬鬆政策預期"
-        elif "rise" in text_all or "surge" in text_all or "hot" in text_all or "sticky" in text_all:
-            return "通膨壓力仍存，可能延後降息時程"
-        elif "cpi" in text_all or "pce" in text_all:
-            return "通膨數據公布，關注物價趨勢"
-        else:
-            return "通膨相關消息，觀察物價走勢"
-
-    # 就業
-    elif category == "就業":
-        if "strong" in text_all or "beats" in text_all or "added" in text_all:
-            return "就業數據強勁，勞動市場仍具韌性"
-        elif "layoff" in text_all or "layoffs" in text_all:
-            return "企業裁員消息頻傳，就業市場面臨壓力"
-        elif "jobless" in text_all or "unemployment" in text_all:
-            if "rise" in text_all or "higher" in text_all:
-                return "失業率上升，就業市場降溫"
-            elif "fall" in text_all or "low" in text_all:
-                return "失業率維持低檔，經濟基本面穩健"
-        else:
-            return "就業市場消息，留意勞動數據"
-
-    # 美元/匯率
-    elif category == "美元/匯率":
-        if "weak" in text_all or "fall" in text_all or "drop" in text_all or "slip" in text_all:
-            return "美元走弱，新興市場與大宗商品受惠"
-        elif "strong" in text_all or "rise" in text_all or "surge" in text_all:
-            return "美元走強，出口企業與新興市場承壓"
-        elif "intervention" in text_all:
-            return "匯市干預消息，波動加劇"
-        else:
-            return "匯率市場波動，關注美元走勢"
-
-    # 黃金/避險
-    elif category == "黃金/避險":
-        if "record" in text_all or "all-time" in text_all:
-            return "黃金創歷史新高，避險需求強勁"
-        elif "surge" in text_all or "jump" in text_all or "rally" in text_all:
-            return "黃金大漲，避險情緒升溫"
-        elif "fall" in text_all or "drop" in text_all or "retreat" in text_all:
-            return "黃金回落，風險偏好回升"
-        else:
-            return "貴金屬市場波動，觀察避險情緒"
-
-    # 貿易/關稅
-    elif category == "貿易/關稅":
-        if "tariff" in text_all:
-            if "impose" in text_all or "announces" in text_all or "slaps" in text_all:
-                return "關稅政策實施，貿易摩擦升級"
-            elif "threat" in text_all or "warns" in text_all or "considers" in text_all:
-                return "關稅威脅升溫，市場關注後續發展"
-            elif "delay" in text_all or "pause" in text_all:
-                return "關稅暫緩，市場鬆一口氣"
-        elif "deal" in text_all or "agreement" in text_all:
-            return "貿易協議進展，市場情緒改善"
-        else:
-            return "貿易政策動態，留意關稅發展"
-
-    # 政府政策
-    elif category == "政府政策":
-        if "shutdown" in text_all:
-            return "政府關門風險升高，市場不確定性增加"
-        elif "stimulus" in text_all or "spending" in text_all:
-            return "財政刺激政策動向，關注經濟影響"
-        elif "debt ceiling" in text_all or "debt limit" in text_all:
-            return "債務上限議題受關注，市場觀望"
-        else:
-            return "政府政策動態，關注財政走向"
-
-    # 債券
-    elif category == "債券/殖利率":
-        if "invert" in text_all or "inverted" in text_all:
-            return "殖利率曲線倒掛，衰退擔憂升溫"
-        elif "rise" in text_all or "surge" in text_all or "climb" in text_all or "jump" in text_all:
-            return "殖利率上升，債券價格承壓"
-        elif "fall" in text_all or "drop" in text_all or "retreat" in text_all:
-            return "殖利率下滑，資金流向避險資產"
-        else:
-            return "債券市場消息，留意殖利率變化"
+    # 類別專屬模板（產業類別無公司/事件時也使用）
+    rules = SUMMARY_RULES.get(category)
+    if rules:
+        # 單次掃描取得所有規則關鍵字的命中集合，各條件改為集合查詢
+        hits = SUMMARY_MATCHER.find(text_all).keys()
+        for groups, template in rules:
+            if all(any(kw in hits for kw in keywords) for keywords in groups):
+                return template or DEFAULT_SUMMARY
 
-    # GDP/經濟成長
-    elif category == "GDP/經濟成長":
-        if "recession" in text_all or "contract" in text_all:
-            return "經濟衰退疑慮升溫，防禦性資產受青睞"
-        elif "growth" in text_all or "expand" in text_all:
-            return "經濟成長穩健，支撐企業獲利預期"
-        else:
-            return "經濟數據更新，觀察成長動能"
-
-    # 科技/AI
-    elif category == "科技/AI":
-        if "spend" in text_all or "invest" in text_all:
-            return "AI 投資熱潮持續，科技股受關注"
-        elif "layoff" in text_all or "cut" in text_all:
-            return "科技業裁員消息頻傳，成本控管為重點"
-        elif "earn" in text_all:
-            return "科技巨頭財報週，AI 支出成焦點"
-        else:
-            return "科技產業消息，關注 AI 與雲端發展"
-
-    # 醫療保健
-    elif category == "醫療保健":
-        if "plunge" in text_all or "drop" in text_all or "fall" in text_all:
-            return "醫療股重挫，政策風險衝擊估值"
-        elif "fda" in text_all or "approv" in text_all:
-            return "FDA 審批動態，藥廠股價波動"
-        else:
-            return "醫療產業消息，關注政策與新藥進展"
-
-    # 汽車
-    elif category == "汽車":
-        if "ev" in text_all or "electric" in text_all:
-            if "slow" in text_all or "cut" in text_all or "pullback" in text_all:
-                return "電動車需求放緩，車廠調整策略"
-            else:
-                return "電動車產業動態，競爭格局變化"
-        elif "tariff" in text_all:
-            return "汽車業面臨關稅壓力，成本上升"
-        else:
-            return "汽車產業消息，關注電動車發展"
-
-    # 航空/運輸
-    elif category == "航空/運輸":
-        if "layoff" in text_all or "cut" in text_all:
-            return "物流業調整人力，反映需求變化"
-        elif "earn" in text_all:
-            return "運輸業財報公布，關注營運展望"
-        else:
-            return "運輸產業消息，留意物流與航運趨勢"
-
-    # 金融/銀行
-    elif category == "金融/銀行":
-        if "earn" in text_all:
-            return "銀行財報季，關注淨利差與信貸品質"
-        else:
-            return "金融產業消息，關注銀行財報與利差"
-
-    # 能源
-    elif category == "能源":
-        if "oil" in text_all and ("rise" in text_all or "surge" in text_all):
-            return "油價上漲，能源股受惠"
-        elif "oil" in text_all and ("fall" in text_all or "drop" in text_all):
-            return "油價下跌，通膨壓力緩解"
-        else:
-            return "能源產業消息，關注油價走勢"
-
-    # 零售/消費
-    elif category == "零售/消費":
-        if "spend" in text_all and ("strong" in text_all or "rise" in text_all):
-            return "消費支出強勁，零售股表現可期"
-        elif "weak" in text_all or "slow" in text_all:
-            return "消費動能放緩，零售業承壓"
-        else:
-            return "零售消費消息，觀察消費者信心"
-
-    # 房地產
-    elif category == "房地產":
-        if "mortgage" in text_all and "rate" in text_all:
-            return "房貸利率變動，影響購屋需求"
-        else:
-            return "房地產消息，關注房貸利率影響"
-
-    # 加密貨幣
-    elif category == "加密貨幣":
-        if "surge" in text_all or "rally" in text_all or "rise" in text_all:
-            return "加密貨幣上漲，市場風險偏好回升"
-        elif "fall" in text_all or "drop" in text_all:
-            return "加密貨幣回落，投資人轉趨保守"
-        else:
-            return "加密貨幣市場波動，觀察市場情緒"
-
-    # 預設
-    return "相關消息更新，持續關注後續發展"
+    return DEFAULT_SUMMARY
 
 
 def extract_specific_details(text: str, news_items: list) -> dict:
@@ -1092,7 +1140,7 @@ def extract_specific_details(text: str, news_items: list) -> dict:
     return details
 
 
-def generate_dual_summary(category: str, news_items: list) -> dict:
+def generate_dual_summary(category: str, news_items: list, texts: list = None) -> dict:
     """
     生成雙欄總結：確認事實 + 市場預期
     Returns: {"facts": str, "expectations": str}
@@ -1101,7 +1149,9 @@ def generate_dual_summary(category: str, news_items: list) -> dict:
         return {"facts": "—", "expectations": "—"}
 
     # 合併所有新聞文字
-    text_all = " ".join([(n["title"] + " " + (n["content"] or "")).lower() for n in news_items])
+    if texts is None:
+        texts = get_news_texts(news_items)
+    text_all = " ".join(texts)
     text_original = " ".join([(n["title"] + " " + (n["content"] or "")) for n in news_items])
     top_news = news_items[0]["title"]
 
@@ -1505,6 +1555,24 @@ def generate_dual_summary(category: str, news_items: list) -> dict:
     return {"facts": facts, "expectations": expectations}
 
 
+def _connect_sqlite(db_path: Path) -> sqlite3.Connection:
+    """建立快取用的 SQLite 連線並套用連線層級設定（建立連線時執行一次）
+
+    示範資料庫受版本控制，以唯讀模式開啟，避免改動檔案或留下 -wal/-shm 檔
+    """
+    if db_path.name.startswith("demo_"):
+        conn = sqlite3.connect(f"{db_path.as_uri()}?mode=ro", uri=True, check_same_thread=False)
+    else:
+        conn = sqlite3.connect(db_path, check_same_thread=False)
+    conn.row_factory = sqlite3.Row  # 以欄位名稱存取，dict(row) 由 C 實作轉換
+    for pragma in READ_PRAGMAS:
+        try:
+            conn.execute(pragma)
+        except sqlite3.OperationalError:
+            pass  # 無法套用的設定沿用預設值
+    return conn
+
+
 @st.cache_resource
 def get_connection():
     """取得新聞資料庫連接 (SQLite fallback)"""
@@ -1512,7 +1580,7 @@ def get_connection():
         return None  # 非 SQLite 不需要連接物件
     if not DB_PATH.exists():
         raise FileNotFoundError(f"新聞資料庫不存在: {DB_PATH}")
-    return sqlite3.connect(DB_PATH, check_same_thread=False)
+    return _connect_sqlite(DB_PATH)
 
 
 @st.cache_resource
@@ -1522,31 +1590,118 @@ def get_finance_connection():
         return None  # 非 SQLite 不需要連接物件
     if not FINANCE_DB_PATH.exists():
         raise FileNotFoundError(f"金融資料庫不存在: {FINANCE_DB_PATH}")
-    return sqlite3.connect(FINANCE_DB_PATH, check_same_thread=False)
+    return _connect_sqlite(FINANCE_DB_PATH)
+
+
+@st.cache_resource
+def get_macro_db() -> MacroDatabase:
+    """取得總經資料庫實例（跨重跑共用）"""
+    return MacroDatabase()
+
+
+@st.cache_resource
+def get_macro_stack() -> tuple:
+    """取得共用同一個總經資料庫的 (資料庫, 週期分析器, 策略選擇器)（跨重跑共用）"""
+    macro_db = get_macro_db()
+    return macro_db, MarketCycleAnalyzer(db=macro_db), CycleBasedStrategySelector(macro_db=macro_db)
+
+
+@st.cache_resource
+def get_portfolio() -> PortfolioStrategy:
+    """取得投資組合策略實例（跨重跑共用）"""
+    return PortfolioStrategy(str(FINANCE_DB_PATH))
+
+
+@st.cache_resource
+def get_analyzer() -> TechnicalAnalyzer:
+    """取得技術分析器實例（跨重跑共用）"""
+    return TechnicalAnalyzer(str(FINANCE_DB_PATH))
+
+
+@st.cache_data(ttl=600, show_spinner=False)  # 快取 10 分鐘
+def _cached_current_analysis(symbol: str) -> dict:
+    """快取個股當前分析（股票數據頁與交易分析頁共用，不隨選擇日期變動）"""
+    return get_analyzer().get_current_analysis(symbol)
+
+
+@st.cache_data(ttl=600, show_spinner=False)  # 快取 10 分鐘
+def _cached_top_picks(n: int) -> tuple:
+    """快取買賣排行榜（需逐檔分析全部追蹤股票）"""
+    return get_analyzer().get_top_picks(n=n)
+
+
+@st.cache_data(ttl=600)  # 快取 10 分鐘
+def _cached_latest_cycle():
+    """快取最新市場週期 (側邊欄燈號)"""
+    return get_macro_db().get_latest_market_cycle()
+
+
+@st.cache_data(ttl=3600, show_spinner=False)  # 快取 1 小時
+def _cached_macro_series(series_id: str, start_date: date, end_date: date) -> pd.DataFrame:
+    """快取單一總經指標區間數據（date 已轉為時間，依日期由新到舊）"""
+    df = pd.DataFrame(get_macro_db().get_macro_data(series_id, start_date=start_date, end_date=end_date),
+                      columns=["date", "value"])
+    df["date"] = pd.to_datetime(df["date"])
+    return df
+
+
+@st.cache_data(ttl=3600, show_spinner=False)  # 快取 1 小時
+def _cached_historical_cycles(start_date: date, end_date: date) -> pd.DataFrame:
+    """快取週期歷史記錄（逐月查詢總經資料，切換分頁或元件時不重算）"""
+    history_df = pd.DataFrame(CycleBacktester(macro_db=get_macro_db()).get_historical_cycles(start_date, end_date))
+    if not history_df.empty:
+        history_df["date"] = pd.to_datetime(history_df["date"])
+    return history_df
+
+
+WATCHLIST_COLUMNS = ["symbol", "name", "market", "sector", "industry"]
+
+
+@st.cache_data(ttl=600, show_spinner=False)  # 快取 10 分鐘
+def _cached_watchlist() -> list:
+    """快取追蹤清單（查詢失敗時拋出例外，不會被快取）"""
+    data = _get_data_client().get_watchlist()
+    if not data:
+        return []
+    df = pd.DataFrame(data).reindex(columns=WATCHLIST_COLUMNS).fillna("")
+    df["description"] = ""
+    return df.to_dict("records")
+
+
+@st.cache_data(ttl=3600, max_entries=256, show_spinner=False)  # 快取 1 小時，最多 256 組查詢
+def _cached_stock_prices(symbol: str, start_date: date = None, end_date: date = None) -> pd.DataFrame:
+    """快取股價查詢（已依日期升序排列，date 欄位為 datetime）"""
+    return _get_data_client().get_daily_prices_df(symbol, start_date=start_date, end_date=end_date)
+
+
+@st.cache_data(ttl=3600, max_entries=256, show_spinner=False)  # 快取 1 小時，最多 256 組查詢
+def _cached_stock_prices_bulk(symbols: tuple, start_date: date = None, end_date: date = None) -> dict:
+    """快取多檔股價查詢 {代碼: DataFrame}"""
+    return _get_data_client().get_daily_prices_bulk_df(list(symbols), start_date=start_date, end_date=end_date)
 
 
 def get_watchlist():
     """取得追蹤清單 - 使用統一資料層"""
     try:
-        client = _get_data_client()
-        data = client.get_watchlist()
-        return [{"symbol": r["symbol"], "name": r.get("name", ""), "market": r.get("market", ""),
-                 "sector": r.get("sector", ""), "industry": r.get("industry", ""), "description": ""} for r in data]
+        return _cached_watchlist()
     except Exception as e:
         st.error(f"取得追蹤清單失敗: {e}")
         return []
 
 
+@st.cache_data(ttl=600, show_spinner=False)  # 快取 10 分鐘
+def _cached_stock_info(symbol: str):
+    """快取單一股票資訊（快取取回時只複製這一筆，不必複製整份追蹤清單）"""
+    for r in _cached_watchlist():
+        if r["symbol"] == symbol:
+            return r
+    return None
+
+
 def get_stock_info(symbol: str):
     """取得單一股票的詳細資訊 - 使用統一資料層"""
     try:
-        client = _get_data_client()
-        watchlist = client.get_watchlist()
-        for r in watchlist:
-            if r.get("symbol") == symbol:
-                return {"symbol": r["symbol"], "name": r.get("name", ""), "market": r.get("market", ""),
-                        "sector": r.get("sector", ""), "industry": r.get("industry", ""), "description": ""}
-        return None
+        return _cached_stock_info(symbol)
     except Exception:
         return None
 
@@ -1554,32 +1709,28 @@ def get_stock_info(symbol: str):
 def get_stock_prices(symbol: str, start_date: date = None, end_date: date = None):
     """取得股票價格數據 - 使用統一資料層"""
     try:
-        client = _get_data_client()
-        data = client.get_daily_prices(symbol, start_date=start_date, end_date=end_date)
-
-        if data:
-            df = pd.DataFrame(data)
-            if "date" in df.columns:
-                df["date"] = pd.to_datetime(df["date"])
-                # 按日期升序排列
-                df = df.sort_values("date").reset_index(drop=True)
-            return df
-        return pd.DataFrame()
+        df = _cached_stock_prices(symbol, start_date, end_date)
+        return df if not df.empty else pd.DataFrame()
     except Exception as e:
         st.error(f"取得價格數據失敗: {e}")
         return pd.DataFrame()
 
 
-def get_stock_fundamentals(symbol: str):
-    """取得股票基本面數據"""
-    # 目前統一資料層尚未支援 fundamentals 查詢
-    # 當使用 PostgreSQL 時暫時返回 None
-    if DB_TYPE != "sqlite":
-        return None
+def get_stock_prices_bulk(symbols: list, start_date: date = None, end_date: date = None) -> dict:
+    """批次取得多檔股票價格 {代碼: DataFrame}，單次查詢取代逐檔呼叫 get_stock_prices"""
+    try:
+        return _cached_stock_prices_bulk(tuple(symbols), start_date, end_date)
+    except Exception as e:
+        st.error(f"取得價格數據失敗: {e}")
+        return {}
+
 
+@st.cache_data(ttl=3600, show_spinner=False)  # 快取 1 小時
+def _cached_stock_fundamentals(symbol: str):
+    """快取最新一筆基本面數據（查詢失敗時拋出例外，不會被快取）"""
     conn = get_finance_connection()
     if not conn:
-        return None
+        raise RuntimeError("無法取得金融資料庫連接")
     cursor = conn.cursor()
     cursor.execute("""
         SELECT * FROM fundamentals
@@ -1589,90 +1740,72 @@ def get_stock_fundamentals(symbol: str):
     """, (symbol,))
 
     row = cursor.fetchone()
-    if row:
-        columns = [desc[0] for desc in cursor.description]
-        return dict(zip(columns, row))
-    return None
+    return dict(row) if row else None
 
 
-def get_news_for_stock(symbol: str, selected_date: date):
-    """取得與股票相關的新聞 - 使用統一資料層"""
-    # 建立搜尋關鍵字
-    symbol_clean = symbol.replace(".TW", "").replace("^", "")
+def get_stock_fundamentals(symbol: str):
+    """取得股票基本面數據"""
+    # 目前統一資料層尚未支援 fundamentals 查詢
+    # 當使用 PostgreSQL 時暫時返回 None
+    if DB_TYPE != "sqlite":
+        return None
+    try:
+        return _cached_stock_fundamentals(symbol)
+    except Exception:
+        return None
 
-    # 股票代碼對應的公司名稱
-    stock_keywords = {
-        "AAPL": ["apple", "iphone", "aapl"],
-        "MSFT": ["microsoft", "msft", "azure", "windows"],
-        "GOOGL": ["google", "alphabet", "googl", "android", "youtube"],
-        "AMZN": ["amazon", "amzn", "aws"],
-        "NVDA": ["nvidia", "nvda", "gpu", "chip"],
-        "META": ["meta", "facebook", "instagram", "whatsapp"],
-        "TSLA": ["tesla", "tsla", "elon musk", "ev"],
-        "JPM": ["jpmorgan", "jp morgan", "jpm", "jamie dimon"],
-        "V": ["visa"],
-        "UNH": ["unitedhealth", "unh"],
-        "2330": ["tsmc", "台積電", "2330"],
-        "2317": ["鴻海", "foxconn", "hon hai", "2317"],
-        "2454": ["聯發科", "mediatek", "2454"],
-        "SPY": ["s&p 500", "s&p500", "spy"],
-        "QQQ": ["nasdaq", "qqq", "nasdaq 100"],
-    }
 
-    keywords = stock_keywords.get(symbol_clean, [symbol_clean.lower()])
+# 股票代碼對應的新聞搜尋關鍵字（小寫，模組載入時建立一次）
+STOCK_NEWS_KEYWORDS = {
+    "AAPL": ("apple", "iphone", "aapl"),
+    "MSFT": ("microsoft", "msft", "azure", "windows"),
+    "GOOGL": ("google", "alphabet", "googl", "android", "youtube"),
+    "AMZN": ("amazon", "amzn", "aws"),
+    "NVDA": ("nvidia", "nvda", "gpu", "chip"),
+    "META": ("meta", "facebook", "instagram", "whatsapp"),
+    "TSLA": ("tesla", "tsla", "elon musk", "ev"),
+    "JPM": ("jpmorgan", "jp morgan", "jpm", "jamie dimon"),
+    "V": ("visa",),
+    "UNH": ("unitedhealth", "unh"),
+    "2330": ("tsmc", "台積電", "2330"),
+    "2317": ("鴻海", "foxconn", "hon hai", "2317"),
+    "2454": ("聯發科", "mediatek", "2454"),
+    "SPY": ("s&p 500", "s&p500", "spy"),
+    "QQQ": ("nasdaq", "qqq", "nasdaq 100"),
+}
 
-    try:
-        # 取得當天新聞，然後在 Python 中過濾關鍵字
-        news_list = get_news_by_date(selected_date)
-        all_news = []
 
-        for news in news_list:
-            title_lower = (news.get("title") or "").lower()
-            content_lower = (news.get("content") or "").lower()
-            text = title_lower + " " + content_lower
+@st.cache_data(ttl=300, show_spinner=False)  # 快取 5 分鐘
+def _cached_stock_news(keywords: tuple, selected_date: date) -> list:
+    """快取個股相關新聞查詢（關鍵字比對在資料層執行）"""
+    return _get_data_client().get_news_matching(
+        list(keywords), start_date=selected_date, end_date=selected_date, limit=500
+    )
 
-            for keyword in keywords:
-                if keyword.lower() in text:
-                    all_news.append(news)
-                    break
 
-        # 去重
-        seen_ids = set()
-        unique_news = []
-        for n in all_news:
-            news_id = n.get("id")
-            if news_id and news_id not in seen_ids:
-                seen_ids.add(news_id)
-                unique_news.append(n)
+def get_news_for_stock(symbol: str, selected_date: date):
+    """取得與股票相關的新聞 - 使用統一資料層"""
+    # 建立搜尋關鍵字
+    symbol_clean = symbol.replace(".TW", "").replace("^", "")
+    keywords = STOCK_NEWS_KEYWORDS.get(symbol_clean, (symbol_clean.lower(),))
 
-        return unique_news
+    try:
+        # 關鍵字過濾與去重交由資料層（SQLite 於資料庫端一次比對）
+        return _cached_stock_news(keywords, selected_date)
     except Exception as e:
         return []
 
 
+@st.cache_data(ttl=600, show_spinner=False)  # 快取 10 分鐘
+def _cached_news_daily_counts(start_date: date, end_date: date, keyword: str = None) -> dict:
+    """快取每日新聞數（由資料層彙總，不取出新聞內容）"""
+    return _get_data_client().get_news_daily_counts(start_date, end_date, keyword=keyword)
+
+
 def get_news_in_date_range(start_date: date, end_date: date, keyword: str = None):
     """取得日期範圍內的新聞統計 - 使用統一資料層"""
     try:
-        client = _get_data_client()
-        news_list = client.get_news(
-            start_date=start_date,
-            end_date=end_date,
-            limit=5000
-        )
-
-        date_counts = {}
-        for r in news_list:
-            # 過濾關鍵字
-            if keyword and keyword.lower() not in (r.get("title") or "").lower():
-                continue
-
-            # 取得日期（優先使用 collected_at，fallback 到 published_at）
-            date_val = r.get("collected_at") or r.get("published_at") or ""
-            if date_val:
-                d = str(date_val)[:10]
-                date_counts[d] = date_counts.get(d, 0) + 1
-
-        return date_counts
+        return _cached_news_daily_counts(start_date, end_date, keyword)
     except Exception as e:
         return {}
 
@@ -1681,19 +1814,10 @@ def get_available_dates():
     """取得有新聞的日期列表 - 使用統一資料層"""
     try:
         client = _get_data_client()
-        # 取得最近 90 天的新聞來提取日期
+        # 最近 90 天有新聞的日期
         end_date = date.today()
         start_date = end_date - timedelta(days=90)
-        news_list = client.get_news(start_date=start_date, end_date=end_date, limit=5000)
-
-        dates_set = set()
-        for r in news_list:
-            date_val = r.get("collected_at") or r.get("published_at") or ""
-            if date_val:
-                dates_set.add(str(date_val)[:10])
-
-        dates = sorted(dates_set, reverse=True)
-        return [datetime.strptime(d, "%Y-%m-%d").date() for d in dates if d]
+        return client.get_news_dates(start_date, end_date)
     except Exception as e:
         return []
 
@@ -1721,96 +1845,311 @@ def get_ptt_available_dates():
         return []
 
 
+@st.cache_data(ttl=300)  # 快取 5 分鐘
+def _cached_available_dates():
+    """快取可用日期 (側邊欄每次重跑都會查詢)"""
+    return get_available_dates()
+
+
+@st.cache_data(ttl=300, show_spinner=False)  # 快取 5 分鐘
+def _cached_news_range(start_date: date, end_date: date, limit: int) -> list:
+    """快取日期區間新聞查詢（查詢失敗時拋出例外，不會被快取）"""
+    return _get_data_client().get_news(start_date=start_date, end_date=end_date, limit=limit)
+
+
 def get_news_by_date(selected_date: date):
     """取得指定日期的新聞 - 使用統一資料層"""
     try:
-        client = _get_data_client()
-        # 使用統一資料層的 get_news 方法
-        news_list = client.get_news(
-            start_date=selected_date,
-            end_date=selected_date,
-            limit=500
-        )
-        return news_list
+        return _cached_news_range(selected_date, selected_date, 500)
     except Exception as e:
         st.error(f"取得新聞失敗: {e}")
         return []
 
 
-def get_news_stats_by_date(selected_date: date):
-    """取得指定日期的新聞統計 - 使用統一資料層"""
+def get_news_stats_by_date(selected_date: date, news_list: list = None):
+    """
+    取得指定日期的新聞統計 - 使用統一資料層
+
+    news_list: 已取得的當日新聞（未經篩選），省略時重新查詢
+    """
     try:
-        # 取得當日新聞並計算統計
-        news_list = get_news_by_date(selected_date)
+        if news_list is None:
+            news_list = get_news_by_date(selected_date)
 
-        by_source_type = {}
-        by_source = {}
-        for r in news_list:
-            st = r.get("source_type") or "other"
-            by_source_type[st] = by_source_type.get(st, 0) + 1
-            s = r.get("source") or "unknown"
-            by_source[s] = by_source.get(s, 0) + 1
+        # 以 Counter 累計來源類型與來源（不重新查詢資料庫）
+        by_source_type = Counter(r.get("source_type") or "other" for r in news_list)
+        by_source = Counter(r.get("source") or "unknown" for r in news_list)
 
         return {
             "total_count": len(news_list),
-            "by_source_type": by_source_type,
-            "by_source": dict(sorted(by_source.items(), key=lambda x: x[1], reverse=True)[:10]),
+            "by_source_type": dict(by_source_type),
+            "by_source": dict(by_source.most_common(10)),
         }
     except Exception as e:
         return {"total_count": 0, "by_source_type": {}, "by_source": {}}
 
 
-def get_weekly_news(end_date: date, days: int = 7) -> list:
+# 一週新聞查詢的天數與筆數上限（背景預取與正式查詢共用，快取鍵才會一致）
+WEEKLY_NEWS_DAYS = 7
+WEEKLY_NEWS_LIMIT = 2000
+
+
+def weekly_news_range_args(end_date: date, days: int = WEEKLY_NEWS_DAYS) -> tuple:
+    """一週新聞查詢的 _cached_news_range 參數 (start_date, end_date, limit)"""
+    return end_date - timedelta(days=days), end_date, WEEKLY_NEWS_LIMIT
+
+
+def get_weekly_news(end_date: date, days: int = WEEKLY_NEWS_DAYS) -> list:
     """取得過去一週的新聞 - 使用統一資料層"""
     try:
-        client = _get_data_client()
-        start_date = end_date - timedelta(days=days)
-        news_list = client.get_news(
-            start_date=start_date,
-            end_date=end_date,
-            limit=2000
-        )
-        return news_list
+        return _cached_news_range(*weekly_news_range_args(end_date, days))
     except Exception as e:
         st.error(f"取得週新聞失敗: {e}")
         return []
 
 
-def categorize_news(news_list: list) -> dict:
-    """將新聞分類為總經、產業和科技產業鏈"""
-    macro_news = defaultdict(list)
-    industry_news = defaultdict(list)
-    tech_supply_chain_news = defaultdict(list)
+@st.cache_resource
+def _prefetch_pool() -> ThreadPoolExecutor:
+    """背景預先查詢用的執行緒池（跨重跑共用）"""
+    return ThreadPoolExecutor(max_workers=2, thread_name_prefix="prefetch")
 
-    for news in news_list:
-        title_lower = news["title"].lower()
-        content_lower = (news["content"] or "").lower()
-        text = title_lower + " " + content_lower
-
-        # 總經分類
-        for category, keywords in MACRO_KEYWORDS.items():
-            if any(kw in text for kw in keywords):
-                macro_news[category].append(news)
+
+def prefetch_news_range(start_date: date, end_date: date, limit: int) -> Future:
+    """
+    在背景執行緒先送出日期區間查詢，稍後同參數的 _cached_news_range 直接取用快取
+    (查詢進行中時會等待同一份結果；失敗不快取，由正式呼叫重新查詢並顯示錯誤)
+    """
+    ctx = get_script_run_ctx()
+
+    def run():
+        add_script_run_ctx(threading.current_thread(), ctx)
+        try:
+            _cached_news_range(start_date, end_date, limit)
+        except Exception:
+            pass
+
+    return _prefetch_pool().submit(run)
+
+
+@st.cache_data(ttl=3600, show_spinner=False)  # 快取 1 小時
+def _categorize_news_indices(batch_key: tuple, _news_list: list) -> dict:
+    """分類結果以新聞索引表示，快取內容只有整數，取回時再對應回新聞"""
+    groups = {
+        "macro": defaultdict(list),
+        "industry": defaultdict(list),
+        "tech_supply_chain": defaultdict(list),
+    }
+
+    for i, text in enumerate(get_news_texts(_news_list)):
+        hits = {pair for pairs in CATEGORY_MATCHER.find(text).values() for pair in pairs}
+
+        # 總經分類（取第一個符合的類別）
+        for category in MACRO_KEYWORDS:
+            if ("macro", category) in hits:
+                groups["macro"][category].append(i)
                 break
 
-        # 產業分類
-        for category, keywords in INDUSTRY_KEYWORDS.items():
-            if any(kw in text for kw in keywords):
-                industry_news[category].append(news)
+        # 產業分類（取第一個符合的類別）
+        for category in INDUSTRY_KEYWORDS:
+            if ("industry", category) in hits:
+                groups["industry"][category].append(i)
                 break
 
         # 科技產業鏈分類（一則新聞可歸入多個產業鏈類別）
-        for category, keywords in TECH_SUPPLY_CHAIN_KEYWORDS.items():
-            if any(kw in text for kw in keywords):
-                tech_supply_chain_news[category].append(news)
+        for category in TECH_SUPPLY_CHAIN_KEYWORDS:
+            if ("tech_supply_chain", category) in hits:
+                groups["tech_supply_chain"][category].append(i)
 
+    return {group: dict(categories) for group, categories in groups.items()}
+
+
+def categorize_news(news_list: list) -> dict:
+    """將新聞分類為總經、產業和科技產業鏈"""
+    indices = _categorize_news_indices(news_batch_key(news_list), news_list)
     return {
-        "macro": dict(macro_news),
-        "industry": dict(industry_news),
-        "tech_supply_chain": dict(tech_supply_chain_news),
+        group: {category: [news_list[i] for i in idx] for category, idx in categories.items()}
+        for group, categories in indices.items()
     }
 
 
+# 各產業的週趨勢結論模板 {類別: {燈號: 結論}}
+CATEGORY_CONCLUSIONS = {
+    # 產業板塊
+    "半導體": {
+        "🟢": "晶片需求回溫，庫存去化順利，產業景氣回升",
+        "🔴": "終端需求疲軟，庫存壓力仍在，短期承壓",
+        "🟡": "景氣能見度不明，等待需求回升訊號",
+    },
+    "軟體/雲端": {
+        "🟢": "企業IT支出成長，雲端轉型趨勢延續",
+        "🔴": "企業縮減支出，成長動能放緩",
+        "🟡": "支出態度保守，聚焦AI相關投資",
+    },
+    "網路/社群": {
+        "🟢": "廣告市場復甦，用戶成長穩健",
+        "🔴": "廣告支出收縮，競爭加劇",
+        "🟡": "廣告市場分化，平台表現不一",
+    },
+    "硬體/消費電子": {
+        "🟢": "消費需求回溫，新品帶動換機潮",
+        "🔴": "消費力道疲弱，庫存調整中",
+        "🟡": "需求平穩，等待新品週期啟動",
+    },
+    "AI人工智慧": {
+        "🟢": "AI應用加速落地，投資熱度不減",
+        "🔴": "AI變現疑慮浮現，估值面臨修正",
+        "🟡": "AI發展持續，但投資回報待驗證",
+    },
+    "金融": {
+        "🟢": "利差擴大、資產品質穩健，獲利成長",
+        "🔴": "信用風險升溫，淨利差收窄",
+        "🟡": "利率環境不確定，金融股觀望",
+    },
+    "醫療保健": {
+        "🟢": "新藥進展順利，醫療需求穩定成長",
+        "🔴": "藥價壓力、臨床失敗，產業承壓",
+        "🟡": "防禦特性顯現，表現相對穩健",
+    },
+    "能源": {
+        "🟢": "油價走強，能源股獲利改善",
+        "🔴": "油價走弱，獲利面臨壓縮",
+        "🟡": "油價震盪，關注OPEC政策動向",
+    },
+    "汽車": {
+        "🟢": "車市需求回升，電動車滲透率提高",
+        "🔴": "需求放緩，價格戰壓縮利潤",
+        "🟡": "傳統車穩定，電動車競爭加劇",
+    },
+    "零售/消費": {
+        "🟢": "消費信心回升，零售銷售成長",
+        "🔴": "消費力道轉弱，庫存壓力上升",
+        "🟡": "消費分化，必需品優於非必需品",
+    },
+    "航空/運輸": {
+        "🟢": "旅遊需求強勁，運價維持高檔",
+        "🔴": "需求放緩，運價走跌",
+        "🟡": "運輸需求平穩，關注燃油成本",
+    },
+    "通訊服務": {
+        "🟢": "5G用戶成長，ARPU提升",
+        "🔴": "競爭激烈，用戶成長趨緩",
+        "🟡": "產業成熟，股利殖利率具吸引力",
+    },
+    "工業": {
+        "🟢": "製造業復甦，基建投資增加",
+        "🔴": "訂單下滑，景氣循環向下",
+        "🟡": "製造業持平，等待政策刺激",
+    },
+    "公用事業": {
+        "🟢": "監管環境友善，電價調漲反映成本",
+        "🔴": "利率上升增加融資成本",
+        "🟡": "防禦特性顯現，適合避險配置",
+    },
+    "基礎材料": {
+        "🟢": "原物料價格上漲，產業獲利改善",
+        "🔴": "需求疲軟，原物料價格走跌",
+        "🟡": "原物料價格震盪，關注中國需求",
+    },
+    "鋼鐵/石化/水泥": {
+        "🟢": "營建需求回升，報價走揚",
+        "🔴": "內需不振，報價持續走跌",
+        "🟡": "傳產景氣平淡，等待需求回溫",
+    },
+    "房地產": {
+        "🟢": "房市回溫，交易量增加",
+        "🔴": "高利率衝擊，房市降溫",
+        "🟡": "房市觀望，等待利率方向明朗",
+    },
+    "加密貨幣": {
+        "🟢": "市場情緒樂觀，資金持續流入",
+        "🔴": "監管疑慮、市場恐慌，價格下跌",
+        "🟡": "價格盤整，等待突破方向",
+    },
+    # 科技產業鏈
+    "AI晶片": {
+        "🟢": "AI算力需求爆發，供不應求",
+        "🔴": "需求成長疑慮，庫存風險浮現",
+        "🟡": "需求維持高檔，但成長趨緩",
+    },
+    "記憶體": {
+        "🟢": "HBM需求強勁，價格止跌回升",
+        "🔴": "供過於求，價格持續下跌",
+        "🟡": "傳統記憶體疲軟，HBM獨強",
+    },
+    "晶圓代工": {
+        "🟢": "先進製程滿載，產能供不應求",
+        "🔴": "稼動率下滑，價格面臨壓力",
+        "🟡": "先進製程穩健，成熟製程調整",
+    },
+    "封測": {
+        "🟢": "先進封裝需求強，產能吃緊",
+        "🔴": "傳統封測需求弱，稼動率下滑",
+        "🟡": "CoWoS產能擴充中，傳統封測持平",
+    },
+    "IC設計": {
+        "🟢": "新品拉貨啟動，營收動能回升",
+        "🔴": "庫存調整未完，需求能見度低",
+        "🟡": "手機需求平淡，等待旺季拉貨",
+    },
+    "伺服器/資料中心": {
+        "🟢": "AI伺服器需求爆發，訂單能見度高",
+        "🔴": "傳統伺服器需求疲弱",
+        "🟡": "AI伺服器獨強，傳統伺服器平淡",
+    },
+    "網通設備": {
+        "🟢": "資料中心升級帶動網通需求",
+        "🔴": "企業支出縮減，需求放緩",
+        "🟡": "400G/800G升級趨勢持續",
+    },
+    "PCB/散熱": {
+        "🟢": "AI伺服器帶動高階PCB/散熱需求",
+        "🔴": "消費性電子需求疲弱",
+        "🟡": "AI相關強勁，傳統應用平淡",
+    },
+    "電源供應": {
+        "🟢": "AI伺服器電源需求大增",
+        "🔴": "傳統PC/NB需求疲軟",
+        "🟡": "高瓦數電源需求成長，低瓦數平淡",
+    },
+    "面板/顯示": {
+        "🟢": "面板報價止跌回升，庫存健康",
+        "🔴": "供過於求，面板價格持續下跌",
+        "🟡": "大尺寸穩定，中小尺寸競爭激烈",
+    },
+    "手機供應鏈": {
+        "🟢": "新機備貨啟動，供應鏈受惠",
+        "🔴": "手機銷售不振，供應鏈承壓",
+        "🟡": "旗艦機穩定，中低階競爭激烈",
+    },
+    "AI應用/平台": {
+        "🟢": "企業AI導入加速，應用變現可期",
+        "🔴": "AI商業模式待驗證，獲利疑慮",
+        "🟡": "AI發展持續，但估值需消化",
+    },
+    "SaaS/雲服務": {
+        "🟢": "企業上雲趨勢延續，訂閱營收成長",
+        "🔴": "客戶縮減雲端支出，成長放緩",
+        "🟡": "雲端支出優化，聚焦AI功能",
+    },
+    "科技巨頭": {
+        "🟢": "AI投資帶動營收成長，獲利優於預期",
+        "🔴": "成長趨緩，AI投資回報受質疑",
+        "🟡": "財報分化，AI變現能力成關鍵",
+    },
+    "AI基礎設施": {
+        "🟢": "資本支出持續擴張，基建需求強勁",
+        "🔴": "投資放緩疑慮，訂單能見度下降",
+        "🟡": "長期需求確定，短期節奏調整",
+    },
+}
+
+
+@st.cache_data(ttl=3600, show_spinner=False)  # 快取 1 小時
+def _cached_weekly_summary(category: str, batch_key: tuple, daily_count: int, _weekly_news: list) -> tuple:
+    """週趨勢總結，同一批新聞跨重跑只計算一次"""
+    return generate_weekly_summary(category, _weekly_news, daily_count)
+
+
 def generate_weekly_summary(category: str, weekly_news: list, daily_count: int) -> tuple:
     """
     根據一週新聞生成產業總結
@@ -1822,9 +2161,10 @@ def generate_weekly_summary(category: str, weekly_news: list, daily_count: int)
     # 合併所有新聞文字
     text_all = " ".join([(n["title"] + " " + (n["content"] or "")).lower() for n in weekly_news])
 
-    # 計算正負面情緒
-    positive_count = sum(1 for kw in POSITIVE_KEYWORDS if kw in text_all)
-    negative_count = sum(1 for kw in NEGATIVE_KEYWORDS if kw in text_all)
+    # 計算正負面情緒（單次掃描，每個關鍵字最多計一次）
+    polarities = list(SENTIMENT_MATCHER.find(text_all).values())
+    positive_count = polarities.count("pos")
+    negative_count = polarities.count("neg")
 
     # 判斷週趨勢和燈號
     if positive_count > negative_count * 1.5:
@@ -1837,180 +2177,9 @@ def generate_weekly_summary(category: str, weekly_news: list, daily_count: int)
         trend = "➡️中性"
         light = "🟡"
 
-    # 各產業的結論模板
-    category_conclusions = {
-        # 產業板塊
-        "半導體": {
-            "🟢": "晶片需求回溫，庫存去化順利，產業景氣回升",
-            "🔴": "終端需求疲軟，庫存壓力仍在，短期承壓",
-            "🟡": "景氣能見度不明，等待需求回升訊號",
-        },
-        "軟體/雲端": {
-            "🟢": "企業IT支出成長，雲端轉型趨勢延續",
-            "🔴": "企業縮減支出，成長動能放緩",
-            "🟡": "支出態度保守，聚焦AI相關投資",
-        },
-        "網路/社群": {
-            "🟢": "廣告市場復甦，用戶成長穩健",
-            "🔴": "廣告支出收縮，競爭加劇",
-            "🟡": "廣告市場分化，平台表現不一",
-        },
-        "硬體/消費電子": {
-            "🟢": "消費需求回溫，新品帶動換機潮",
-            "🔴": "消費力道疲弱，庫存調整中",
-            "🟡": "需求平穩，等待新品週期啟動",
-        },
-        "AI人工智慧": {
-            "🟢": "AI應用加速落地，投資熱度不減",
-            "🔴": "AI變現疑慮浮現，估值面臨修正",
-            "🟡": "AI發展持續，但投資回報待驗證",
-        },
-        "金融": {
-            "🟢": "利差擴大、資產品質穩健，獲利成長",
-            "🔴": "信用風險升溫，淨利差收窄",
-            "🟡": "利率環境不確定，金融股觀望",
-        },
-        "醫療保健": {
-            "🟢": "新藥進展順利，醫療需求穩定成長",
-            "🔴": "藥價壓力、臨床失敗，產業承壓",
-            "🟡": "防禦特性顯現，表現相對穩健",
-        },
-        "能源": {
-            "🟢": "油價走強，能源股獲利改善",
-            "🔴": "油價走弱，獲利面臨壓縮",
-            "🟡": "油價震盪，關注OPEC政策動向",
-        },
-        "汽車": {
-            "🟢": "車市需求回升，電動車滲透率提高",
-            "🔴": "需求放緩，價格戰壓縮利潤",
-            "🟡": "傳統車穩定，電動車競爭加劇",
-        },
-        "零售/消費": {
-            "🟢": "消費信心回升，零售銷售成長",
-            "🔴": "消費力道轉弱，庫存壓力上升",
-            "🟡": "消費分化，必需品優於非必需品",
-        },
-        "航空/運輸": {
-            "🟢": "旅遊需求強勁，運價維持高檔",
-            "🔴": "需求放緩，運價走跌",
-            "🟡": "運輸需求平穩，關注燃油成本",
-        },
-        "通訊服務": {
-            "🟢": "5G用戶成長，ARPU提升",
-            "🔴": "競爭激烈，用戶成長趨緩",
-            "🟡": "產業成熟，股利殖利率具吸引力",
-        },
-        "工業": {
-            "🟢": "製造業復甦，基建投資增加",
-            "🔴": "訂單下滑，景氣循環向下",
-            "🟡": "製造業持平，等待政策刺激",
-        },
-        "公用事業": {
-            "🟢": "監管環境友善，電價調漲反映成本",
-            "🔴": "利率上升增加融資成本",
-            "🟡": "防禦特性顯現，適合避險配置",
-        },
-        "基礎材料": {
-            "🟢": "原物料價格上漲，產業獲利改善",
-            "🔴": "需求疲軟，原物料價格走跌",
-            "🟡": "原物料價格震盪，關注中國需求",
-        },
-        "鋼鐵/石化/水泥": {
-            "🟢": "營建需求回升，報價走揚",
-            "🔴": "內需不振，報價持續走跌",
-            "🟡": "傳產景氣平淡，等待需求回溫",
-        },
-        "房地產": {
-            "🟢": "房市回溫，交易量增加",
-            "🔴": "高利率衝擊，房市降溫",
-            "🟡": "房市觀望，等待利率方向明朗",
-        },
-        "加密貨幣": {
-            "🟢": "市場情緒樂觀，資金持續流入",
-            "🔴": "監管疑慮、市場恐慌，價格下跌",
-            "🟡": "價格盤整，等待突破方向",
-        },
-        # 科技產業鏈
-        "AI晶片": {
-            "🟢": "AI算力需求爆發，供不應求",
-            "🔴": "需求成長疑慮，庫存風險浮現",
-            "🟡": "需求維持高檔，但成長趨緩",
-        },
-        "記憶體": {
-            "🟢": "HBM需求強勁，價格止跌回升",
-            "🔴": "供過於求，價格持續下跌",
-            "🟡": "傳統記憶體疲軟，HBM獨強",
-        },
-        "晶圓代工": {
-            "🟢": "先進製程滿載，產能供不應求",
-            "🔴": "稼動率下滑，價格面臨壓力",
-            "🟡": "先進製程穩健，成熟製程調整",
-        },
-        "封測": {
-            "🟢": "先進封裝需求強，產能吃緊",
-            "🔴": "傳統封測需求弱，稼動率下滑",
-            "🟡": "CoWoS產能擴充中，傳統封測持平",
-        },
-        "IC設計": {
-            "🟢": "新品拉貨啟動，營收動能回升",
-            "🔴": "庫存調整未完，需求能見度低",
-            "🟡": "手機需求平淡，等待旺季拉貨",
-        },
-        "伺服器/資料中心": {
-            "🟢": "AI伺服器需求爆發，訂單能見度高",
-            "🔴": "傳統伺服器需求疲弱",
-            "🟡": "AI伺服器獨強，傳統伺服器平淡",
-        },
-        "網通設備": {
-            "🟢": "資料中心升級帶動網通需求",
-            "🔴": "企業支出縮減，需求放緩",
-            "🟡": "400G/800G升級趨勢持續",
-        },
-        "PCB/散熱": {
-            "🟢": "AI伺服器帶動高階PCB/散熱需求",
-            "🔴": "消費性電子需求疲弱",
-            "🟡": "AI相關強勁，傳統應用平淡",
-        },
-        "電源供應": {
-            "🟢": "AI伺服器電源需求大增",
-            "🔴": "傳統PC/NB需求疲軟",
-            "🟡": "高瓦數電源需求成長，低瓦數平淡",
-        },
-        "面板/顯示": {
-            "🟢": "面板報價止跌回升，庫存健康",
-            "🔴": "供過於求，面板價格持續下跌",
-            "🟡": "大尺寸穩定，中小尺寸競爭激烈",
-        },
-        "手機供應鏈": {
-            "🟢": "新機備貨啟動，供應鏈受惠",
-            "🔴": "手機銷售不振，供應鏈承壓",
-            "🟡": "旗艦機穩定，中低階競爭激烈",
-        },
-        "AI應用/平台": {
-            "🟢": "企業AI導入加速，應用變現可期",
-            "🔴": "AI商業模式待驗證，獲利疑慮",
-            "🟡": "AI發展持續，但估值需消化",
-        },
-        "SaaS/雲服務": {
-            "🟢": "企業上雲趨勢延續，訂閱營收成長",
-            "🔴": "客戶縮減雲端支出，成長放緩",
-            "🟡": "雲端支出優化，聚焦AI功能",
-        },
-        "科技巨頭": {
-            "🟢": "AI投資帶動營收成長，獲利優於預期",
-            "🔴": "成長趨緩，AI投資回報受質疑",
-            "🟡": "財報分化，AI變現能力成關鍵",
-        },
-        "AI基礎設施": {
-            "🟢": "資本支出持續擴張，基建需求強勁",
-            "🔴": "投資放緩疑慮，訂單能見度下降",
-            "🟡": "長期需求確定，短期節奏調整",
-        },
-    }
-
     # 取得該類別的結論，若無則使用通用模板
-    if category in category_conclusions:
-        summary = category_conclusions[category].get(light, "本週消息中性，持續觀察")
+    if category in CATEGORY_CONCLUSIONS:
+        summary = CATEGORY_CONCLUSIONS[category].get(light, "本週消息中性，持續觀察")
     else:
         # 通用結論
         if light == "🟢":
@@ -2023,10 +2192,30 @@ def generate_weekly_summary(category: str, weekly_news: list, daily_count: int)
     return light, summary, trend
 
 
+def news_batch_key(news_items: list) -> tuple:
+    """新聞批次的快取鍵（以 id 代表整則新聞，缺 id 時改用標題）"""
+    return tuple(n.get("id") or n["title"] for n in news_items)
+
+
+@st.cache_data(ttl=300, show_spinner=False)  # 快取 5 分鐘
+def _cached_category_summary(category: str, batch_key: tuple, _news_items: list) -> tuple:
+    """分類卡片的 (燈號, 分數, 一句話總結)，同一批新聞跨重跑只計算一次"""
+    texts = get_news_texts(_news_items)
+    light, score = analyze_sentiment(_news_items, texts)
+    return light, score, generate_summary(category, _news_items, light, texts)
+
+
+@st.cache_data(ttl=300, show_spinner=False)  # 快取 5 分鐘
+def _cached_dual_summary(category: str, batch_key: tuple, _news_items: list) -> tuple:
+    """總覽表格的 (燈號, 事實/預期總結)，同一批新聞跨重跑只計算一次"""
+    texts = get_news_texts(_news_items)
+    light, _ = analyze_sentiment(_news_items, texts)
+    return light, generate_dual_summary(category, _news_items, texts)
+
+
 def render_category_card(category: str, news_items: list, expanded: bool = False):
     """渲染分類卡片，包含燈號和一句話總結"""
-    light, score = analyze_sentiment(news_items)
-    summary = generate_summary(category, news_items, light)
+    light, score, summary = _cached_category_summary(category, news_batch_key(news_items), news_items)
 
     # 標題行：燈號 + 分類 + 數量
     header = f"{light} **{category}** ({len(news_items)} 則)"
@@ -2050,11 +2239,29 @@ def render_category_card(category: str, news_items: list, expanded: bool = False
             st.caption(f"... 還有 {len(news_items) - 5} 則相關新聞")
 
 
+# 新聞總結頁「熱門關鍵詞」: {顯示名稱: (計數字串, ...)}
+HOT_TITLE_KEYWORDS = {
+    "AI": ("ai", "artificial intelligence"),
+    "Fed": ("fed",),
+    "Trump": ("trump",),
+    "Gold": ("gold",),
+    "Tesla": ("tesla",),
+    "Earnings": ("earning",),
+    "Tariff": ("tariff",),
+    "Market": ("market",),
+    "Economy": ("econom",),
+    "Rate": ("rate",),
+}
+
+
 def render_summary_page(selected_date: date):
     """渲染總結頁面"""
     st.title("📊 新聞總結")
     st.markdown(f"**日期**: {selected_date.strftime('%Y-%m-%d')}")
 
+    # 一週新聞與當日新聞互相獨立，先在背景送出一週查詢（各執行緒使用自己的唯讀連線）
+    prefetch_news_range(*weekly_news_range_args(selected_date))
+
     # 取得新聞並套用篩選
     raw_news = get_news_by_date(selected_date)
     ptt_min = st.session_state.get("ptt_min_push", 30)
@@ -2066,7 +2273,7 @@ def render_summary_page(selected_date: date):
     if filtered_count > 0:
         st.caption(f"🔍 已篩選: 原 {len(raw_news)} 篇 → {len(news_list)} 篇 (過濾 {filtered_count} 篇)")
 
-    stats = get_news_stats_by_date(selected_date)
+    stats = get_news_stats_by_date(selected_date, raw_news)
 
     if stats["total_count"] == 0:
         st.warning(f"{selected_date} 沒有收集到新聞")
@@ -2100,8 +2307,7 @@ def render_summary_page(selected_date: date):
     for category in MACRO_KEYWORDS.keys():
         news_items = macro_news.get(category, [])
         if news_items:
-            light, _ = analyze_sentiment(news_items)
-            dual = generate_dual_summary(category, news_items)
+            light, dual = _cached_dual_summary(category, news_batch_key(news_items), news_items)
         else:
             light = "⚪"  # 無資料用灰色
             dual = {"facts": "—", "expectations": "—"}
@@ -2144,7 +2350,7 @@ def render_summary_page(selected_date: date):
     st.caption("💡 總結基於過去一週新聞趨勢分析，避免單日新聞影響判斷")
 
     # 取得過去一週新聞用於趨勢分析 (套用篩選)
-    raw_weekly = get_weekly_news(selected_date, days=7)
+    raw_weekly = get_weekly_news(selected_date)
     weekly_news_list = filter_news(raw_weekly, ptt_min_push=ptt_min, exclude_editorial=exclude_ed)
     weekly_categorized = categorize_news(weekly_news_list)
     weekly_industry_news = weekly_categorized["industry"]
@@ -2159,7 +2365,8 @@ def render_summary_page(selected_date: date):
         weekly_items = weekly_industry_news.get(category, [])
 
         if weekly_items:
-            light, summary, trend = generate_weekly_summary(category, weekly_items, len(daily_items))
+            light, summary, trend = _cached_weekly_summary(
+                category, news_batch_key(weekly_items), len(daily_items), weekly_items)
         else:
             light = "⚪"
             summary = "本週無相關新聞"
@@ -2219,7 +2426,8 @@ def render_summary_page(selected_date: date):
         weekly_items = weekly_tech_news.get(category, [])
 
         if weekly_items:
-            light, summary, trend = generate_weekly_summary(category, weekly_items, len(daily_items))
+            light, summary, trend = _cached_weekly_summary(
+                category, news_batch_key(weekly_items), len(daily_items), weekly_items)
         else:
             light = "⚪"
             summary = "本週無相關新聞"
@@ -2282,19 +2490,12 @@ def render_summary_page(selected_date: date):
 
     with col_right:
         st.subheader("熱門關鍵詞")
-        all_titles = " ".join([n["title"] for n in news_list])
+        # 標題只合併並轉小寫一次，各關鍵詞在同一字串上計數
+        all_titles = " ".join([n["title"] for n in news_list]).lower()
 
         keywords = {
-            "AI": all_titles.lower().count("ai") + all_titles.lower().count("artificial intelligence"),
-            "Fed": all_titles.lower().count("fed"),
-            "Trump": all_titles.lower().count("trump"),
-            "Gold": all_titles.lower().count("gold"),
-            "Tesla": all_titles.lower().count("tesla"),
-            "Earnings": all_titles.lower().count("earning"),
-            "Tariff": all_titles.lower().count("tariff"),
-            "Market": all_titles.lower().count("market"),
-            "Economy": all_titles.lower().count("econom"),
-            "Rate": all_titles.lower().count("rate"),
+            label: sum(map(all_titles.count, terms))
+            for label, terms in HOT_TITLE_KEYWORDS.items()
         }
         keywords = {k: v for k, v in keywords.items() if v > 0}
 
@@ -2340,7 +2541,7 @@ def render_news_list_page(selected_date: date):
     if selected_type != "全部":
         filtered_news = [n for n in filtered_news if n["source_type"] == selected_type]
     if search_term:
-        filtered_news = [n for n in filtered_news if search_term.lower() in n["title"].lower()]
+        filtered_news = search_titles(filtered_news, search_term)
 
     st.markdown(f"共 **{len(filtered_news)}** 則新聞")
     st.divider()
@@ -2411,14 +2612,9 @@ def render_news_detail_page(selected_date: date):
 
 def get_ptt_news_by_date(selected_date: date):
     """取得指定日期的 PTT 文章 - 使用統一資料層"""
-    try:
-        client = _get_data_client()
-        # 取得當天新聞並過濾 PTT
-        news_list = client.get_news(
-            start_date=selected_date,
-            end_date=selected_date,
-            limit=500
-        )
+    try:
+        # 取得當天新聞並過濾 PTT（與 get_news_by_date 共用同一份快取查詢）
+        news_list = _cached_news_range(selected_date, selected_date, 500)
         # 過濾出 PTT 文章
         ptt_news = [n for n in news_list if n.get("source_type") == "ptt"]
         return ptt_news
@@ -2479,35 +2675,26 @@ def render_ptt_page(selected_date: date):
     if selected_cat != "全部":
         filtered = [n for n in filtered if n["category"] == selected_cat]
     if search_term:
-        filtered = [n for n in filtered if search_term.lower() in n["title"].lower()]
+        filtered = search_titles(filtered, search_term)
 
     st.markdown(f"顯示 **{len(filtered)}** 則")
     st.divider()
 
     # 文章列表
     for news in filtered:
-        # 取得推文數
+        # 取得推文數並以顏色標記（爆 = 100、噓 = -1，與推文數篩選共用解析）
         push_info = news["content"] or ""
-        push_match = push_info.split("]")[0].replace("[", "") if "]" in push_info else ""
-
-        # 顏色標記推文數
-        if "爆" in push_match:
+        push_count = extract_ptt_push_count(push_info)
+        if push_count >= 50:
             push_badge = "🔥"
-        elif push_match.isdigit() and int(push_match) >= 50:
-            push_badge = "🔥"
-        elif push_match.startswith("X"):
+        elif push_count < 0:
             push_badge = "💩"
         else:
             push_badge = ""
 
-        # 取得發文時間
-        pub_time = ""
-        if news["published_at"]:
-            try:
-                pub_dt = datetime.strptime(news["published_at"], "%Y-%m-%d %H:%M:%S")
-                pub_time = pub_dt.strftime("%H:%M")
-            except:
-                pub_time = ""
+        # 取得發文時間（直接擷取 HH:MM，不逐筆 strptime）
+        time_match = PTT_TIME_RE.match(str(news["published_at"] or ""))
+        pub_time = time_match.group(1) if time_match else ""
 
         title_display = f"{push_badge} [{news['category']}] {news['title']}"
         if pub_time:
@@ -2784,6 +2971,12 @@ Q1_2026_FORECAST = {
     },
 }
 
+# 每個技術趨勢的關鍵字編譯成一個 regex，供 text_lower 欄位向量化比對
+TREND_PATTERNS = {
+    name: re.compile("|".join(re.escape(kw.lower()) for kw in info["keywords"]))
+    for name, info in TECH_TRENDS.items()
+}
+
 SUPPLY_CHAIN_KEYWORDS = {
     "短缺警示": ["shortage", "constraint", "bottleneck", "tight supply", "allocation", "lead time extend"],
     "產能動態": ["capacity expansion", "new fab", "foundry", "utilization", "ramp up", "mass production"],
@@ -2799,23 +2992,18 @@ def analyze_trend_from_news(news_list: list) -> dict:
     daily_mentions = defaultdict(lambda: defaultdict(int))
     total_mentions = defaultdict(int)
 
-    for news in news_list:
-        title = (news.get("title") or "").lower()
-        content = (news.get("content") or "").lower()
-        text = title + " " + content
-
-        pub_date = news.get("published_at") or news.get("collected_at") or ""
-        if pub_date:
-            date_str = pub_date[:10]
-        else:
-            continue
+    # 以欄位向量化比對：每個趨勢一次 str.contains，取代逐則逐關鍵字的迴圈
+    news_df = build_news_frame(news_list)
+    published = news_df["published_at"].fillna("").astype(str)
+    collected = news_df["collected_at"].fillna("").astype(str)
+    date_strs = published.where(published != "", collected).str[:10]
+    has_date = date_strs != ""
 
-        for trend_name, trend_info in TECH_TRENDS.items():
-            for keyword in trend_info["keywords"]:
-                if keyword.lower() in text:
-                    daily_mentions[date_str][trend_name] += 1
-                    total_mentions[trend_name] += 1
-                    break
+    for trend_name, pattern in TREND_PATTERNS.items():
+        hit = has_date & news_df["text_lower"].str.contains(pattern)
+        total_mentions[trend_name] = int(hit.sum())
+        for date_str, count in date_strs[hit].value_counts().items():
+            daily_mentions[date_str][trend_name] = int(count)
 
     # 計算動能
     today = date.today()
@@ -5267,7 +5455,7 @@ def render_individual_stock_page(selected_date: date):
         fig.add_trace(go.Scatter(x=df['date'], y=df['bb_lower'], name='BB Lower', line=dict(color='gray', dash='dash', width=0.5), fill='tonexty', fillcolor='rgba(128,128,128,0.1)'), row=1, col=1)
 
         # 成交量
-        colors = ['red' if row['close'] < row['open'] else 'green' for _, row in df.iterrows()]
+        colors = np.where(df['close'].to_numpy() < df['open'].to_numpy(), 'red', 'green')
         fig.add_trace(go.Bar(x=df['date'], y=df['volume'], name='成交量', marker_color=colors), row=2, col=1)
 
         fig.update_layout(
@@ -5295,7 +5483,7 @@ def render_individual_stock_page(selected_date: date):
         # MACD
         fig2.add_trace(go.Scatter(x=df['date'], y=df['macd'], name='MACD', line=dict(color='blue')), row=2, col=1)
         fig2.add_trace(go.Scatter(x=df['date'], y=df['signal'], name='Signal', line=dict(color='orange')), row=2, col=1)
-        colors_macd = ['green' if v > 0 else 'red' for v in df['macd_hist']]
+        colors_macd = np.where(df['macd_hist'].to_numpy() > 0, 'green', 'red')
         fig2.add_trace(go.Bar(x=df['date'], y=df['macd_hist'], name='Histogram', marker_color=colors_macd), row=2, col=1)
 
         fig2.update_layout(height=500, showlegend=True)
@@ -5556,20 +5744,16 @@ def render_stock_page(selected_date: date):
             )
 
         # 成交量
-        colors = ["#26a69a" if row["close"] >= row["open"] else "#ef5350"
-                  for _, row in df.iterrows()]
+        colors = np.where(df["close"].to_numpy() >= df["open"].to_numpy(), "#26a69a", "#ef5350")
         fig.add_trace(
             go.Bar(x=df["date"], y=df["volume"], name="成交量",
                    marker_color=colors, showlegend=False),
             row=2, col=1
         )
 
-        # 新聞數量
-        news_dates = []
-        news_values = []
-        for d, count in sorted(news_counts.items()):
-            news_dates.append(d)
-            news_values.append(count)
+        # 新聞數量（資料層已依日期排序）
+        news_dates = list(news_counts.keys())
+        news_values = list(news_counts.values())
 
         fig.add_trace(
             go.Bar(x=news_dates, y=news_values, name="新聞數",
@@ -5619,28 +5803,28 @@ def render_stock_page(selected_date: date):
     with col_info:
         st.subheader("📊 基本面數據")
 
-        # 取得最新價格
-        latest = df.iloc[-1] if not df.empty else None
-
-        if latest is not None:
-            prev_close = df.iloc[-2]["close"] if len(df) > 1 else latest["close"]
-            change = latest["close"] - prev_close
+        # 取得最新價格（直接取 NumPy 陣列最後兩列，不建立 Series）
+        if not df.empty:
+            prices = df[["high", "low", "close", "volume"]].to_numpy(dtype=float)
+            high, low, close, volume = prices[-1]
+            prev_close = prices[-2, 2] if len(prices) > 1 else close
+            change = close - prev_close
             change_pct = (change / prev_close) * 100
 
             if change >= 0:
-                st.metric("最新收盤價", f"${latest['close']:.2f}",
+                st.metric("最新收盤價", f"${close:.2f}",
                           f"+{change:.2f} (+{change_pct:.2f}%)")
             else:
-                st.metric("最新收盤價", f"${latest['close']:.2f}",
+                st.metric("最新收盤價", f"${close:.2f}",
                           f"{change:.2f} ({change_pct:.2f}%)")
 
             col_a, col_b = st.columns(2)
             with col_a:
-                st.metric("最高", f"${latest['high']:.2f}")
+                st.metric("最高", f"${high:.2f}")
             with col_b:
-                st.metric("最低", f"${latest['low']:.2f}")
+                st.metric("最低", f"${low:.2f}")
 
-            st.metric("成交量", f"{latest['volume']:,.0f}")
+            st.metric("成交量", f"{volume:,.0f}")
 
         # 基本面數據
         fundamentals = get_stock_fundamentals(selected_symbol)
@@ -5676,8 +5860,7 @@ def render_stock_page(selected_date: date):
         st.subheader("🎯 交易建議")
 
         try:
-            analyzer = TechnicalAnalyzer(str(FINANCE_DB_PATH))
-            analysis = analyzer.get_current_analysis(selected_symbol)
+            analysis = _cached_current_analysis(selected_symbol)
 
             rec = analysis['recommendation']
             rec_text = analysis.get('recommendation_text', rec)
@@ -5709,19 +5892,13 @@ def render_stock_page(selected_date: date):
             st.markdown(f"找到 **{len(related_news)}** 則相關新聞")
             st.divider()
 
-            for news in related_news[:10]:
-                # 情緒分析
-                text = (news["title"] + " " + (news["content"] or "")).lower()
-                sentiment = "🟡"
-                for kw in POSITIVE_KEYWORDS:
-                    if kw in text:
-                        sentiment = "🟢"
-                        break
-                for kw in NEGATIVE_KEYWORDS:
-                    if kw in text:
-                        sentiment = "🔴" if sentiment == "🟡" else "🟡"
-                        break
+            shown_news = related_news[:10]
+            texts = [(n["title"] + " " + (n["content"] or "")[:SENTIMENT_SCAN_CHARS]).lower() for n in shown_news]
+            # 情緒標記：正負面關鍵字數較多的一方決定燈號，相同時為中性
+            positive, negative = count_sentiment_keywords(texts)
+            sentiments = SENTIMENT_LIGHTS[np.sign(positive - negative) + 1]
 
+            for news, sentiment in zip(shown_news, sentiments):
                 with st.expander(f"{sentiment} {news['title'][:70]}...", expanded=False):
                     st.markdown(f"**來源**: {news['source']}")
                     if news["published_at"]:
@@ -5751,14 +5928,11 @@ def render_stock_page(selected_date: date):
 
     if len(compare_symbols) >= 2:
         # 取得所有股票的數據
-        compare_data = {}
-        for sym in compare_symbols:
-            sym_df = get_stock_prices(sym, start_date, end_date)
-            if not sym_df.empty:
-                # 計算報酬率
-                first_price = sym_df.iloc[0]["close"]
-                sym_df["return"] = (sym_df["close"] / first_price - 1) * 100
-                compare_data[sym] = sym_df
+        compare_data = get_stock_prices_bulk(compare_symbols, start_date, end_date)
+        for sym_df in compare_data.values():
+            # 計算報酬率
+            first_price = sym_df.iloc[0]["close"]
+            sym_df["return"] = (sym_df["close"] / first_price - 1) * 100
 
         if compare_data:
             # 繪製比較圖
@@ -5786,20 +5960,22 @@ def render_stock_page(selected_date: date):
 
             st.plotly_chart(fig_compare, use_container_width=True)
 
-            # 統計表格
-            stats_data = []
-            for sym, sym_df in compare_data.items():
-                returns = sym_df["close"].pct_change().dropna()
-                stats_data.append({
-                    "股票": sym,
-                    "起始價": f"${sym_df.iloc[0]['close']:.2f}",
-                    "最新價": f"${sym_df.iloc[-1]['close']:.2f}",
-                    "累積報酬": f"{sym_df.iloc[-1]['return']:.2f}%",
-                    "日均報酬": f"{returns.mean()*100:.3f}%",
-                    "波動率": f"{returns.std()*100:.2f}%",
-                })
-
-            st.dataframe(pd.DataFrame(stats_data), use_container_width=True, hide_index=True)
+            # 統計表格（合併為長格式後以 groupby 一次計算各檔統計）
+            long_df = pd.concat(compare_data, names=["股票"]).reset_index(level=0)
+            grouped = long_df.groupby("股票", sort=False)
+            first_rows = grouped.nth(0).set_index("股票")
+            last_rows = grouped.nth(-1).set_index("股票")
+            daily_returns = grouped["close"].pct_change().groupby(long_df["股票"], sort=False)
+
+            stats_df = pd.DataFrame({
+                "起始價": first_rows["close"].map("${:.2f}".format),
+                "最新價": last_rows["close"].map("${:.2f}".format),
+                "累積報酬": last_rows["return"].map("{:.2f}%".format),
+                "日均報酬": (daily_returns.mean() * 100).map("{:.3f}%".format),
+                "波動率": (daily_returns.std() * 100).map("{:.2f}%".format),
+            }).rename_axis("股票").reset_index()
+
+            st.dataframe(stats_df, use_container_width=True, hide_index=True)
     else:
         st.info("請選擇至少 2 檔股票來進行比較")
 
@@ -5813,7 +5989,7 @@ def render_analysis_page():
         st.error("找不到金融資料庫 (finance.db)")
         return
 
-    analyzer = TechnicalAnalyzer(str(FINANCE_DB_PATH))
+    analyzer = get_analyzer()
 
     # 分析模式選擇
     analysis_mode = st.radio(
@@ -5853,7 +6029,7 @@ def render_single_stock_analysis(analyzer: TechnicalAnalyzer):
 
     if analyze_btn or 'last_analysis' in st.session_state:
         with st.spinner("分析中..."):
-            analysis = analyzer.get_current_analysis(selected_symbol)
+            analysis = _cached_current_analysis(selected_symbol)
             st.session_state['last_analysis'] = analysis
 
         # 顯示建議
@@ -5994,7 +6170,7 @@ def render_top_picks(analyzer: TechnicalAnalyzer):
     st.subheader("🏆 今日買賣建議排行")
 
     with st.spinner("正在分析所有股票..."):
-        buy_picks, sell_picks = analyzer.get_top_picks(n=10)
+        buy_picks, sell_picks = _cached_top_picks(10)
 
     col_buy, col_sell = st.columns(2)
 
@@ -6135,7 +6311,7 @@ def render_single_stock_backtest(analyzer: TechnicalAnalyzer):
             # 根據策略選擇不同的回測方法
             if selected_strategy == "BH":
                 # Buy and Hold 策略
-                portfolio = PortfolioStrategy(str(FINANCE_DB_PATH))
+                portfolio = get_portfolio()
                 result = portfolio.buy_and_hold(
                     selected_symbol, initial_capital,
                     start_date=start_date_str, end_date=end_date_str
@@ -6217,19 +6393,15 @@ def render_single_stock_backtest(analyzer: TechnicalAnalyzer):
             row=1, col=1
         )
 
-        # 買入點
-        buy_dates = []
-        buy_prices = []
-        buy_texts = []
-        for trade in trades:
-            buy_dates.append(trade['entry_date'])
-            buy_prices.append(trade['entry_price'])
-            buy_texts.append(f"買入 ${trade['entry_price']:.2f}<br>{trade['shares']}股")
+        # 買入點（交易明細轉為 DataFrame，買賣點與明細表共用）
+        trades_df = pd.DataFrame(trades)
+        buy_texts = ("買入 $" + trades_df['entry_price'].map("{:.2f}".format)
+                     + "<br>" + trades_df['shares'].astype(str) + "股")
 
         fig.add_trace(
             go.Scatter(
-                x=buy_dates,
-                y=buy_prices,
+                x=trades_df['entry_date'],
+                y=trades_df['entry_price'],
                 mode='markers',
                 name='買入',
                 marker=dict(
@@ -6243,21 +6415,16 @@ def render_single_stock_backtest(analyzer: TechnicalAnalyzer):
             row=1, col=1
         )
 
-        # 賣出點
-        sell_dates = []
-        sell_prices = []
-        sell_texts = []
-        for trade in trades:
-            if trade.get('exit_date') != '持有中':
-                sell_dates.append(trade['exit_date'])
-                sell_prices.append(trade['exit_price'])
-                profit_sign = '+' if trade['profit'] >= 0 else ''
-                sell_texts.append(f"賣出 ${trade['exit_price']:.2f}<br>獲利 {profit_sign}${trade['profit']:.0f}")
+        # 賣出點（排除仍持有中的部位）
+        closed = trades_df[trades_df['exit_date'] != '持有中']
+        sell_texts = ("賣出 $" + closed['exit_price'].map("{:.2f}".format).astype(str)
+                      + "<br>獲利 " + np.where(closed['profit'] >= 0, "+", "")
+                      + "$" + closed['profit'].map("{:.0f}".format).astype(str))
 
         fig.add_trace(
             go.Scatter(
-                x=sell_dates,
-                y=sell_prices,
+                x=closed['exit_date'],
+                y=closed['exit_price'],
                 mode='markers',
                 name='賣出',
                 marker=dict(
@@ -6272,13 +6439,12 @@ def render_single_stock_backtest(analyzer: TechnicalAnalyzer):
         )
 
         # 資金曲線
-        eq_dates = [e['date'] for e in equity_curve]
-        eq_values = [e['equity'] for e in equity_curve]
+        eq_df = pd.DataFrame(equity_curve, columns=['date', 'equity'])
 
         fig.add_trace(
             go.Scatter(
-                x=eq_dates,
-                y=eq_values,
+                x=eq_df['date'],
+                y=eq_df['equity'],
                 mode='lines',
                 name='資金',
                 line=dict(color='#ff7f0e', width=2),
@@ -6308,24 +6474,20 @@ def render_single_stock_backtest(analyzer: TechnicalAnalyzer):
         st.divider()
         st.subheader("📋 交易明細")
 
-        trade_data = []
-        for i, trade in enumerate(trades, 1):
-            profit_display = f"+${trade['profit']:,.0f}" if trade['profit'] >= 0 else f"-${abs(trade['profit']):,.0f}"
-            pct_display = f"+{trade['profit_pct']:.1f}%" if trade['profit_pct'] >= 0 else f"{trade['profit_pct']:.1f}%"
-
-            trade_data.append({
-                "交易": f"#{i}",
-                "買入日期": trade['entry_date'],
-                "買入價": f"${trade['entry_price']:.2f}",
-                "賣出日期": trade['exit_date'],
-                "賣出價": f"${trade['exit_price']:.2f}",
-                "股數": trade['shares'],
-                "獲利": profit_display,
-                "報酬率": pct_display,
-                "結果": "🟢 獲利" if trade['profit'] >= 0 else "🔴 虧損"
-            })
-
-        df_trades = pd.DataFrame(trade_data)
+        profit = trades_df['profit']
+        profit_pct = trades_df['profit_pct']
+        df_trades = pd.DataFrame({
+            "交易": "#" + pd.Series(range(1, len(trades_df) + 1)).astype(str),
+            "買入日期": trades_df['entry_date'],
+            "買入價": trades_df['entry_price'].map("${:.2f}".format),
+            "賣出日期": trades_df['exit_date'],
+            "賣出價": trades_df['exit_price'].map("${:.2f}".format),
+            "股數": trades_df['shares'],
+            "獲利": np.where(profit >= 0, "+$" + profit.map("{:,.0f}".format),
+                           "-$" + profit.abs().map("{:,.0f}".format)),
+            "報酬率": np.where(profit_pct >= 0, "+", "") + profit_pct.map("{:.1f}%".format),
+            "結果": np.where(profit >= 0, "🟢 獲利", "🔴 虧損"),
+        })
         st.dataframe(df_trades, use_container_width=True, hide_index=True)
 
         # ========== 策略說明 ==========
@@ -6377,6 +6539,77 @@ def render_single_stock_backtest(analyzer: TechnicalAnalyzer):
             st.markdown(strategy_explanations.get(selected_strategy, ""))
 
 
+class _BacktestFailed(Exception):
+    """回測回傳錯誤結果；以例外帶出，st.cache_data 不會快取例外"""
+
+    def __init__(self, result: dict):
+        super().__init__(result.get('error') or result.get('summary', {}).get('error'))
+        self.result = result
+
+
+def _raise_if_failed(result: dict) -> dict:
+    """回測結果含錯誤時拋出 _BacktestFailed，避免失敗結果被快取 1 小時"""
+    if 'error' in result or 'error' in result.get('summary', {}):
+        raise _BacktestFailed(result)
+    return result
+
+
+def _run_cached_backtest(cached_func, *args) -> dict:
+    """執行快取回測；失敗時照常回傳錯誤結果，但不寫入快取（下次按鈕會重新計算）"""
+    try:
+        return cached_func(*args)
+    except _BacktestFailed as e:
+        return e.result
+
+
+@st.cache_data(ttl=3600, show_spinner=False)  # 快取 1 小時
+def _cached_momentum(market: str, initial_capital: float, top_n: int, rebalance_days: int,
+                     lookback_days: int, start_date: str, end_date: str, vol_method: str = None) -> dict:
+    """快取動態換股回測（vol_method 為 None 時不做波動率校正）"""
+    portfolio = get_portfolio()
+    params = dict(
+        symbols=None,
+        initial_capital=initial_capital,
+        top_n=top_n,
+        rebalance_days=rebalance_days,
+        lookback_days=lookback_days,
+        market=market,
+        start_date=start_date,
+        end_date=end_date,
+    )
+    if vol_method:
+        return _raise_if_failed(portfolio.momentum_rotation_vol_adjusted(**params, vol_adjust_method=vol_method))
+    return _raise_if_failed(portfolio.momentum_rotation(**params))
+
+
+@st.cache_data(ttl=3600, show_spinner=False)  # 快取 1 小時
+def _cached_robustness(market: str, initial_capital: float, start_date: str, end_date: str) -> dict:
+    """快取魯棒性檢測結果"""
+    return _raise_if_failed(get_portfolio().robustness_test(
+        symbols=None,
+        initial_capital=initial_capital,
+        market=market,
+        start_date=start_date,
+        end_date=end_date
+    ))
+
+
+@st.cache_data(ttl=3600, show_spinner=False)  # 快取 1 小時
+def _cached_walk_forward(market: str, initial_capital: float, start_date: str, end_date: str,
+                         train_months: int, test_months: int, vol_adjusted: bool) -> dict:
+    """快取走動式評估結果"""
+    return _raise_if_failed(get_portfolio().walk_forward_analysis(
+        symbols=None,
+        initial_capital=initial_capital,
+        market=market,
+        start_date=start_date,
+        end_date=end_date,
+        train_months=train_months,
+        test_months=test_months,
+        vol_adjusted=vol_adjusted
+    ))
+
+
 def render_momentum_rotation():
     """動態換股策略回測"""
     st.info("""
@@ -6438,32 +6671,11 @@ def render_momentum_rotation():
 
     # 主要回測按鈕
     if st.button("🚀 開始動態換股回測", type="primary", use_container_width=True):
-        portfolio = PortfolioStrategy(str(FINANCE_DB_PATH))
-
         with st.spinner(f"正在計算 {selected_market_name} 市場 ({mom_start_year}-{mom_end_year}) 的動態換股策略..."):
-            if use_vol_adjust:
-                result = portfolio.momentum_rotation_vol_adjusted(
-                    symbols=None,
-                    initial_capital=initial_capital,
-                    top_n=top_n,
-                    rebalance_days=rebalance_days,
-                    lookback_days=lookback_days,
-                    market=selected_market,
-                    start_date=mom_start_date,
-                    end_date=mom_end_date,
-                    vol_adjust_method=vol_method
-                )
-            else:
-                result = portfolio.momentum_rotation(
-                    symbols=None,
-                    initial_capital=initial_capital,
-                    top_n=top_n,
-                    rebalance_days=rebalance_days,
-                    lookback_days=lookback_days,
-                    market=selected_market,
-                    start_date=mom_start_date,
-                    end_date=mom_end_date
-                )
+            result = _run_cached_backtest(
+                _cached_momentum, selected_market, initial_capital, top_n, rebalance_days, lookback_days,
+                mom_start_date, mom_end_date, vol_method if use_vol_adjust else None
+            )
 
         if 'error' in result:
             st.error(result['error'])
@@ -6508,16 +6720,15 @@ def render_momentum_rotation():
         st.subheader("📈 資金曲線")
 
         if equity_curve:
-            eq_dates = [e['date'] for e in equity_curve]
-            eq_values = [e['equity'] for e in equity_curve]
+            eq_df = pd.DataFrame(equity_curve, columns=['date', 'equity'])
 
             fig = go.Figure()
 
             # 資金曲線
             fig.add_trace(
                 go.Scatter(
-                    x=eq_dates,
-                    y=eq_values,
+                    x=eq_df['date'],
+                    y=eq_df['equity'],
                     mode='lines',
                     name='動態換股策略',
                     line=dict(color='#1f77b4', width=2),
@@ -6531,15 +6742,12 @@ def render_momentum_rotation():
                           annotation_text=f"初始資金 ${initial_capital:,}")
 
             # 標記調倉日
+            # 以日期建立資金查詢表（同日取第一筆），調倉日一次 reindex
+            eq_days = pd.to_datetime(eq_df['date']).to_numpy().astype('datetime64[D]')
+            equity_by_day = eq_df['equity'].groupby(eq_days, sort=False).first()
             rebal_dates = [r['date'] for r in rebalance_records]
-            rebal_values = []
-            for rd in rebal_dates:
-                for eq in equity_curve:
-                    if str(eq['date'])[:10] == rd:
-                        rebal_values.append(eq['equity'])
-                        break
-                else:
-                    rebal_values.append(None)
+            rebal_days = pd.to_datetime(rebal_dates).to_numpy().astype('datetime64[D]')
+            rebal_values = equity_by_day.reindex(rebal_days).to_numpy()
 
             fig.add_trace(
                 go.Scatter(
@@ -6565,22 +6773,21 @@ def render_momentum_rotation():
         st.subheader("🔄 調倉記錄")
 
         if rebalance_records:
-            rebal_data = []
-            for i, rec in enumerate(rebalance_records, 1):
-                # 處理 momentum 或 adjusted_momentum
-                mom_data = rec.get('momentum') or rec.get('adjusted_momentum', {})
-                top_stock = rec['selected'][0] if rec['selected'] else "-"
-                top_mom = mom_data.get(top_stock, "-") if mom_data and top_stock != "-" else "-"
-
-                rebal_data.append({
-                    "次數": i,
-                    "日期": rec['date'],
-                    "選中股票": ", ".join(rec['selected'][:5]),
-                    "動能最強": f"{top_stock} ({top_mom})" if top_stock != "-" else "-",
-                    "組合價值": f"${rec['total_value']:,.0f}"
-                })
+            rebal_df = pd.DataFrame(rebalance_records)
+            # 處理 momentum 或 adjusted_momentum
+            top_labels = [
+                f"{rec['selected'][0]} ({(rec.get('momentum') or rec.get('adjusted_momentum') or {}).get(rec['selected'][0], '-')})"
+                if rec['selected'] else "-"
+                for rec in rebalance_records
+            ]
 
-            st.dataframe(pd.DataFrame(rebal_data), use_container_width=True, hide_index=True)
+            st.dataframe(pd.DataFrame({
+                "次數": range(1, len(rebal_df) + 1),
+                "日期": rebal_df['date'],
+                "選中股票": rebal_df['selected'].str[:5].map(", ".join),
+                "動能最強": top_labels,
+                "組合價值": rebal_df['total_value'].map("${:,.0f}".format),
+            }), use_container_width=True, hide_index=True)
 
         # ========== 當前持股 ==========
         st.divider()
@@ -6588,35 +6795,30 @@ def render_momentum_rotation():
 
         final_holdings = summary.get('final_holdings', {})
         if final_holdings:
-            holdings_data = []
-            for sym, shares in final_holdings.items():
-                holdings_data.append({
-                    "股票": sym,
-                    "股數": shares
-                })
-            st.dataframe(pd.DataFrame(holdings_data), use_container_width=True, hide_index=True)
+            holdings_df = pd.DataFrame({"股票": list(final_holdings), "股數": list(final_holdings.values())})
+            st.dataframe(holdings_df, use_container_width=True, hide_index=True)
         else:
             st.info("策略結束時已全部出清")
 
         # ========== 交易明細 ==========
         with st.expander("📋 詳細交易記錄"):
             if trades:
-                trade_data = []
-                for trade in trades[-50:]:  # 顯示最近50筆
+                # 顯示最近50筆
+                td = pd.DataFrame(trades[-50:]).reindex(
+                    columns=['date', 'action', 'symbol', 'shares', 'price', 'value',
+                             'reason', 'momentum', 'adjusted_momentum']
+                )
+                st.dataframe(pd.DataFrame({
+                    "日期": td['date'],
+                    "動作": np.where(td['action'] == 'BUY', "🟢 買入", "🔴 賣出"),
+                    "股票": td['symbol'],
+                    "股數": td['shares'],
+                    "價格": td['price'].map("${:.2f}".format),
+                    "金額": td['value'].map("${:,.0f}".format),
+                    "原因": td['reason'].fillna('-'),
                     # 處理 momentum 或 adjusted_momentum
-                    mom_val = trade.get('momentum') or trade.get('adjusted_momentum', '-')
-                    trade_data.append({
-                        "日期": trade['date'],
-                        "動作": "🟢 買入" if trade['action'] == 'BUY' else "🔴 賣出",
-                        "股票": trade['symbol'],
-                        "股數": trade['shares'],
-                        "價格": f"${trade['price']:.2f}",
-                        "金額": f"${trade['value']:,.0f}",
-                        "原因": trade.get('reason', '-'),
-                        "動能": mom_val
-                    })
-
-                st.dataframe(pd.DataFrame(trade_data), use_container_width=True, hide_index=True)
+                    "動能": td['momentum'].fillna(td['adjusted_momentum']).fillna('-'),
+                }), use_container_width=True, hide_index=True)
                 st.caption(f"顯示最近 50 筆交易 (共 {len(trades)} 筆)")
 
         # ========== 策略說明 ==========
@@ -6657,14 +6859,9 @@ def render_momentum_rotation():
         st.info("測試不同參數組合的績效穩定性")
 
         if st.button("執行魯棒性檢測", key="run_robust_btn"):
-            robust_portfolio = PortfolioStrategy(str(FINANCE_DB_PATH))
             with st.spinner("正在進行參數敏感度分析... (可能需要數分鐘)"):
-                robust_result = robust_portfolio.robustness_test(
-                    symbols=None,
-                    initial_capital=initial_capital,
-                    market=selected_market,
-                    start_date=mom_start_date,
-                    end_date=mom_end_date
+                robust_result = _run_cached_backtest(
+                    _cached_robustness, selected_market, initial_capital, mom_start_date, mom_end_date
                 )
 
             if 'error' in robust_result:
@@ -6748,20 +6945,15 @@ def render_momentum_rotation():
             wf_test = st.slider("測試期 (月)", min_value=1, max_value=6, value=3, key="wf_test")
 
         if st.button("執行走動式評估", key="run_wf_btn"):
-            wf_portfolio = PortfolioStrategy(str(FINANCE_DB_PATH))
             with st.spinner("正在進行走動式評估... (可能需要較長時間)"):
-                wf_result = wf_portfolio.walk_forward_analysis(
-                    symbols=None,
-                    initial_capital=initial_capital,
-                    market=selected_market,
-                    start_date=mom_start_date,
-                    end_date=mom_end_date,
-                    train_months=wf_train,
-                    test_months=wf_test,
-                    vol_adjusted=use_vol_adjust
+                wf_result = _run_cached_backtest(
+                    _cached_walk_forward, selected_market, initial_capital, mom_start_date, mom_end_date,
+                    wf_train, wf_test, use_vol_adjust
                 )
 
-            if 'error' in wf_result.get('summary', {}):
+            if 'error' in wf_result:
+                st.error(wf_result['error'])
+            elif 'error' in wf_result.get('summary', {}):
                 st.error(wf_result['summary']['error'])
             else:
                 wf_summary = wf_result['summary']
@@ -6782,27 +6974,26 @@ def render_momentum_rotation():
                 # 各視窗結果
                 st.markdown("#### 📋 各視窗結果")
                 window_df = pd.DataFrame(wf_result['window_results'])
-                window_df['test_return'] = window_df['test_return'].round(2)
-                window_df['test_sharpe'] = window_df['test_sharpe'].round(3)
-                window_df['test_max_dd'] = window_df['test_max_dd'].round(2)
-                window_df['train_sharpe'] = window_df['train_sharpe'].round(3)
 
-                # 根據報酬率著色
-                def color_returns(val):
-                    if isinstance(val, (int, float)):
-                        color = 'green' if val > 0 else 'red'
-                        return f'color: {color}'
-                    return ''
+                # 根據報酬率著色（整欄一次產生 CSS）
+                def color_returns(col):
+                    return np.where(col > 0, 'color: green', 'color: red')
 
-                styled_df = window_df.style.applymap(color_returns, subset=['test_return'])
-                st.dataframe(window_df, use_container_width=True, hide_index=True)
+                # 只在顯示時格式化小數位數，不複製、不改動原始數值
+                styled_df = window_df.style.apply(color_returns, subset=['test_return']).format({
+                    'test_return': '{:.2f}',
+                    'test_sharpe': '{:.3f}',
+                    'test_max_dd': '{:.2f}',
+                    'train_sharpe': '{:.3f}',
+                })
+                st.dataframe(styled_df, use_container_width=True, hide_index=True)
 
                 # 視覺化各視窗報酬
                 fig_wf = go.Figure()
                 fig_wf.add_trace(go.Bar(
                     x=window_df['test_period'],
-                    y=window_df['test_return'],
-                    marker_color=['green' if r > 0 else 'red' for r in window_df['test_return']],
+                    y=window_df['test_return'].round(2),
+                    marker_color=np.where(window_df['test_return'].to_numpy() > 0, 'green', 'red'),
                     name='測試期報酬'
                 ))
                 fig_wf.update_layout(
@@ -6828,12 +7019,20 @@ def render_watchlist_page():
         st.warning("追蹤清單為空")
         return
 
-    # 依市場分組
-    us_stocks = [s for s in watchlist if s.get("market") == "US"]
-    tw_stocks = [s for s in watchlist if s.get("market") == "TW"]
-    etf_stocks = [s for s in watchlist if s.get("market") == "ETF"]
-    index_stocks = [s for s in watchlist if s.get("market") == "INDEX"]
-    other_stocks = [s for s in watchlist if s.get("market") not in ["US", "TW", "ETF", "INDEX"]]
+    # 依市場分組，同時統計市場與產業分佈（單次掃描）
+    by_market = defaultdict(list)
+    markets = Counter()
+    sectors = Counter()
+    for s in watchlist:
+        market = s.get("market")
+        by_market[market if market in ("US", "TW", "ETF", "INDEX") else "OTHER"].append(s)
+        markets[market or "-"] += 1
+        sectors[s.get("sector") or "未分類"] += 1
+    us_stocks = by_market["US"]
+    tw_stocks = by_market["TW"]
+    etf_stocks = by_market["ETF"]
+    index_stocks = by_market["INDEX"]
+    other_stocks = by_market["OTHER"]
 
     # 統計
     col1, col2, col3, col4 = st.columns(4)
@@ -6863,12 +7062,9 @@ def render_watchlist_page():
             return
 
         # 依產業分組
-        by_sector = {}
+        by_sector = defaultdict(list)
         for s in stocks:
-            sec = s.get("sector") or "未分類"
-            if sec not in by_sector:
-                by_sector[sec] = []
-            by_sector[sec].append(s)
+            by_sector[s.get("sector") or "未分類"].append(s)
 
         # 產業篩選
         sectors = ["全部"] + sorted(by_sector.keys())
@@ -6879,16 +7075,14 @@ def render_watchlist_page():
 
         for sector, sector_stocks in sorted(by_sector.items()):
             with st.expander(f"**{sector}** ({len(sector_stocks)} 檔)", expanded=True):
-                table_data = []
-                for s in sector_stocks:
-                    row = {
-                        "代碼": s["symbol"],
-                        "名稱": s.get("name") or s["symbol"],
-                        "細分產業": s.get("industry") or "-",
-                    }
-                    if show_market:
-                        row["市場"] = s.get("market") or "-"
-                    table_data.append(row)
+                # 直接以欄位清單建表，省去逐列 dict 與欄位推斷
+                table_data = {
+                    "代碼": [s["symbol"] for s in sector_stocks],
+                    "名稱": [s.get("name") or s["symbol"] for s in sector_stocks],
+                    "細分產業": [s.get("industry") or "-" for s in sector_stocks],
+                }
+                if show_market:
+                    table_data["市場"] = [s.get("market") or "-" for s in sector_stocks]
 
                 df = pd.DataFrame(table_data)
                 st.dataframe(df, use_container_width=True, hide_index=True)
@@ -6907,11 +7101,11 @@ def render_watchlist_page():
     with tab3:
         st.subheader("📊 ETF 清單")
         if etf_stocks:
-            table_data = [{
-                "代碼": s["symbol"],
-                "名稱": s.get("name") or s["symbol"],
-                "說明": s.get("description") or "-"
-            } for s in etf_stocks]
+            table_data = {
+                "代碼": [s["symbol"] for s in etf_stocks],
+                "名稱": [s.get("name") or s["symbol"] for s in etf_stocks],
+                "說明": [s.get("description") or "-" for s in etf_stocks],
+            }
             st.dataframe(pd.DataFrame(table_data), use_container_width=True, hide_index=True)
         else:
             st.info("目前沒有 ETF")
@@ -6920,10 +7114,10 @@ def render_watchlist_page():
     with tab4:
         st.subheader("📈 指數清單")
         if index_stocks:
-            table_data = [{
-                "代碼": s["symbol"],
-                "名稱": s.get("name") or s["symbol"],
-            } for s in index_stocks]
+            table_data = {
+                "代碼": [s["symbol"] for s in index_stocks],
+                "名稱": [s.get("name") or s["symbol"] for s in index_stocks],
+            }
             st.dataframe(pd.DataFrame(table_data), use_container_width=True, hide_index=True)
         else:
             st.info("目前沒有指數")
@@ -6952,15 +7146,28 @@ def render_watchlist_page():
 
 
 # ========== 總經分析頁面 ==========
+# 總經頁面卡片樣式（固定字串，每次渲染只注入一次，卡片本身只帶顏色）
+MACRO_CARD_CSS = """
+<style>
+.phase-card { padding: 20px; border-radius: 10px; text-align: center; color: white; }
+.phase-card h2 { color: white; margin: 0; }
+.phase-card p { color: white; margin: 5px 0 0 0; }
+.dim-card { border-left: 4px solid; padding: 15px; border-radius: 5px; }
+.dim-card h4 { margin: 0; }
+.dim-card p { margin: 0; font-size: 12px; }
+.dim-card p.dim-score { margin: 5px 0; font-size: 24px; font-weight: bold; }
+</style>
+"""
+
+
 def render_macro_analysis_page():
     """總經分析與市場週期頁面"""
     st.title("🌍 總經分析與市場週期")
+    st.markdown(MACRO_CARD_CSS, unsafe_allow_html=True)
 
     # 初始化
     try:
-        macro_db = MacroDatabase()
-        cycle_analyzer = MarketCycleAnalyzer(db=macro_db)
-        strategy_selector = CycleBasedStrategySelector(macro_db=macro_db)
+        macro_db, cycle_analyzer, strategy_selector = get_macro_stack()
     except Exception as e:
         st.error(f"初始化失敗: {e}")
         st.info("請先執行 `python macro_scheduler.py --full` 收集總經數據")
@@ -6982,12 +7189,12 @@ def render_macro_analysis_page():
 
         with col1:
             phase_color = current_cycle.get("phase_color", "#888888")
-            st.markdown(f"""
-            <div style="background-color: {phase_color}; padding: 20px; border-radius: 10px; text-align: center;">
-                <h2 style="color: white; margin: 0;">{current_cycle.get('phase_emoji', '')} {current_cycle.get('phase_name', current_cycle['phase'])}</h2>
-                <p style="color: white; margin: 5px 0 0 0;">當前市場週期</p>
-            </div>
-            """, unsafe_allow_html=True)
+            st.markdown(
+                f'<div class="phase-card" style="background-color: {phase_color};">'
+                f"<h2>{current_cycle.get('phase_emoji', '')} {current_cycle.get('phase_name', current_cycle['phase'])}</h2>"
+                "<p>當前市場週期</p></div>",
+                unsafe_allow_html=True
+            )
 
         with col2:
             score = current_cycle.get("score", 0)
@@ -7005,27 +7212,24 @@ def render_macro_analysis_page():
 
     st.divider()
 
-    # 分頁
-    tab1, tab2, tab3, tab4, tab5 = st.tabs(["📊 市場週期", "📈 總經指標", "📉 歷史趨勢", "💡 策略建議", "🔬 策略回測"])
+    # 分頁切換：st.tabs 會執行所有分頁，改用 radio 只渲染目前選取的分頁
+    active_tab = st.radio(
+        "分頁",
+        ["📊 市場週期", "📈 總經指標", "📉 歷史趨勢", "💡 策略建議", "🔬 策略回測"],
+        horizontal=True,
+        label_visibility="collapsed",
+        key="macro_sub_tab"
+    )
 
-    # Tab 1: 市場週期
-    with tab1:
+    if active_tab == "📊 市場週期":
         render_macro_cycle_tab(current_cycle, macro_db)
-
-    # Tab 2: 總經指標
-    with tab2:
+    elif active_tab == "📈 總經指標":
         render_macro_indicators_tab(macro_db)
-
-    # Tab 3: 歷史趨勢
-    with tab3:
+    elif active_tab == "📉 歷史趨勢":
         render_macro_history_tab(macro_db)
-
-    # Tab 4: 策略建議
-    with tab4:
+    elif active_tab == "💡 策略建議":
         render_macro_strategy_tab(current_strategy, strategy_selector)
-
-    # Tab 5: 策略回測
-    with tab5:
+    elif active_tab == "🔬 策略回測":
         render_backtest_tab(macro_db)
 
 
@@ -7071,14 +7275,12 @@ def render_macro_cycle_tab(current_cycle, macro_db):
             else:
                 color = "#ff4444"
 
-            st.markdown(f"""
-            <div style="background-color: {color}20; border-left: 4px solid {color}; padding: 15px; border-radius: 5px;">
-                <h4 style="margin: 0;">{dim_name}</h4>
-                <p style="margin: 5px 0; font-size: 24px; font-weight: bold;">{score:.2f}</p>
-                <p style="margin: 0; font-size: 12px;">信號: {signal}</p>
-                <p style="margin: 0; font-size: 12px;">權重: {weight:.0%}</p>
-            </div>
-            """, unsafe_allow_html=True)
+            st.markdown(
+                f'<div class="dim-card" style="background-color: {color}20; border-color: {color};">'
+                f'<h4>{dim_name}</h4><p class="dim-score">{score:.2f}</p>'
+                f"<p>信號: {signal}</p><p>權重: {weight:.0%}</p></div>",
+                unsafe_allow_html=True
+            )
 
             # 顯示詳細資料
             details = data.get("details", {})
@@ -7091,7 +7293,12 @@ def render_macro_cycle_tab(current_cycle, macro_db):
                             else:
                                 st.write(f"**{key}**: {value}")
 
-    # 週期歷史
+    render_cycle_history()
+
+
+@st.fragment
+def render_cycle_history():
+    """週期歷史記錄（fragment：調整年份只重跑本區塊，不重建上方各維度卡片）"""
     st.divider()
     st.subheader("週期歷史記錄")
 
@@ -7106,16 +7313,12 @@ def render_macro_cycle_tab(current_cycle, macro_db):
         st.error("起始年份不能大於結束年份")
     else:
         try:
-            backtester = CycleBacktester(macro_db=macro_db)
             start_date = date(cycle_start_year, 1, 1)
             end_date = date(cycle_end_year, 12, 31) if cycle_end_year < 2026 else date.today()
 
-            cycles = backtester.get_historical_cycles(start_date, end_date)
-
-            if cycles:
-                history_df = pd.DataFrame(cycles)
-                history_df["date"] = pd.to_datetime(history_df["date"])
+            history_df = _cached_historical_cycles(start_date, end_date)
 
+            if not history_df.empty:
                 # 週期分數走勢圖 (帶顏色標記週期)
                 fig = go.Figure()
 
@@ -7128,9 +7331,11 @@ def render_macro_cycle_tab(current_cycle, macro_db):
                 }
 
                 from config.macro_indicators import MARKET_CYCLES
-                for phase in phase_colors.keys():
-                    phase_data = history_df[history_df["phase"] == phase]
-                    if not phase_data.empty:
+                # 一次分組，依 phase_colors 順序加入（保持圖例順序）
+                phase_groups = history_df.groupby("phase", sort=False)
+                for phase, color in phase_colors.items():
+                    if phase in phase_groups.groups:
+                        phase_data = phase_groups.get_group(phase)
                         phase_info = MARKET_CYCLES.get(phase, {})
                         phase_name = phase_info.get("name", phase)
 
@@ -7139,7 +7344,7 @@ def render_macro_cycle_tab(current_cycle, macro_db):
                             y=phase_data["score"],
                             mode="markers",
                             name=f"{phase_info.get('emoji', '')} {phase_name}",
-                            marker=dict(color=phase_colors[phase], size=8)
+                            marker=dict(color=color, size=8)
                         ))
 
                 # 加入趨勢線
@@ -7276,41 +7481,33 @@ def render_macro_history_tab(macro_db):
         st.info("請選擇至少一個指標")
         return
 
-    # 繪製圖表
-    fig = go.Figure()
+    # 每個指標只查詢一次，圖表與統計摘要共用
+    series_data = {
+        name: _cached_macro_series(indicator_options[name], start_date, end_date)
+        for name in selected_names
+    }
 
+    # 繪製圖表（一次建立所有線條與版面）
+    fill = "tozeroy" if chart_type == "面積圖" else None
+    traces = []
     for name in selected_names:
-        series_id = indicator_options[name]
-        data = macro_db.get_macro_data(series_id, start_date=start_date, end_date=end_date)
-
-        if data:
-            df = pd.DataFrame(data)
-            df["date"] = pd.to_datetime(df["date"])
+        df = series_data[name]
+        if not df.empty:
             df = df.sort_values("date")
-
-            if chart_type == "折線圖":
-                fig.add_trace(go.Scatter(
-                    x=df["date"],
-                    y=df["value"],
-                    mode="lines",
-                    name=name.split(" (")[0]
-                ))
-            else:
-                fig.add_trace(go.Scatter(
-                    x=df["date"],
-                    y=df["value"],
-                    mode="lines",
-                    fill="tozeroy",
-                    name=name.split(" (")[0]
-                ))
-
-    fig.update_layout(
+            traces.append(go.Scatter(
+                x=df["date"],
+                y=df["value"],
+                mode="lines",
+                fill=fill,
+                name=name.split(" (")[0]
+            ))
+    fig = go.Figure(data=traces, layout=dict(
         title=f"指標走勢比較 ({start_year} - {end_year})",
         xaxis_title="日期",
         yaxis_title="數值",
         height=500,
         legend=dict(orientation="h", yanchor="bottom", y=1.02)
-    )
+    ))
     st.plotly_chart(fig, use_container_width=True)
 
     # 顯示統計摘要
@@ -7318,24 +7515,32 @@ def render_macro_history_tab(macro_db):
         st.subheader("期間統計摘要")
         stats_data = []
         for name in selected_names:
-            series_id = indicator_options[name]
-            data = macro_db.get_macro_data(series_id, start_date=start_date, end_date=end_date)
-            if data:
-                values = [d["value"] for d in data if d["value"] is not None]
-                if values:
-                    stats_data.append({
-                        "指標": name.split(" (")[0],
-                        "起始值": f"{values[-1]:.2f}",
-                        "最新值": f"{values[0]:.2f}",
-                        "最高": f"{max(values):.2f}",
-                        "最低": f"{min(values):.2f}",
-                        "平均": f"{sum(values)/len(values):.2f}",
-                        "變化": f"{values[0] - values[-1]:+.2f}"
-                    })
+            # 依日期由新到舊，values[0] 為最新值
+            values = series_data[name]["value"].to_numpy(dtype=np.float64)
+            values = values[~np.isnan(values)]
+            if values.size:
+                stats_data.append({
+                    "指標": name.split(" (")[0],
+                    "起始值": f"{values[-1]:.2f}",
+                    "最新值": f"{values[0]:.2f}",
+                    "最高": f"{values.max():.2f}",
+                    "最低": f"{values.min():.2f}",
+                    "平均": f"{values.mean():.2f}",
+                    "變化": f"{values[0] - values[-1]:+.2f}"
+                })
         if stats_data:
             st.dataframe(pd.DataFrame(stats_data), use_container_width=True, hide_index=True)
 
 
+# 個股多維度評分的維度名稱
+SCORE_DIMENSION_LABELS = {
+    "cycle_fit": "週期契合度",
+    "moat": "稀缺性/護城河",
+    "growth": "未來發展性",
+    "momentum": "動能"
+}
+
+
 def render_macro_strategy_tab(current_strategy, strategy_selector):
     """策略建議分頁 - 多維度評分系統"""
     if not current_strategy:
@@ -7427,13 +7632,7 @@ def render_macro_strategy_tab(current_strategy, strategy_selector):
                     # 展開顯示詳細評分
                     with st.expander(f"查看 {symbol} 評分詳情"):
                         for dim_name, dim_data in scores.items():
-                            dim_labels = {
-                                "cycle_fit": "週期契合度",
-                                "moat": "稀缺性/護城河",
-                                "growth": "未來發展性",
-                                "momentum": "動能"
-                            }
-                            label = dim_labels.get(dim_name, dim_name)
+                            label = SCORE_DIMENSION_LABELS.get(dim_name, dim_name)
                             score = dim_data.get("score", 0)
                             weight = dim_data.get("weight", 0)
                             reasons = dim_data.get("reasons", [])
@@ -7470,13 +7669,7 @@ def render_macro_strategy_tab(current_strategy, strategy_selector):
 
                     with st.expander(f"查看 {symbol} 評分詳情"):
                         for dim_name, dim_data in scores.items():
-                            dim_labels = {
-                                "cycle_fit": "週期契合度",
-                                "moat": "稀缺性/護城河",
-                                "growth": "未來發展性",
-                                "momentum": "動能"
-                            }
-                            label = dim_labels.get(dim_name, dim_name)
+                            label = SCORE_DIMENSION_LABELS.get(dim_name, dim_name)
                             score = dim_data.get("score", 0)
                             reasons = dim_data.get("reasons", [])
 
@@ -7597,24 +7790,28 @@ def render_backtest_tab(macro_db):
                         line=dict(color="#2196F3", width=2)
                     ))
 
-                    # 標記週期
+                    # 標記週期（只標在週期轉換的月份，避免每個點都帶標籤）
                     colors = {"EXPANSION": "green", "PEAK": "orange",
                               "CONTRACTION": "red", "TROUGH": "blue"}
-                    for _, row in equity_df.iterrows():
-                        fig.add_annotation(
-                            x=row["date"],
-                            y=row["value"],
-                            text=row["phase"][:3],
+                    transitions = equity_df[equity_df["phase"].ne(equity_df["phase"].shift())]
+                    annotations = [
+                        dict(
+                            x=d,
+                            y=v,
+                            text=phase[:3],
                             showarrow=False,
                             yshift=10,
-                            font=dict(size=8, color=colors.get(row["phase"], "gray"))
+                            font=dict(size=8, color=colors.get(phase, "gray"))
                         )
+                        for d, v, phase in zip(transitions["date"], transitions["value"], transitions["phase"])
+                    ]
 
                     fig.update_layout(
                         title="策略權益曲線",
                         xaxis_title="日期",
                         yaxis_title="權益價值",
-                        height=400
+                        height=400,
+                        annotations=annotations
                     )
                     st.plotly_chart(fig, use_container_width=True)
 
@@ -7664,453 +7861,518 @@ def render_backtest_tab(macro_db):
                 st.code(traceback.format_exc())
 
 
+@st.cache_data(ttl=3600, show_spinner=False)
+def analyze_stock_correlation(stock: str, corr_days: int, lead_days: int, today: date) -> dict:
+    """
+    計算個股新聞情緒與股價的相關性（純計算，結果快取 1 小時）
+
+    Returns:
+        {corr_sentiment, corr_mentions, avg_mentions, merged_df, analysis_df_len}
+        或數據不足時的 {error}
+    """
+    from src.finance.sentiment_backtest import STOCK_KEYWORDS, POSITIVE_MATCHER, NEGATIVE_MATCHER
+
+    end_date = today
+    start_date = end_date - timedelta(days=corr_days)
+
+    # 取得股票價格
+    conn = sqlite3.connect("finance.db")
+    price_query = """
+        SELECT date, close
+        FROM daily_prices
+        WHERE symbol = ?
+        AND date BETWEEN ? AND ?
+        ORDER BY date
+    """
+    price_df = pd.read_sql_query(price_query, conn, params=(
+        stock,
+        start_date.strftime('%Y-%m-%d'),
+        end_date.strftime('%Y-%m-%d')
+    ))
+    conn.close()
+
+    if price_df.empty:
+        return {"error": f"無法取得 {stock} 的價格數據"}
+
+    price_df['date'] = pd.to_datetime(price_df['date'])
+    close = price_df['close'].to_numpy(dtype=np.float64)
+    return_1d = np.empty_like(close)
+    return_1d[0] = np.nan
+    return_1d[1:] = (close[1:] / close[:-1] - 1.0) * 100.0
+    price_df['return_1d'] = return_1d
+
+    # 計算該股票的每日情緒
+    news_conn = sqlite3.connect("news.db")
+    keywords = STOCK_KEYWORDS.get(stock, [])
+    keyword_conditions = " OR ".join([
+        f"LOWER(title || ' ' || COALESCE(content, '')) LIKE '%{kw.lower()}%'"
+        for kw in keywords
+    ])
+
+    sentiment_query = f"""
+        SELECT
+            DATE(COALESCE(
+                CASE WHEN source_type = 'ptt' THEN published_at ELSE collected_at END,
+                collected_at
+            )) as news_date,
+            title,
+            content
+        FROM news
+        WHERE DATE(COALESCE(
+            CASE WHEN source_type = 'ptt' THEN published_at ELSE collected_at END,
+            collected_at
+        )) BETWEEN ? AND ?
+        AND ({keyword_conditions})
+    """
+
+    # 分批讀取新聞（content 可能很大），每批只保留每日統計，峰值記憶體為 O(chunksize)
+    mentions = defaultdict(int)
+    pos_hits = defaultdict(set)
+    neg_hits = defaultdict(set)
+    for chunk in pd.read_sql_query(sentiment_query, news_conn, params=(
+        start_date.strftime('%Y-%m-%d'),
+        end_date.strftime('%Y-%m-%d')
+    ), chunksize=2000):
+        chunk['text'] = (chunk['title'].fillna('').astype(str) + " " +
+                         chunk['content'].fillna('').astype(str)).str.lower()
+        for news_date, texts in chunk.groupby('news_date')['text']:
+            text_all = texts.str.cat(sep=" ")
+            mentions[news_date] += len(texts)
+            pos_hits[news_date].update(POSITIVE_MATCHER.find(text_all))
+            neg_hits[news_date].update(NEGATIVE_MATCHER.find(text_all))
+    news_conn.close()
+
+    if not mentions:
+        return {"error": f"無法取得 {stock} 的新聞數據"}
+
+    # 計算每日情緒（當日出現的不重複關鍵字數）
+    daily_sentiment = []
+    for news_date in sorted(mentions):
+        pos = len(pos_hits[news_date])
+        neg = len(neg_hits[news_date])
+        total = pos + neg
+        score = (pos - neg) / total if total > 0 else 0
+
+        daily_sentiment.append({
+            'date': news_date,
+            'mentions': mentions[news_date],
+            'sentiment_score': score,
+            'bullish': pos,
+            'bearish': neg
+        })
+
+    sentiment_df = pd.DataFrame(daily_sentiment).astype({
+        'mentions': 'int32', 'bullish': 'int16', 'bearish': 'int16'
+    })
+    sentiment_df['date'] = pd.to_datetime(sentiment_df['date'])
+
+    # 合併數據
+    merged = pd.merge(sentiment_df, price_df, on='date', how='inner')
+
+    if len(merged) < 10:
+        return {"error": "數據點不足，無法進行有效分析"}
+
+    # 計算相關性
+    lag_pad = np.full(lead_days, np.nan)
+    merged['sentiment_lagged'] = np.concatenate([lag_pad, merged['sentiment_score'].to_numpy()[:-lead_days]])
+    merged['mentions_lagged'] = np.concatenate([lag_pad, merged['mentions'].to_numpy()[:-lead_days]])
+    analysis_df = merged.dropna()
+
+    if len(analysis_df) <= 5:
+        return {"error": "數據點不足，無法進行有效分析"}
+
+    return {
+        "corr_sentiment": analysis_df['sentiment_lagged'].corr(analysis_df['return_1d']),
+        "corr_mentions": analysis_df['mentions_lagged'].corr(analysis_df['return_1d']),
+        "avg_mentions": analysis_df['mentions'].mean(),
+        "merged_df": merged,
+        "analysis_df_len": len(analysis_df),
+    }
+
+
+@st.cache_data(ttl=3600, max_entries=256, show_spinner=False)  # 快取 1 小時，最多 256 組圖表
+def build_correlation_figure(merged: pd.DataFrame, symbol: str) -> dict:
+    """建立情緒 vs 股價三列走勢圖（相同數據時直接回傳快取的圖表 dict）"""
+    fig = make_subplots(
+        rows=3, cols=1,
+        shared_xaxes=True,
+        vertical_spacing=0.08,
+        row_heights=[0.4, 0.3, 0.3],
+        subplot_titles=(f"{symbol} 股價", "新聞情緒", "討論次數")
+    )
+
+    # 股價
+    fig.add_trace(
+        go.Scatter(x=merged['date'], y=merged['close'],
+                   name="股價", line=dict(color='#1f77b4', width=2)),
+        row=1, col=1
+    )
+
+    # 情緒
+    colors = np.where(merged['sentiment_score'].to_numpy() > 0, 'green', 'red')
+    fig.add_trace(
+        go.Bar(x=merged['date'], y=merged['sentiment_score'],
+               name="情緒", marker_color=colors, opacity=0.7),
+        row=2, col=1
+    )
+    fig.add_hline(y=0, line_dash="dash", line_color="gray", row=2, col=1)
+
+    # 討論量
+    fig.add_trace(
+        go.Bar(x=merged['date'], y=merged['mentions'],
+               name="討論次數", marker_color='orange', opacity=0.7),
+        row=3, col=1
+    )
+
+    fig.update_layout(height=700, showlegend=False)
+    return fig.to_dict()
+
+
 def render_sentiment_backtest_page():
     """渲染情緒分析頁面 - 熱門股票、關鍵字、情緒與股價相關性"""
     st.title("📉 新聞情緒分析")
     st.markdown("分析每日熱門股票、討論關鍵字、多空情緒，以及與股價的相關性")
 
-    analyzer = DailyHotStocksAnalyzer()
-    backtester = SentimentBacktester()
-
-    # Tab 分頁
-    tab1, tab2, tab3, tab4 = st.tabs([
-        "🔥 今日熱門股票",
-        "📊 熱門關鍵字",
-        "📈 情緒vs股價",
-        "📋 ETF回測"
-    ])
+    # 分頁切換：st.tabs 會執行所有分頁，改用 radio 只渲染目前選取的分頁
+    active_tab = st.radio(
+        "分頁",
+        ["🔥 今日熱門股票", "📊 熱門關鍵字", "📈 情緒vs股價", "📋 ETF回測"],
+        horizontal=True,
+        label_visibility="collapsed",
+        key="sentiment_sub_tab"
+    )
 
-    # ========== Tab 1: 今日熱門股票 ==========
-    with tab1:
-        st.subheader("🔥 今日熱門討論股票")
+    if active_tab == "🔥 今日熱門股票":
+        render_hot_stocks_tab(DailyHotStocksAnalyzer())
+    elif active_tab == "📊 熱門關鍵字":
+        render_trending_keywords_tab(DailyHotStocksAnalyzer())
+    elif active_tab == "📈 情緒vs股價":
+        render_stock_correlation_tab()
+    elif active_tab == "📋 ETF回測":
+        render_etf_backtest_tab(SentimentBacktester())
 
-        # 日期選擇
-        col1, col2 = st.columns([1, 3])
-        with col1:
-            analysis_date = st.date_input(
-                "選擇日期",
-                value=date.today() - timedelta(days=1),
-                max_value=date.today(),
-                key="hot_stocks_date"
-            )
 
-        with st.spinner("分析中..."):
-            daily_summary = analyzer.get_daily_summary(analysis_date)
+def render_hot_stocks_tab(analyzer: DailyHotStocksAnalyzer):
+    """情緒分析 - 今日熱門股票"""
+    st.subheader("🔥 今日熱門討論股票")
 
-        # 整體情緒
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            st.metric("新聞總數", daily_summary["news_count"])
-        with col2:
-            st.metric("正面關鍵字", daily_summary.get("positive_count", 0))
-        with col3:
-            overall = daily_summary.get("overall_sentiment", "無數據")
-            st.metric("整體情緒", overall)
+    # 日期選擇
+    col1, col2 = st.columns([1, 3])
+    with col1:
+        analysis_date = st.date_input(
+            "選擇日期",
+            value=date.today() - timedelta(days=1),
+            max_value=date.today(),
+            key="hot_stocks_date"
+        )
 
-        st.divider()
+    with st.spinner("分析中..."):
+        daily_summary = analyzer.get_daily_summary(analysis_date)
 
-        # 熱門股票表格
-        hot_stocks = daily_summary.get("hot_stocks", [])
-        if hot_stocks:
-            st.markdown("### 📋 討論熱度排行")
-
-            table_data = []
-            for stock in hot_stocks[:15]:
-                table_data.append({
-                    "排名": len(table_data) + 1,
-                    "股票": stock["symbol"],
-                    "討論次數": stock["mentions"],
-                    "看多": stock["bullish"],
-                    "看空": stock["bearish"],
-                    "情緒": stock["sentiment"],
-                    "情緒分數": f"{stock['sentiment_score']:.2f}"
-                })
+    # 整體情緒
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("新聞總數", daily_summary["news_count"])
+    with col2:
+        st.metric("正面關鍵字", daily_summary.get("positive_count", 0))
+    with col3:
+        overall = daily_summary.get("overall_sentiment", "無數據")
+        st.metric("整體情緒", overall)
 
-            df = pd.DataFrame(table_data)
-            st.dataframe(df, use_container_width=True, hide_index=True)
+    st.divider()
 
-            # 討論熱度圖
-            st.markdown("### 📊 討論熱度分佈")
-            fig = go.Figure()
+    # 熱門股票表格
+    hot_stocks = daily_summary.get("hot_stocks", [])
+    if hot_stocks:
+        st.markdown("### 📋 討論熱度排行")
+
+        table_data = []
+        for stock in hot_stocks[:15]:
+            table_data.append({
+                "排名": len(table_data) + 1,
+                "股票": stock["symbol"],
+                "討論次數": stock["mentions"],
+                "看多": stock["bullish"],
+                "看空": stock["bearish"],
+                "情緒": stock["sentiment"],
+                "情緒分數": f"{stock['sentiment_score']:.2f}"
+            })
 
-            symbols = [s["symbol"] for s in hot_stocks[:10]]
-            mentions = [s["mentions"] for s in hot_stocks[:10]]
-            sentiments = [s["sentiment_score"] for s in hot_stocks[:10]]
-            colors = ['green' if s > 0.2 else ('red' if s < -0.2 else 'gray') for s in sentiments]
-
-            fig.add_trace(go.Bar(
-                x=symbols,
-                y=mentions,
-                marker_color=colors,
-                text=mentions,
-                textposition='outside'
-            ))
+        df = pd.DataFrame(table_data)
+        st.dataframe(df, use_container_width=True, hide_index=True)
 
-            fig.update_layout(
-                xaxis_title="股票",
-                yaxis_title="討論次數",
-                height=400
-            )
-            st.plotly_chart(fig, use_container_width=True)
+        # 討論熱度圖
+        st.markdown("### 📊 討論熱度分佈")
+        fig = go.Figure()
 
-            # 範例新聞標題
-            st.markdown("### 📰 熱門股票相關新聞")
-            for stock in hot_stocks[:5]:
-                if stock.get("sample_titles"):
-                    with st.expander(f"**{stock['symbol']}** {stock['sentiment']} ({stock['mentions']} 則)"):
-                        for title in stock["sample_titles"]:
-                            st.markdown(f"• {title}")
-        else:
-            st.info("該日無足夠新聞數據")
+        symbols = [s["symbol"] for s in hot_stocks[:10]]
+        mentions = [s["mentions"] for s in hot_stocks[:10]]
+        sentiments = [s["sentiment_score"] for s in hot_stocks[:10]]
+        colors = np.array(['red', 'gray', 'green'])[sentiment_level(sentiments)].tolist()
+
+        fig.add_trace(go.Bar(
+            x=symbols,
+            y=mentions,
+            marker_color=colors,
+            text=mentions,
+            textposition='outside'
+        ))
 
-        # 一週熱門
-        st.divider()
-        st.markdown("### 📅 本週熱門股票 (過去7天)")
+        fig.update_layout(
+            xaxis_title="股票",
+            yaxis_title="討論次數",
+            height=400
+        )
+        st.plotly_chart(fig, use_container_width=True)
 
-        with st.spinner("分析中..."):
-            weekly_hot = analyzer.get_weekly_hot_stocks(analysis_date, days=7)
-
-        if weekly_hot:
-            weekly_data = []
-            for stock in weekly_hot[:20]:
-                weekly_data.append({
-                    "股票": stock["symbol"],
-                    "總討論次數": stock["total_mentions"],
-                    "出現天數": stock["days_mentioned"],
-                    "看多": stock["bullish"],
-                    "看空": stock["bearish"],
-                    "情緒": stock["sentiment"]
-                })
+        # 範例新聞標題
+        st.markdown("### 📰 熱門股票相關新聞")
+        for stock in hot_stocks[:5]:
+            if stock.get("sample_titles"):
+                with st.expander(f"**{stock['symbol']}** {stock['sentiment']} ({stock['mentions']} 則)"):
+                    for title in stock["sample_titles"]:
+                        st.markdown(f"• {title}")
+    else:
+        st.info("該日無足夠新聞數據")
 
-            df_weekly = pd.DataFrame(weekly_data)
-            st.dataframe(df_weekly, use_container_width=True, hide_index=True)
+    # 一週熱門
+    st.divider()
+    st.markdown("### 📅 本週熱門股票 (過去7天)")
+
+    with st.spinner("分析中..."):
+        weekly_hot = analyzer.get_weekly_hot_stocks(analysis_date, days=7)
+
+    if weekly_hot:
+        weekly_data = []
+        for stock in weekly_hot[:20]:
+            weekly_data.append({
+                "股票": stock["symbol"],
+                "總討論次數": stock["total_mentions"],
+                "出現天數": stock["days_mentioned"],
+                "看多": stock["bullish"],
+                "看空": stock["bearish"],
+                "情緒": stock["sentiment"]
+            })
 
-    # ========== Tab 2: 熱門關鍵字 ==========
-    with tab2:
-        st.subheader("📊 熱門討論關鍵字")
+        df_weekly = pd.DataFrame(weekly_data)
+        st.dataframe(df_weekly, use_container_width=True, hide_index=True)
 
-        col1, col2 = st.columns([1, 3])
-        with col1:
-            keyword_date = st.date_input(
-                "選擇日期",
-                value=date.today() - timedelta(days=1),
-                max_value=date.today(),
-                key="keywords_date"
-            )
 
-        with st.spinner("分析中..."):
-            daily_summary = analyzer.get_daily_summary(keyword_date)
-
-        trending = daily_summary.get("trending_keywords", [])
-
-        if trending:
-            # 關鍵字表格
-            kw_data = []
-            for kw in trending:
-                kw_data.append({
-                    "關鍵字": kw["keyword"],
-                    "討論次數": kw["mentions"],
-                    "正面": kw["bullish"],
-                    "負面": kw["bearish"],
-                    "情緒": kw["sentiment"]
-                })
+def render_trending_keywords_tab(analyzer: DailyHotStocksAnalyzer):
+    """情緒分析 - 熱門關鍵字"""
+    st.subheader("📊 熱門討論關鍵字")
 
-            df_kw = pd.DataFrame(kw_data)
-            st.dataframe(df_kw, use_container_width=True, hide_index=True)
+    col1, col2 = st.columns([1, 3])
+    with col1:
+        keyword_date = st.date_input(
+            "選擇日期",
+            value=date.today() - timedelta(days=1),
+            max_value=date.today(),
+            key="keywords_date"
+        )
 
-            # 關鍵字雲圖（用柱狀圖代替）
-            st.markdown("### 📊 關鍵字熱度")
-            fig = go.Figure()
+    with st.spinner("分析中..."):
+        daily_summary = analyzer.get_daily_summary(keyword_date)
+
+    trending = daily_summary.get("trending_keywords", [])
+
+    if trending:
+        # 關鍵字表格
+        kw_data = []
+        for kw in trending:
+            kw_data.append({
+                "關鍵字": kw["keyword"],
+                "討論次數": kw["mentions"],
+                "正面": kw["bullish"],
+                "負面": kw["bearish"],
+                "情緒": kw["sentiment"]
+            })
 
-            keywords = [k["keyword"] for k in trending[:12]]
-            counts = [k["mentions"] for k in trending[:12]]
-            sentiments = [k["sentiment_score"] for k in trending[:12]]
-            colors = ['green' if s > 0.2 else ('red' if s < -0.2 else 'orange') for s in sentiments]
-
-            fig.add_trace(go.Bar(
-                y=keywords[::-1],
-                x=counts[::-1],
-                orientation='h',
-                marker_color=colors[::-1],
-                text=counts[::-1],
-                textposition='outside'
-            ))
+        df_kw = pd.DataFrame(kw_data)
+        st.dataframe(df_kw, use_container_width=True, hide_index=True)
 
-            fig.update_layout(
-                xaxis_title="討論次數",
-                yaxis_title="關鍵字",
-                height=500
-            )
-            st.plotly_chart(fig, use_container_width=True)
-        else:
-            st.info("該日無足夠新聞數據")
+        # 關鍵字雲圖（用柱狀圖代替）
+        st.markdown("### 📊 關鍵字熱度")
+        fig = go.Figure()
 
-    # ========== Tab 3: 情緒 vs 股價相關性 ==========
-    with tab3:
-        st.subheader("📈 個股情緒 vs 股價相關性分析")
+        keywords = [k["keyword"] for k in trending[:12]]
+        counts = [k["mentions"] for k in trending[:12]]
+        sentiments = [k["sentiment_score"] for k in trending[:12]]
+        colors = np.array(['red', 'orange', 'green'])[sentiment_level(sentiments)].tolist()
+
+        fig.add_trace(go.Bar(
+            y=keywords[::-1],
+            x=counts[::-1],
+            orientation='h',
+            marker_color=colors[::-1],
+            text=counts[::-1],
+            textposition='outside'
+        ))
 
-        # 選擇股票
-        col1, col2, col3 = st.columns(3)
+        fig.update_layout(
+            xaxis_title="討論次數",
+            yaxis_title="關鍵字",
+            height=500
+        )
+        st.plotly_chart(fig, use_container_width=True)
+    else:
+        st.info("該日無足夠新聞數據")
 
-        with col1:
-            # 從 STOCK_KEYWORDS 取得股票列表
-            from src.finance.sentiment_backtest import STOCK_KEYWORDS
-            stock_options = list(STOCK_KEYWORDS.keys())
-            selected_stock = st.selectbox("選擇股票", stock_options, index=0)
 
-        with col2:
-            corr_days = st.selectbox(
-                "分析期間",
-                [30, 60, 90, 180],
-                index=2,
-                format_func=lambda x: f"{x} 天"
-            )
+def render_stock_correlation_tab():
+    """情緒分析 - 個股情緒 vs 股價相關性"""
+    st.subheader("📈 個股情緒 vs 股價相關性分析")
 
-        with col3:
-            lead_days = st.selectbox(
-                "領先天數",
-                [1, 2, 3, 5],
-                index=0,
-                help="情緒領先股價多少天",
-                key="stock_lead_days"
-            )
+    # 選擇股票
+    col1, col2, col3 = st.columns(3)
 
-        if st.button("🔍 分析相關性", type="primary"):
-            with st.spinner(f"分析 {selected_stock} 情緒與股價相關性..."):
-                # 計算該股票的每日情緒
-                end_date = date.today()
-                start_date = end_date - timedelta(days=corr_days)
-
-                # 取得股票價格
-                conn = sqlite3.connect("finance.db")
-                price_query = """
-                    SELECT date, close
-                    FROM daily_prices
-                    WHERE symbol = ?
-                    AND date BETWEEN ? AND ?
-                    ORDER BY date
-                """
-                price_df = pd.read_sql_query(price_query, conn, params=(
-                    selected_stock,
-                    start_date.strftime('%Y-%m-%d'),
-                    end_date.strftime('%Y-%m-%d')
-                ))
-                conn.close()
+    with col1:
+        # 從 STOCK_KEYWORDS 取得股票列表
+        from src.finance.sentiment_backtest import STOCK_KEYWORDS
+        stock_options = list(STOCK_KEYWORDS.keys())
+        selected_stock = st.selectbox("選擇股票", stock_options, index=0)
 
-                if price_df.empty:
-                    st.warning(f"無法取得 {selected_stock} 的價格數據")
-                else:
-                    price_df['date'] = pd.to_datetime(price_df['date'])
-                    price_df['return_1d'] = price_df['close'].pct_change(1) * 100
-
-                    # 計算該股票的每日情緒
-                    news_conn = sqlite3.connect("news.db")
-                    keywords = STOCK_KEYWORDS.get(selected_stock, [])
-                    keyword_conditions = " OR ".join([
-                        f"LOWER(title || ' ' || COALESCE(content, '')) LIKE '%{kw.lower()}%'"
-                        for kw in keywords
-                    ])
-
-                    sentiment_query = f"""
-                        SELECT
-                            DATE(COALESCE(
-                                CASE WHEN source_type = 'ptt' THEN published_at ELSE collected_at END,
-                                collected_at
-                            )) as news_date,
-                            title,
-                            content
-                        FROM news
-                        WHERE DATE(COALESCE(
-                            CASE WHEN source_type = 'ptt' THEN published_at ELSE collected_at END,
-                            collected_at
-                        )) BETWEEN ? AND ?
-                        AND ({keyword_conditions})
-                    """
-
-                    news_df = pd.read_sql_query(sentiment_query, news_conn, params=(
-                        start_date.strftime('%Y-%m-%d'),
-                        end_date.strftime('%Y-%m-%d')
-                    ))
-                    news_conn.close()
+    with col2:
+        corr_days = st.selectbox(
+            "分析期間",
+            [30, 60, 90, 180],
+            index=2,
+            format_func=lambda x: f"{x} 天"
+        )
 
-                    if news_df.empty:
-                        st.warning(f"無法取得 {selected_stock} 的新聞數據")
-                    else:
-                        # 計算每日情緒
-                        from src.finance.sentiment_backtest import POSITIVE_KEYWORDS, NEGATIVE_KEYWORDS
-
-                        daily_sentiment = []
-                        for news_date, group in news_df.groupby('news_date'):
-                            text_all = " ".join([
-                                (str(row['title']) + " " + str(row['content'] or "")).lower()
-                                for _, row in group.iterrows()
-                            ])
-                            pos = sum(1 for kw in POSITIVE_KEYWORDS if kw in text_all)
-                            neg = sum(1 for kw in NEGATIVE_KEYWORDS if kw in text_all)
-                            total = pos + neg
-                            score = (pos - neg) / total if total > 0 else 0
-
-                            daily_sentiment.append({
-                                'date': news_date,
-                                'mentions': len(group),
-                                'sentiment_score': score,
-                                'bullish': pos,
-                                'bearish': neg
-                            })
-
-                        sentiment_df = pd.DataFrame(daily_sentiment)
-                        sentiment_df['date'] = pd.to_datetime(sentiment_df['date'])
-
-                        # 合併數據
-                        merged = pd.merge(sentiment_df, price_df, on='date', how='inner')
-
-                        if len(merged) < 10:
-                            st.warning("數據點不足，無法進行有效分析")
-                        else:
-                            # 計算相關性
-                            merged['sentiment_lagged'] = merged['sentiment_score'].shift(lead_days)
-                            merged['mentions_lagged'] = merged['mentions'].shift(lead_days)
-                            analysis_df = merged.dropna()
-
-                            if len(analysis_df) > 5:
-                                corr_sentiment = analysis_df['sentiment_lagged'].corr(analysis_df['return_1d'])
-                                corr_mentions = analysis_df['mentions_lagged'].corr(analysis_df['return_1d'])
-
-                                # 顯示結果
-                                st.success(f"✅ 分析完成！共 {len(analysis_df)} 個數據點")
-
-                                col1, col2, col3 = st.columns(3)
-                                with col1:
-                                    st.metric(
-                                        "情緒-報酬相關性",
-                                        f"{corr_sentiment:.4f}",
-                                        help="正值表示情緒正面時股價傾向上漲"
-                                    )
-                                with col2:
-                                    st.metric(
-                                        "討論量-報酬相關性",
-                                        f"{corr_mentions:.4f}",
-                                        help="正值表示討論增加時股價傾向上漲"
-                                    )
-                                with col3:
-                                    avg_mentions = analysis_df['mentions'].mean()
-                                    st.metric("平均每日討論", f"{avg_mentions:.1f} 則")
-
-                                # 結論
-                                st.divider()
-                                st.markdown("### 📝 分析結論")
-
-                                if abs(corr_sentiment) > 0.15:
-                                    st.success(f"✅ {selected_stock} 的新聞情緒與股價有較強相關性 ({corr_sentiment:.3f})")
-                                elif abs(corr_sentiment) > 0.08:
-                                    st.warning(f"⚠️ {selected_stock} 的新聞情緒與股價有弱相關性 ({corr_sentiment:.3f})")
-                                else:
-                                    st.info(f"ℹ️ {selected_stock} 的新聞情緒與股價幾乎無相關 ({corr_sentiment:.3f})")
-
-                                if corr_mentions > 0.1:
-                                    st.info("💡 討論量增加時，股價傾向上漲")
-                                elif corr_mentions < -0.1:
-                                    st.info("💡 討論量增加時，股價傾向下跌（可能是利空消息）")
-
-                                # 走勢圖
-                                st.divider()
-                                st.markdown("### 📊 情緒 vs 股價走勢")
-
-                                fig = make_subplots(
-                                    rows=3, cols=1,
-                                    shared_xaxes=True,
-                                    vertical_spacing=0.08,
-                                    row_heights=[0.4, 0.3, 0.3],
-                                    subplot_titles=(f"{selected_stock} 股價", "新聞情緒", "討論次數")
-                                )
-
-                                # 股價
-                                fig.add_trace(
-                                    go.Scatter(x=merged['date'], y=merged['close'],
-                                              name="股價", line=dict(color='#1f77b4', width=2)),
-                                    row=1, col=1
-                                )
-
-                                # 情緒
-                                colors = ['green' if s > 0 else 'red' for s in merged['sentiment_score']]
-                                fig.add_trace(
-                                    go.Bar(x=merged['date'], y=merged['sentiment_score'],
-                                          name="情緒", marker_color=colors, opacity=0.7),
-                                    row=2, col=1
-                                )
-                                fig.add_hline(y=0, line_dash="dash", line_color="gray", row=2, col=1)
-
-                                # 討論量
-                                fig.add_trace(
-                                    go.Bar(x=merged['date'], y=merged['mentions'],
-                                          name="討論次數", marker_color='orange', opacity=0.7),
-                                    row=3, col=1
-                                )
-
-                                fig.update_layout(height=700, showlegend=False)
-                                st.plotly_chart(fig, use_container_width=True)
-
-    # ========== Tab 4: ETF 回測 ==========
-    with tab4:
-        st.subheader("📋 整體市場情緒 vs ETF 回測")
+    with col3:
+        lead_days = st.selectbox(
+            "領先天數",
+            [1, 2, 3, 5],
+            index=0,
+            help="情緒領先股價多少天",
+            key="stock_lead_days"
+        )
 
-        col1, col2 = st.columns(2)
-        with col1:
-            lookback_days = st.selectbox(
-                "回測期間",
-                [30, 90, 180, 365],
-                index=2,
-                format_func=lambda x: f"{x} 天",
-                key="etf_lookback"
-            )
-        with col2:
-            etf_options = ["SPY", "QQQ", "DIA", "IWM", "VGT", "XLF", "XLE", "XLV"]
-            selected_etf = st.selectbox("選擇 ETF", etf_options, index=0, key="etf_select")
+    if st.button("🔍 分析相關性", type="primary"):
+        with st.spinner(f"分析 {selected_stock} 情緒與股價相關性..."):
+            analysis = analyze_stock_correlation(selected_stock, corr_days, lead_days, date.today())
 
-        end_date = date.today()
-        start_date = end_date - timedelta(days=lookback_days)
+        if "error" in analysis:
+            st.warning(analysis["error"])
+        else:
+            corr_sentiment = analysis["corr_sentiment"]
+            corr_mentions = analysis["corr_mentions"]
+            merged = analysis["merged_df"]
 
-        with st.spinner("執行回測..."):
-            result = backtester.run_backtest(
-                etf_symbol=selected_etf,
-                start_date=start_date,
-                end_date=end_date,
-                lead_days=1
-            )
+            # 顯示結果
+            st.success(f"✅ 分析完成！共 {analysis['analysis_df_len']} 個數據點")
 
-        if "error" in result:
-            st.error(result["error"])
-        else:
-            col1, col2, col3, col4 = st.columns(4)
+            col1, col2, col3 = st.columns(3)
             with col1:
-                st.metric("相關係數", f"{result['correlation']:.4f}")
+                st.metric(
+                    "情緒-報酬相關性",
+                    f"{corr_sentiment:.4f}",
+                    help="正值表示情緒正面時股價傾向上漲"
+                )
             with col2:
-                st.metric("整體勝率", f"{result['win_rate']['overall']:.1f}%")
+                st.metric(
+                    "討論量-報酬相關性",
+                    f"{corr_mentions:.4f}",
+                    help="正值表示討論增加時股價傾向上漲"
+                )
             with col3:
-                st.metric("情緒正→漲", f"{result['win_rate']['positive_sentiment_up']:.1f}%")
-            with col4:
-                st.metric("情緒負→跌", f"{result['win_rate']['negative_sentiment_down']:.1f}%")
+                st.metric("平均每日討論", f"{analysis['avg_mentions']:.1f} 則")
 
-            # 多ETF比較
+            # 結論
             st.divider()
-            st.markdown("### 📊 多 ETF 比較")
+            st.markdown("### 📝 分析結論")
 
-            with st.spinner("比較中..."):
-                results = backtester.run_multi_etf_backtest(
-                    etf_symbols=etf_options,
-                    start_date=start_date,
-                    end_date=end_date
-                )
+            if abs(corr_sentiment) > 0.15:
+                st.success(f"✅ {selected_stock} 的新聞情緒與股價有較強相關性 ({corr_sentiment:.3f})")
+            elif abs(corr_sentiment) > 0.08:
+                st.warning(f"⚠️ {selected_stock} 的新聞情緒與股價有弱相關性 ({corr_sentiment:.3f})")
+            else:
+                st.info(f"ℹ️ {selected_stock} 的新聞情緒與股價幾乎無相關 ({corr_sentiment:.3f})")
 
-            if results:
-                comparison_data = [{
-                    "ETF": r["etf_symbol"],
-                    "相關係數": f"{r['correlation']:.4f}",
-                    "勝率": f"{r['win_rate']['overall']:.1f}%",
-                    "正→漲": f"{r['win_rate']['positive_sentiment_up']:.1f}%"
-                } for r in results]
+            if corr_mentions > 0.1:
+                st.info("💡 討論量增加時，股價傾向上漲")
+            elif corr_mentions < -0.1:
+                st.info("💡 討論量增加時，股價傾向下跌（可能是利空消息）")
 
-                st.dataframe(pd.DataFrame(comparison_data), use_container_width=True, hide_index=True)
+            # 走勢圖
+            st.divider()
+            st.markdown("### 📊 情緒 vs 股價走勢")
+
+            st.plotly_chart(build_correlation_figure(merged, selected_stock), use_container_width=True)
+
+
+def render_etf_backtest_tab(backtester: SentimentBacktester):
+    """情緒分析 - 整體市場情緒 vs ETF 回測"""
+    st.subheader("📋 整體市場情緒 vs ETF 回測")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        lookback_days = st.selectbox(
+            "回測期間",
+            [30, 90, 180, 365],
+            index=2,
+            format_func=lambda x: f"{x} 天",
+            key="etf_lookback"
+        )
+    with col2:
+        etf_options = ["SPY", "QQQ", "DIA", "IWM", "VGT", "XLF", "XLE", "XLV"]
+        selected_etf = st.selectbox("選擇 ETF", etf_options, index=0, key="etf_select")
+
+    end_date = date.today()
+    start_date = end_date - timedelta(days=lookback_days)
+
+    with st.spinner("執行回測..."):
+        result = backtester.run_backtest(
+            etf_symbol=selected_etf,
+            start_date=start_date,
+            end_date=end_date,
+            lead_days=1
+        )
+
+    if "error" in result:
+        st.error(result["error"])
+    else:
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("相關係數", f"{result['correlation']:.4f}")
+        with col2:
+            st.metric("整體勝率", f"{result['win_rate']['overall']:.1f}%")
+        with col3:
+            st.metric("情緒正→漲", f"{result['win_rate']['positive_sentiment_up']:.1f}%")
+        with col4:
+            st.metric("情緒負→跌", f"{result['win_rate']['negative_sentiment_down']:.1f}%")
+
+        # 多ETF比較
+        st.divider()
+        st.markdown("### 📊 多 ETF 比較")
+
+        with st.spinner("比較中..."):
+            results = backtester.run_multi_etf_backtest(
+                etf_symbols=etf_options,
+                start_date=start_date,
+                end_date=end_date
+            )
+
+        if results:
+            # 保留數值型別（float32），交由 column_config 格式化，表格可依數值排序
+            comparison_df = pd.DataFrame({
+                "ETF": pd.Categorical([r["etf_symbol"] for r in results]),
+                "相關係數": np.array([r["correlation"] for r in results], dtype=np.float32),
+                "勝率": np.array([r["win_rate"]["overall"] for r in results], dtype=np.float32),
+                "正→漲": np.array([r["win_rate"]["positive_sentiment_up"] for r in results], dtype=np.float32),
+            })
+
+            st.dataframe(
+                comparison_df,
+                use_container_width=True,
+                hide_index=True,
+                column_config={
+                    "相關係數": st.column_config.NumberColumn("相關係數", format="%.4f"),
+                    "勝率": st.column_config.NumberColumn("勝率", format="%.1f%%"),
+                    "正→漲": st.column_config.NumberColumn("正→漲", format="%.1f%%"),
+                }
+            )
 
 
 # ========== 側邊欄 ==========
@@ -8149,7 +8411,7 @@ st.sidebar.subheader("📅 選擇日期")
 # 安全取得可用日期
 if USE_SUPABASE or db_exists:
     try:
-        available_dates = get_available_dates()
+        available_dates = _cached_available_dates()
     except Exception as e:
         available_dates = []
 else:
@@ -8250,8 +8512,7 @@ st.sidebar.markdown("---")
 
 # 市場週期燈號
 try:
-    _macro_db = MacroDatabase()
-    _latest_cycle = _macro_db.get_latest_market_cycle()
+    _latest_cycle = _cached_latest_cycle()
     if _latest_cycle:
         from config.macro_indicators import MARKET_CYCLES
         _phase = _latest_cycle.get("phase", "")
@@ -8288,6 +8549,8 @@ st.sidebar.markdown("---")
 st.sidebar.markdown(f"**更新時間**: {datetime.now().strftime('%H:%M:%S')}")
 
 if st.sidebar.button("🔄 重新整理", use_container_width=True):
+    # 清除所有資料快取，之後新增的快取也不會漏掉
+    st.cache_data.clear()
     st.cache_resource.clear()
     st.rerun()
 
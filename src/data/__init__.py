@@ -111,6 +111,9 @@ def _create_supabase_client() -> DataClient:
 def reset_client():
     """重設客戶端（用於測試或切換資料庫）"""
     global _client
+    close = getattr(_client, "close", None)
+    if close is not None:
+        close()
     _client = None
 
 
@@ -9,6 +9,8 @@ from abc import ABC, abstractmethod
 from datetime import date
 from typing import List, Dict, Optional, Any
 
+import pandas as pd
+
 
 class DataClient(ABC):
     """資料存取抽象基類"""
@@ -52,6 +54,66 @@ class DataClient(ABC):
         """搜尋新聞"""
         pass
 
+    def get_news_matching(
+        self,
+        keywords: List[str],
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        limit: int = 500
+    ) -> List[Dict]:
+        """取得標題或內容包含任一關鍵字的新聞（不分大小寫）
+
+        預設取出日期範圍內的新聞後在 Python 過濾，子類別可覆寫為資料庫端過濾
+        """
+        keywords = [kw.lower() for kw in keywords]
+        news_list = self.get_news(start_date=start_date, end_date=end_date, limit=limit)
+        return [
+            n for n in news_list
+            if any(kw in ((n.get("title") or "") + " " + (n.get("content") or "")).lower() for kw in keywords)
+        ]
+
+    def get_news_daily_counts(
+        self,
+        start_date: date,
+        end_date: date,
+        keyword: Optional[str] = None
+    ) -> Dict[str, int]:
+        """統計日期範圍內每日新聞數 {YYYY-MM-DD: 數量}，依日期升序（標題關鍵字不分大小寫）
+
+        日期以 collected_at 為準，缺少時改用 published_at；
+        預設取出範圍內全部新聞後在 Python 計數，子類別可覆寫為資料庫端彙總
+        """
+        total = self.get_news_count(start_date=start_date, end_date=end_date)
+        news_list = self.get_news(start_date=start_date, end_date=end_date, limit=total)
+
+        keyword = keyword.lower() if keyword else None
+        counts: Dict[str, int] = {}
+        for n in news_list:
+            if keyword and keyword not in (n.get("title") or "").lower():
+                continue
+            date_val = n.get("collected_at") or n.get("published_at") or ""
+            if date_val:
+                d = str(date_val)[:10]
+                counts[d] = counts.get(d, 0) + 1
+        return dict(sorted(counts.items()))
+
+    def get_news_dates(self, start_date: date, end_date: date) -> List[date]:
+        """取得範圍內有新聞的日期（新到舊）
+
+        日期以 collected_at 為準，缺少時改用 published_at
+        """
+        total = self.get_news_count(start_date=start_date, end_date=end_date)
+        news_list = self.get_news(start_date=start_date, end_date=end_date, limit=total)
+
+        days = set()
+        for n in news_list:
+            date_val = n.get("collected_at") or n.get("published_at") or ""
+            if date_val:
+                days.add(str(date_val)[:10])
+
+        start, end = start_date.isoformat(), end_date.isoformat()
+        return [date.fromisoformat(d) for d in sorted(days, reverse=True) if start <= d <= end]
+
     # ==================== 股票清單 ====================
 
     @abstractmethod
@@ -93,6 +155,39 @@ class DataClient(ABC):
         """取得每日價格"""
         pass
 
+    def get_daily_prices_df(
+        self,
+        symbol: str,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None
+    ) -> pd.DataFrame:
+        """取得每日價格 DataFrame（依日期升序，date 欄位為 datetime）
+
+        預設由 get_daily_prices 的結果轉換，子類別可覆寫為直接讀取欄位
+        """
+        df = pd.DataFrame(self.get_daily_prices(symbol, start_date=start_date, end_date=end_date))
+        if "date" in df.columns:
+            df["date"] = pd.to_datetime(df["date"])
+            df = df.sort_values("date").reset_index(drop=True)
+        return df
+
+    def get_daily_prices_bulk_df(
+        self,
+        symbols: List[str],
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None
+    ) -> Dict[str, pd.DataFrame]:
+        """批次取得多檔股票的每日價格 {代碼: DataFrame}（無資料的代碼不列入）
+
+        預設逐檔呼叫 get_daily_prices_df，子類別可覆寫為單次查詢
+        """
+        result = {}
+        for symbol in symbols:
+            df = self.get_daily_prices_df(symbol, start_date=start_date, end_date=end_date)
+            if not df.empty:
+                result[symbol] = df
+        return result
+
     @abstractmethod
     def get_latest_price(self, symbol: str) -> Optional[Dict]:
         """取得最新價格"""
@@ -5,7 +5,7 @@ PostgreSQL 資料客戶端實作（地端 PostgreSQL）
 import os
 import json
 from contextlib import contextmanager
-from datetime import date
+from datetime import date, timedelta
 from typing import List, Dict, Optional, Any, Generator
 
 from .base import DataClient
@@ -108,12 +108,13 @@ class PostgreSQLClient(DataClient):
         query = "SELECT * FROM news WHERE 1=1"
         params = []
 
+        # 以半開區間比較原始欄位（等同 ::date 條件），才能使用 published_at 索引
         if start_date:
-            query += " AND published_at::date >= %s"
+            query += " AND published_at >= %s"
             params.append(start_date)
         if end_date:
-            query += " AND published_at::date <= %s"
-            params.append(end_date)
+            query += " AND published_at < %s"
+            params.append(end_date + timedelta(days=1))
         if source:
             query += " AND source = %s"
             params.append(source)
@@ -134,12 +135,13 @@ class PostgreSQLClient(DataClient):
         query = "SELECT COUNT(*) as count FROM news WHERE 1=1"
         params = []
 
+        # 以半開區間比較原始欄位（等同 ::date 條件），才能使用 published_at 索引
         if start_date:
-            query += " AND published_at::date >= %s"
+            query += " AND published_at >= %s"
             params.append(start_date)
         if end_date:
-            query += " AND published_at::date <= %s"
-            params.append(end_date)
+            query += " AND published_at < %s"
+            params.append(end_date + timedelta(days=1))
 
         result = self._execute_one(query, tuple(params))
         return result["count"] if result else 0
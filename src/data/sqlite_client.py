@@ -2,15 +2,32 @@
 SQLite 資料客戶端實作（本地開發用）
 """
 
+import json
 import sqlite3
+import threading
 from contextlib import contextmanager
 from datetime import date
 from pathlib import Path
 from typing import List, Dict, Optional, Any, Generator
 
+import pandas as pd
+
 from .base import DataClient
 
 
+# 唯讀查詢連線的設定：mmap 與較大的頁快取減少 I/O
+# （journal_mode=WAL 會改寫資料庫檔案本身，由寫入端的 Database / FinanceDatabase 初始化時設定）
+READ_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA mmap_size=268435456",   # 256MB
+    "PRAGMA cache_size=-65536",     # 64MB
+    "PRAGMA temp_store=MEMORY",
+)
+
+# 大量新聞查詢每次自游標取出的筆數
+FETCH_BATCH_SIZE = 1000
+
+
 class SQLiteClient(DataClient):
     """SQLite 資料存取實作"""
 
@@ -23,6 +40,9 @@ class SQLiteClient(DataClient):
         self.news_db = Path(news_db)
         self.finance_db = Path(finance_db)
         self.macro_db = Path(macro_db)
+        # 唯讀連線每個資料庫一條，由各 session 與背景預取執行緒共用，查詢期間持有該資料庫的鎖
+        self._read_conns: Dict[Path, sqlite3.Connection] = {}
+        self._read_locks = {path: threading.RLock() for path in (self.news_db, self.finance_db, self.macro_db)}
 
     @contextmanager
     def _get_conn(self, db_path: Path, create_if_missing: bool = False) -> Generator[sqlite3.Connection, None, None]:
@@ -42,9 +62,48 @@ class SQLiteClient(DataClient):
         finally:
             conn.close()
 
+    @contextmanager
+    def _get_read_conn(self, db_path: Path) -> Generator[sqlite3.Connection, None, None]:
+        """取得唯讀查詢用連線
+
+        每個資料庫共用一條連線（連線設定只執行一次），使用期間持有鎖；
+        寫入操作仍使用 _get_conn 的獨立連線
+        """
+        if not db_path.exists():
+            raise FileNotFoundError(f"資料庫不存在: {db_path}")
+
+        with self._read_locks[db_path]:
+            conn = self._read_conns.get(db_path)
+            if conn is None:
+                conn = sqlite3.connect(db_path, check_same_thread=False)
+                conn.row_factory = sqlite3.Row
+                for pragma in READ_PRAGMAS:
+                    try:
+                        conn.execute(pragma)
+                    except sqlite3.OperationalError:
+                        pass  # 無法套用的設定沿用預設值
+                self._read_conns[db_path] = conn
+            yield conn
+
+    def close(self):
+        """關閉共用的唯讀連線（之後的查詢會重新建立）"""
+        for db_path, lock in self._read_locks.items():
+            with lock:
+                conn = self._read_conns.pop(db_path, None)
+                if conn is not None:
+                    conn.close()
+
     def _rows_to_dicts(self, rows) -> List[Dict]:
         return [dict(row) for row in rows]
 
+    def _iter_rows(self, cursor: sqlite3.Cursor) -> Generator[sqlite3.Row, None, None]:
+        """以 fetchmany 分批取出查詢結果，避免 fetchall 的整批 Row 與 dict 同時佔用記憶體"""
+        while True:
+            rows = cursor.fetchmany(FETCH_BATCH_SIZE)
+            if not rows:
+                return
+            yield from rows
+
     # ==================== 新聞 ====================
 
     def get_news(
@@ -56,7 +115,7 @@ class SQLiteClient(DataClient):
         limit: int = 100,
         offset: int = 0
     ) -> List[Dict]:
-        with self._get_conn(self.news_db) as conn:
+        with self._get_read_conn(self.news_db) as conn:
             query = "SELECT * FROM news WHERE 1=1"
             params = []
 
@@ -77,14 +136,14 @@ class SQLiteClient(DataClient):
             params.extend([limit, offset])
 
             cursor = conn.execute(query, params)
-            return self._rows_to_dicts(cursor.fetchall())
+            return self._rows_to_dicts(self._iter_rows(cursor))
 
     def get_news_count(
         self,
         start_date: Optional[date] = None,
         end_date: Optional[date] = None
     ) -> int:
-        with self._get_conn(self.news_db) as conn:
+        with self._get_read_conn(self.news_db) as conn:
             query = "SELECT COUNT(*) FROM news WHERE 1=1"
             params = []
 
@@ -99,23 +158,93 @@ class SQLiteClient(DataClient):
             return cursor.fetchone()[0]
 
     def get_news_sources(self) -> List[str]:
-        with self._get_conn(self.news_db) as conn:
+        with self._get_read_conn(self.news_db) as conn:
             cursor = conn.execute("SELECT DISTINCT source FROM news WHERE source IS NOT NULL ORDER BY source")
             return [row[0] for row in cursor.fetchall()]
 
     def get_news_categories(self) -> List[str]:
-        with self._get_conn(self.news_db) as conn:
+        with self._get_read_conn(self.news_db) as conn:
             cursor = conn.execute("SELECT DISTINCT category FROM news WHERE category IS NOT NULL ORDER BY category")
             return [row[0] for row in cursor.fetchall()]
 
     def search_news(self, keyword: str, limit: int = 50) -> List[Dict]:
-        with self._get_conn(self.news_db) as conn:
+        with self._get_read_conn(self.news_db) as conn:
             cursor = conn.execute(
                 "SELECT * FROM news WHERE title LIKE ? ORDER BY published_at DESC LIMIT ?",
                 (f"%{keyword}%", limit)
             )
             return self._rows_to_dicts(cursor.fetchall())
 
+    def get_news_matching(
+        self,
+        keywords: List[str],
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        limit: int = 500
+    ) -> List[Dict]:
+        # 關鍵字以 JSON 陣列傳入，由 json_each 在 SQLite 內一次比對
+        with self._get_read_conn(self.news_db) as conn:
+            query = """
+                SELECT * FROM news n
+                WHERE EXISTS (
+                    SELECT 1 FROM json_each(?) j
+                    WHERE instr(lower(coalesce(n.title, '') || ' ' || coalesce(n.content, '')), j.value) > 0
+                )
+            """
+            params = [json.dumps([kw.lower() for kw in keywords])]
+
+            if start_date:
+                query += " AND date(published_at) >= ?"
+                params.append(start_date.isoformat())
+            if end_date:
+                query += " AND date(published_at) <= ?"
+                params.append(end_date.isoformat())
+
+            query += " ORDER BY published_at DESC LIMIT ?"
+            params.append(limit)
+
+            cursor = conn.execute(query, params)
+            return self._rows_to_dicts(self._iter_rows(cursor))
+
+    def get_news_daily_counts(
+        self,
+        start_date: date,
+        end_date: date,
+        keyword: Optional[str] = None
+    ) -> Dict[str, int]:
+        # 篩選與 GROUP BY 在同一層查詢完成，只回傳每日筆數
+        with self._get_read_conn(self.news_db) as conn:
+            query = """
+                SELECT substr(coalesce(nullif(collected_at, ''), published_at), 1, 10) AS d,
+                       COUNT(*)
+                FROM news
+                WHERE date(published_at) >= ? AND date(published_at) <= ?
+            """
+            params = [start_date.isoformat(), end_date.isoformat()]
+
+            if keyword:
+                query += " AND instr(lower(coalesce(title, '')), ?) > 0"
+                params.append(keyword.lower())
+
+            query += " GROUP BY d HAVING coalesce(d, '') != '' ORDER BY d"
+
+            cursor = conn.execute(query, params)
+            return dict(cursor.fetchall())
+
+    def get_news_dates(self, start_date: date, end_date: date) -> List[date]:
+        # news_date 欄位由 Database 建立並以索引排序；舊資料庫尚未遷移時退回預設實作
+        try:
+            with self._get_read_conn(self.news_db) as conn:
+                cursor = conn.execute(
+                    """SELECT DISTINCT news_date FROM news
+                       WHERE news_date >= ? AND news_date <= ?
+                       ORDER BY news_date DESC""",
+                    (start_date.isoformat(), end_date.isoformat())
+                )
+                return [date.fromisoformat(row[0]) for row in cursor.fetchall()]
+        except sqlite3.OperationalError:
+            return super().get_news_dates(start_date, end_date)
+
     # ==================== 股票清單 ====================
 
     def get_watchlist(
@@ -123,7 +252,7 @@ class SQLiteClient(DataClient):
         market: Optional[str] = None,
         active_only: bool = True
     ) -> List[Dict]:
-        with self._get_conn(self.finance_db) as conn:
+        with self._get_read_conn(self.finance_db) as conn:
             query = "SELECT * FROM watchlist WHERE 1=1"
             params = []
 
@@ -176,7 +305,7 @@ class SQLiteClient(DataClient):
         end_date: Optional[date] = None,
         limit: Optional[int] = None
     ) -> List[Dict]:
-        with self._get_conn(self.finance_db) as conn:
+        with self._get_read_conn(self.finance_db) as conn:
             query = "SELECT * FROM daily_prices WHERE symbol = ?"
             params = [symbol.upper()]
 
@@ -196,12 +325,63 @@ class SQLiteClient(DataClient):
             cursor = conn.execute(query, params)
             return self._rows_to_dicts(cursor.fetchall())
 
+    def get_daily_prices_df(
+        self,
+        symbol: str,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None
+    ) -> pd.DataFrame:
+        # 直接由 pandas 讀成欄位陣列，省去逐列建立 dict 再轉 DataFrame
+        with self._get_read_conn(self.finance_db) as conn:
+            query = "SELECT * FROM daily_prices WHERE symbol = ?"
+            params = [symbol.upper()]
+
+            if start_date:
+                query += " AND date >= ?"
+                params.append(start_date.isoformat())
+            if end_date:
+                query += " AND date <= ?"
+                params.append(end_date.isoformat())
+
+            query += " ORDER BY date ASC"
+
+            return pd.read_sql_query(query, conn, params=params, parse_dates=["date"])
+
+    def get_daily_prices_bulk_df(
+        self,
+        symbols: List[str],
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None
+    ) -> Dict[str, pd.DataFrame]:
+        # 以 IN (...) 單次查詢所有代碼，再依代碼分組
+        if not symbols:
+            return {}
+
+        with self._get_read_conn(self.finance_db) as conn:
+            placeholders = ",".join("?" * len(symbols))
+            query = f"SELECT * FROM daily_prices WHERE symbol IN ({placeholders})"
+            params = [s.upper() for s in symbols]
+
+            if start_date:
+                query += " AND date >= ?"
+                params.append(start_date.isoformat())
+            if end_date:
+                query += " AND date <= ?"
+                params.append(end_date.isoformat())
+
+            query += " ORDER BY symbol, date ASC"
+
+            df = pd.read_sql_query(query, conn, params=params, parse_dates=["date"])
+
+        groups = {sym: g.reset_index(drop=True) for sym, g in df.groupby("symbol", sort=False)}
+        return {s: groups[s.upper()] for s in symbols if s.upper() in groups}
+
     def get_latest_price(self, symbol: str) -> Optional[Dict]:
         prices = self.get_daily_prices(symbol, limit=1)
         return prices[0] if prices else None
 
     def get_price_stats(self) -> Dict[str, Any]:
-        with self._get_conn(self.finance_db) as conn:
+        with self._get_read_conn(self.finance_db) as conn:
             cursor = conn.execute("SELECT COUNT(*), MIN(date), MAX(date) FROM daily_prices")
             row = cursor.fetchone()
             return {
@@ -222,7 +402,7 @@ class SQLiteClient(DataClient):
         if not self.macro_db.exists():
             return []
 
-        with self._get_conn(self.macro_db) as conn:
+        with self._get_read_conn(self.macro_db) as conn:
             query = "SELECT * FROM macro_data WHERE series_id = ?"
             params = [series_id]
 
@@ -246,7 +426,7 @@ class SQLiteClient(DataClient):
         if not self.macro_db.exists():
             return []
 
-        with self._get_conn(self.macro_db) as conn:
+        with self._get_read_conn(self.macro_db) as conn:
             query = "SELECT * FROM macro_indicators"
             if active_only:
                 query += " WHERE is_active = 1"
@@ -258,7 +438,7 @@ class SQLiteClient(DataClient):
         if not self.macro_db.exists():
             return None
 
-        with self._get_conn(self.macro_db) as conn:
+        with self._get_read_conn(self.macro_db) as conn:
             cursor = conn.execute(
                 "SELECT * FROM market_cycles ORDER BY date DESC LIMIT 1"
             )
@@ -278,13 +458,13 @@ class SQLiteClient(DataClient):
 
         # 新聞統計
         if self.news_db.exists():
-            with self._get_conn(self.news_db) as conn:
+            with self._get_read_conn(self.news_db) as conn:
                 cursor = conn.execute("SELECT COUNT(*) FROM news")
                 stats["news_count"] = cursor.fetchone()[0]
 
         # 股票統計
         if self.finance_db.exists():
-            with self._get_conn(self.finance_db) as conn:
+            with self._get_read_conn(self.finance_db) as conn:
                 cursor = conn.execute("SELECT COUNT(*) FROM watchlist WHERE is_active = 1")
                 stats["watchlist_count"] = cursor.fetchone()[0]
 
@@ -11,6 +11,12 @@ from typing import Generator, List, Optional
 from .models import News
 
 
+# news_date 欄位的計算方式（與前端可用日期的判斷一致）
+# 時間欄位須為 ISO-8601 格式（YYYY-MM-DD[ HH:MM:SS]，insert_news 寫入的 datetime 即是），
+# 其他格式的字串 SQLite date() 會回傳 NULL，該筆新聞不會出現在可用日期列表
+NEWS_DATE_EXPR = "date(coalesce(nullif(collected_at, ''), published_at))"
+
+
 class Database:
     """SQLite 資料庫管理類別"""
 
@@ -42,6 +48,9 @@ class Database:
         """初始化資料庫，建立資料表"""
         with self._get_connection() as conn:
             cursor = conn.cursor()
+
+            # WAL 讓儀表板讀取與收集器寫入互不阻塞（設定寫入檔案，之後的連線都沿用）
+            cursor.execute("PRAGMA journal_mode=WAL")
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS news (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -69,6 +78,42 @@ class Database:
                 CREATE INDEX IF NOT EXISTS idx_news_published_at
                 ON news(published_at)
             """)
+            # 依日期篩選的查詢使用 date(...)，建立運算式索引避免全表掃描
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_news_published_date
+                ON news(date(published_at))
+            """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_news_collected_date
+                ON news(date(collected_at))
+            """)
+
+            # 新聞所屬日期（collected_at，缺少時用 published_at）存為欄位，
+            # 由觸發器在新增與更新時間欄位時填入，可用日期列表直接走索引
+            columns = {row["name"] for row in cursor.execute("PRAGMA table_info(news)")}
+            if "news_date" not in columns:
+                cursor.execute("ALTER TABLE news ADD COLUMN news_date TEXT")
+                cursor.execute(f"UPDATE news SET news_date = {NEWS_DATE_EXPR}")
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS news_set_date
+                AFTER INSERT ON news
+                BEGIN
+                    UPDATE news SET news_date = {NEWS_DATE_EXPR}
+                    WHERE id = NEW.id;
+                END
+            """)
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS news_update_date
+                AFTER UPDATE OF published_at, collected_at ON news
+                BEGIN
+                    UPDATE news SET news_date = {NEWS_DATE_EXPR}
+                    WHERE id = NEW.id;
+                END
+            """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_news_date
+                ON news(news_date)
+            """)
 
     def insert_news(self, news: News) -> Optional[int]:
         """
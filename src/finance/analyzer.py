@@ -7,6 +7,8 @@ import numpy as np
 from datetime import date, timedelta
 from typing import Dict, List, Tuple, Optional
 import sqlite3
+import threading
+from contextlib import contextmanager
 from pathlib import Path
 
 
@@ -15,6 +17,24 @@ class TechnicalAnalyzer:
 
     def __init__(self, db_path: str = "finance.db"):
         self.db_path = Path(db_path)
+        self._conn: Optional[sqlite3.Connection] = None
+        # app 的 get_analyzer() 讓多個 session 執行緒共用同一實例，查詢以鎖序列化
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _get_conn(self):
+        """取得共用的資料庫連線（首次使用時建立），使用期間持有鎖"""
+        with self._lock:
+            if self._conn is None:
+                self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            yield self._conn
+
+    def close(self):
+        """關閉共用連線（之後的查詢會重新建立）"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
 
     def get_price_data(self, symbol: str, days: int = 365,
                         start_date: str = None, end_date: str = None) -> pd.DataFrame:
@@ -26,8 +46,6 @@ class TechnicalAnalyzer:
             start_date: 開始日期 (YYYY-MM-DD)
             end_date: 結束日期 (YYYY-MM-DD)
         """
-        conn = sqlite3.connect(self.db_path)
-
         if start_date and end_date:
             query = """
                 SELECT date, open, high, low, close, volume
@@ -35,7 +53,7 @@ class TechnicalAnalyzer:
                 WHERE symbol = ? AND date >= ? AND date <= ?
                 ORDER BY date ASC
             """
-            df = pd.read_sql_query(query, conn, params=(symbol, start_date, end_date))
+            params = (symbol, start_date, end_date)
         else:
             query = """
                 SELECT date, open, high, low, close, volume
@@ -44,9 +62,10 @@ class TechnicalAnalyzer:
                 ORDER BY date DESC
                 LIMIT ?
             """
-            df = pd.read_sql_query(query, conn, params=(symbol, days))
+            params = (symbol, days)
 
-        conn.close()
+        with self._get_conn() as conn:
+            df = pd.read_sql_query(query, conn, params=params)
 
         if df.empty:
             return df
@@ -321,11 +340,9 @@ class TechnicalAnalyzer:
 
     def get_all_recommendations(self) -> List[Dict]:
         """取得所有股票的建議"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute("SELECT symbol FROM watchlist WHERE is_active = 1")
-        symbols = [row[0] for row in cursor.fetchall()]
-        conn.close()
+        with self._get_conn() as conn:
+            cursor = conn.execute("SELECT symbol FROM watchlist WHERE is_active = 1")
+            symbols = [row[0] for row in cursor.fetchall()]
 
         results = []
         for symbol in symbols:
@@ -42,6 +42,9 @@ class FinanceDatabase:
         with self._get_connection() as conn:
             cursor = conn.cursor()
 
+            # WAL 讓儀表板讀取與收集器寫入互不阻塞（設定寫入檔案，之後的連線都沿用）
+            cursor.execute("PRAGMA journal_mode=WAL")
+
             # 股票/ETF/指數 追蹤清單
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS watchlist (
@@ -6,16 +6,200 @@
 - Walk-Forward Analysis 走動式評估
 """
 
+import os
+import multiprocessing
+import threading
 import pandas as pd
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, timedelta, date
 from typing import Dict, List, Tuple, Optional
 import sqlite3
 from pathlib import Path
 import logging
 
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
 logger = logging.getLogger(__name__)
 
+# 動量分數校正方式代碼（numba 核心只接受數值參數），未列出的方式視為不校正
+MOMENTUM_METHODS = {'raw': 0, 'sharpe': 1, 'sortino': 2, 'vol_scaled': 3}
+
+# 目標日波動率（年化 15%），vol_scaled 校正使用
+TARGET_DAILY_VOLATILITY = 0.15 / np.sqrt(252)
+
+# 魯棒性檢測平行子程序數上限（另受 CPU 核心數限制）
+ROBUSTNESS_MAX_WORKERS = 4
+
+# 同一伺服器程序內同時只開一組子程序池；其他 session 同時執行時改為逐一計算
+_robustness_pool_slot = threading.BoundedSemaphore(1)
+
+# 子程序共用的價格資料（由 initializer 設定一次，避免每個參數組合重複序列化）
+_worker_prices: Optional[pd.DataFrame] = None
+
+
+def _init_robustness_worker(prices: pd.DataFrame):
+    global _worker_prices
+    _worker_prices = prices
+
+
+def _robustness_row(prices: pd.DataFrame, params: Tuple) -> Optional[Dict]:
+    """對單一參數組合分別執行原始動量與波動率校正動量，失敗時回傳 None"""
+    top_n, rebal, lookback, initial_capital = params
+    try:
+        # 測試原始動量
+        result_raw = PortfolioStrategy._run_momentum_on_prices(
+            prices, initial_capital, top_n, rebal, lookback,
+            vol_adjusted=False
+        )
+
+        # 測試波動率校正
+        result_vol = PortfolioStrategy._run_momentum_on_prices(
+            prices, initial_capital, top_n, rebal, lookback,
+            vol_adjusted=True
+        )
+    except Exception:
+        return None
+
+    return {
+        'top_n': top_n,
+        'rebalance_days': rebal,
+        'lookback_days': lookback,
+        'raw_return': result_raw.get('summary', {}).get('total_return_pct', 0),
+        'raw_sharpe': result_raw.get('summary', {}).get('sharpe_ratio', 0),
+        'raw_max_dd': result_raw.get('summary', {}).get('max_drawdown', 0),
+        'vol_return': result_vol.get('summary', {}).get('total_return_pct', 0),
+        'vol_sharpe': result_vol.get('summary', {}).get('sharpe_ratio', 0),
+        'vol_max_dd': result_vol.get('summary', {}).get('max_drawdown', 0)
+    }
+
+
+def _rolling_momentum_numpy(returns: np.ndarray, lookback_days: int, method: int) -> np.ndarray:
+    """
+    NumPy/pandas 版本（未安裝 numba 時使用）
+
+    累積報酬由報酬率還原的價格指數相除取得（等同區間內 (1 + r) 連乘），
+    波動率使用 rolling std，記憶體皆為 O(交易日數 × 股票數)。
+    """
+    scores = np.full(returns.shape, np.nan)
+    if len(returns) <= lookback_days:
+        return scores
+
+    # price_index[k] 為第 0..k-1 日報酬的連乘（NaN 視為無報酬），第 i 日動量為
+    # price_index[i] / price_index[i - lookback_days] - 1
+    price_index = np.ones((len(returns) + 1, returns.shape[1]))
+    np.cumprod(1 + np.nan_to_num(returns), axis=0, out=price_index[1:])
+    momentum = price_index[lookback_days:-1] / price_index[:-lookback_days - 1] - 1
+
+    if method != 0:
+        # rolling 第 i - 1 列涵蓋 returns[i - lookback_days:i]
+        frame = pd.DataFrame(returns)
+        volatility = frame.rolling(lookback_days, min_periods=2).std().to_numpy()[lookback_days - 1:-1]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            if method == 1:
+                adjusted = momentum / volatility
+            elif method == 2:
+                downside = frame.where(frame < 0)
+                rolling_down = downside.rolling(lookback_days, min_periods=1)
+                has_downside = (rolling_down.count().to_numpy() > 0)[lookback_days - 1:-1]
+                downside_vol = np.where(
+                    has_downside,
+                    downside.rolling(lookback_days, min_periods=2).std().to_numpy()[lookback_days - 1:-1],
+                    volatility
+                )
+                adjusted = np.where(downside_vol > 0, momentum / downside_vol, momentum / volatility)
+            else:
+                adjusted = momentum * (TARGET_DAILY_VOLATILITY / volatility)
+            momentum = np.where(volatility > 0, adjusted, momentum)
+
+    scores[lookback_days:] = momentum
+    return scores
+
+
+def _rolling_momentum_loop(returns: np.ndarray, lookback_days: int, method: int) -> np.ndarray:
+    """逐日逐檔迴圈計算動量分數（供 numba 編譯）"""
+    n_days, n_symbols = returns.shape
+    scores = np.full((n_days, n_symbols), np.nan)
+    for t in range(lookback_days, n_days):
+        for j in range(n_symbols):
+            growth = 1.0
+            total = 0.0
+            count = 0
+            down_total = 0.0
+            down_count = 0
+            for k in range(t - lookback_days, t):
+                x = returns[k, j]
+                if not np.isnan(x):
+                    growth *= 1.0 + x
+                    total += x
+                    count += 1
+                    if x < 0:
+                        down_total += x
+                        down_count += 1
+            momentum = growth - 1.0
+            if method == 0 or count < 2:
+                scores[t, j] = momentum
+                continue
+
+            mean = total / count
+            down_mean = down_total / down_count if down_count > 0 else 0.0
+            sq_dev = 0.0
+            down_sq_dev = 0.0
+            for k in range(t - lookback_days, t):
+                x = returns[k, j]
+                if not np.isnan(x):
+                    sq_dev += (x - mean) ** 2
+                    if x < 0:
+                        down_sq_dev += (x - down_mean) ** 2
+            volatility = (sq_dev / (count - 1)) ** 0.5
+
+            if not volatility > 0:
+                scores[t, j] = momentum
+            elif method == 1:
+                scores[t, j] = momentum / volatility
+            elif method == 2:
+                if down_count == 0:
+                    downside_vol = volatility
+                elif down_count == 1:
+                    downside_vol = np.nan
+                else:
+                    downside_vol = (down_sq_dev / (down_count - 1)) ** 0.5
+                if downside_vol > 0:
+                    scores[t, j] = momentum / downside_vol
+                else:
+                    scores[t, j] = momentum / volatility
+            else:
+                scores[t, j] = momentum * (TARGET_DAILY_VOLATILITY / volatility)
+    return scores
+
+
+if njit is not None:
+    # cache=True 將編譯結果寫入磁碟，Streamlit 重跑或重啟時不需重新 JIT
+    _rolling_momentum_kernel = njit(cache=True)(_rolling_momentum_loop)
+else:
+    _rolling_momentum_kernel = _rolling_momentum_numpy
+
+
+def _rolling_momentum(returns: np.ndarray, lookback_days: int, method: str = 'raw') -> np.ndarray:
+    """
+    一次計算所有交易日的動量分數
+
+    第 i 列為 returns[i - lookback_days:i] 的累積報酬（略過 NaN），
+    前 lookback_days 列為 NaN。波動率為正時依 method 校正：
+    sharpe 除以標準差、sortino 除以下行標準差、vol_scaled 縮放至目標波動率。
+    """
+    returns = np.ascontiguousarray(returns, dtype=np.float64)
+    return _rolling_momentum_kernel(returns, lookback_days, MOMENTUM_METHODS.get(method, 0))
+
+
+def _robustness_task(params: Tuple) -> Optional[Dict]:
+    """子程序入口（需為模組層級函式才能被 pickle）"""
+    return _robustness_row(_worker_prices, params)
+
 
 class PortfolioStrategy:
     """投資組合策略分析器"""
@@ -234,8 +418,8 @@ class PortfolioStrategy:
         if len(valid_symbols) < top_n:
             return {'error': f'有效股票數量({len(valid_symbols)})不足，需要至少{top_n}檔'}
 
-        # 計算每日報酬率
-        returns = prices.pct_change()
+        # 價格矩陣（調倉日以整列計算動量）
+        price_values = prices.to_numpy()
 
         # 初始化
         capital = initial_capital
@@ -266,15 +450,13 @@ class PortfolioStrategy:
 
             if should_rebalance:
                 # 計算動量 (過去N天報酬率)
-                momentum = {}
-                for sym in valid_symbols:
-                    if i >= lookback_days:
-                        start_price = prices.loc[dates[i - lookback_days], sym]
-                        end_price = prices.loc[date, sym]
-                        if pd.notna(start_price) and pd.notna(end_price) and start_price > 0:
-                            momentum[sym] = (end_price - start_price) / start_price
-                        else:
-                            momentum[sym] = -999
+                start_prices = price_values[i - lookback_days]
+                end_prices = price_values[i]
+                with np.errstate(invalid='ignore', divide='ignore'):
+                    period_returns = np.where(
+                        start_prices > 0, (end_prices - start_prices) / start_prices, -999
+                    )
+                momentum = dict(zip(valid_symbols, np.nan_to_num(period_returns, nan=-999).tolist()))
 
                 # 排序選擇前N檔
                 sorted_momentum = sorted(momentum.items(), key=lambda x: x[1], reverse=True)
@@ -470,8 +652,9 @@ class PortfolioStrategy:
         if len(valid_symbols) < top_n:
             return {'error': f'有效股票數量({len(valid_symbols)})不足，需要至少{top_n}檔'}
 
-        # 計算每日報酬率
+        # 計算每日報酬率，並一次算出每個交易日的波動率校正動量
         returns = prices.pct_change()
+        momentum_scores = _rolling_momentum(returns.to_numpy(), lookback_days, vol_adjust_method)
 
         # 初始化
         capital = initial_capital
@@ -481,7 +664,6 @@ class PortfolioStrategy:
         rebalance_records = []
 
         dates = prices.index.tolist()
-        target_volatility = 0.15 / np.sqrt(252)  # 目標年化波動率 15%
 
         for i, current_date in enumerate(dates):
             if i < lookback_days:
@@ -502,41 +684,8 @@ class PortfolioStrategy:
             should_rebalance = (i == lookback_days) or (i % rebalance_days == 0)
 
             if should_rebalance:
-                # 計算波動率校正的動量
-                adjusted_momentum = {}
-
-                for sym in valid_symbols:
-                    if i >= lookback_days:
-                        # 取得回顧期間的報酬
-                        lookback_returns = returns[sym].iloc[i - lookback_days:i]
-
-                        if len(lookback_returns) < lookback_days * 0.8:
-                            adjusted_momentum[sym] = -999
-                            continue
-
-                        # 計算原始動量 (累計報酬率)
-                        raw_momentum = (1 + lookback_returns).prod() - 1
-
-                        # 計算波動率
-                        volatility = lookback_returns.std()
-
-                        if volatility > 0:
-                            if vol_adjust_method == 'sharpe':
-                                # 夏普比率: 報酬 / 波動率
-                                adjusted_momentum[sym] = raw_momentum / volatility
-                            elif vol_adjust_method == 'sortino':
-                                # 索提諾比率: 報酬 / 下行波動率
-                                downside_returns = lookback_returns[lookback_returns < 0]
-                                downside_vol = downside_returns.std() if len(downside_returns) > 0 else volatility
-                                adjusted_momentum[sym] = raw_momentum / downside_vol if downside_vol > 0 else raw_momentum / volatility
-                            elif vol_adjust_method == 'vol_scaled':
-                                # 波動率縮放: 調整到目標波動率
-                                scale_factor = target_volatility / volatility
-                                adjusted_momentum[sym] = raw_momentum * scale_factor
-                            else:
-                                adjusted_momentum[sym] = raw_momentum
-                        else:
-                            adjusted_momentum[sym] = raw_momentum
+                # 計算波動率校正的動量（整段已一次算好，直接取當日列）
+                adjusted_momentum = dict(zip(valid_symbols, momentum_scores[i].tolist()))
 
                 # 排序選擇前N檔
                 sorted_momentum = sorted(adjusted_momentum.items(), key=lambda x: x[1], reverse=True)
@@ -757,6 +906,8 @@ class PortfolioStrategy:
             best_sharpe = -999
 
             train_prices = prices.loc[train_start:train_end]
+            # 同一訓練期內，相同回顧天數的參數組合共用動量分數
+            momentum_cache = {}
 
             for top_n in param_grid['top_n']:
                 for rebal in param_grid['rebalance_days']:
@@ -765,12 +916,12 @@ class PortfolioStrategy:
                             if vol_adjusted:
                                 result = self._run_momentum_on_prices(
                                     train_prices, initial_capital, top_n, rebal, lookback,
-                                    vol_adjusted=True
+                                    vol_adjusted=True, momentum_cache=momentum_cache
                                 )
                             else:
                                 result = self._run_momentum_on_prices(
                                     train_prices, initial_capital, top_n, rebal, lookback,
-                                    vol_adjusted=False
+                                    vol_adjusted=False, momentum_cache=momentum_cache
                                 )
 
                             if 'summary' in result and 'sharpe_ratio' in result['summary']:
@@ -849,17 +1000,33 @@ class PortfolioStrategy:
             'trades': combined_trades
         }
 
-    def _run_momentum_on_prices(self, prices: pd.DataFrame, initial_capital: float,
-                                 top_n: int, rebalance_days: int, lookback_days: int,
-                                 vol_adjusted: bool = False) -> Dict:
-        """在給定價格數據上運行動量策略 (內部方法)"""
+    @staticmethod
+    def _run_momentum_on_prices(prices: pd.DataFrame, initial_capital: float,
+                                top_n: int, rebalance_days: int, lookback_days: int,
+                                vol_adjusted: bool = False,
+                                momentum_cache: Optional[Dict] = None) -> Dict:
+        """
+        在給定價格數據上運行動量策略 (內部方法)
+
+        Args:
+            momentum_cache: 同一段價格數據重複回測時共用的動量分數快取
+                            ({(lookback_days, 校正方式): 分數陣列})
+        """
         valid_symbols = prices.columns[prices.notna().sum() > len(prices) * 0.5].tolist()
         prices = prices[valid_symbols].dropna()
 
         if len(valid_symbols) < top_n:
             return {'error': 'Not enough stocks', 'summary': {'sharpe_ratio': -999}}
 
-        returns = prices.pct_change()
+        # 動量分數只與回顧天數有關，整段一次算好，調倉日直接查列
+        method = 'sharpe' if vol_adjusted else 'raw'
+        cache_key = (lookback_days, method)
+        if momentum_cache is not None and cache_key in momentum_cache:
+            momentum_scores = momentum_cache[cache_key]
+        else:
+            momentum_scores = _rolling_momentum(prices.pct_change().to_numpy(), lookback_days, method)
+            if momentum_cache is not None:
+                momentum_cache[cache_key] = momentum_scores
 
         capital = initial_capital
         holdings = {}
@@ -867,7 +1034,6 @@ class PortfolioStrategy:
         trades = []
 
         dates = prices.index.tolist()
-        target_volatility = 0.15 / np.sqrt(252)
 
         for i, current_date in enumerate(dates):
             if i < lookback_days:
@@ -882,20 +1048,7 @@ class PortfolioStrategy:
             should_rebalance = (i == lookback_days) or (i % rebalance_days == 0)
 
             if should_rebalance:
-                momentum = {}
-                for sym in valid_symbols:
-                    lookback_returns = returns[sym].iloc[i - lookback_days:i]
-                    if len(lookback_returns) < lookback_days * 0.5:
-                        momentum[sym] = -999
-                        continue
-
-                    raw_momentum = (1 + lookback_returns).prod() - 1
-                    volatility = lookback_returns.std()
-
-                    if vol_adjusted and volatility > 0:
-                        momentum[sym] = raw_momentum / volatility
-                    else:
-                        momentum[sym] = raw_momentum
+                momentum = dict(zip(valid_symbols, momentum_scores[i].tolist()))
 
                 sorted_momentum = sorted(momentum.items(), key=lambda x: x[1], reverse=True)
                 selected = [sym for sym, _ in sorted_momentum[:top_n] if momentum[sym] > -999]
@@ -996,47 +1149,36 @@ class PortfolioStrategy:
             return {'error': '無法取得價格數據'}
 
         # 參數網格
-        param_results = []
-
         top_n_range = [3, 5, 7, 10]
         rebalance_range = [5, 10, 20, 30, 40]
         lookback_range = [10, 20, 30, 40]
 
-        total_tests = len(top_n_range) * len(rebalance_range) * len(lookback_range)
-        test_count = 0
-
-        for top_n in top_n_range:
-            for rebal in rebalance_range:
-                for lookback in lookback_range:
-                    test_count += 1
-
-                    try:
-                        # 測試原始動量
-                        result_raw = self._run_momentum_on_prices(
-                            prices, initial_capital, top_n, rebal, lookback,
-                            vol_adjusted=False
-                        )
-
-                        # 測試波動率校正
-                        result_vol = self._run_momentum_on_prices(
-                            prices, initial_capital, top_n, rebal, lookback,
-                            vol_adjusted=True
-                        )
-
-                        param_results.append({
-                            'top_n': top_n,
-                            'rebalance_days': rebal,
-                            'lookback_days': lookback,
-                            'raw_return': result_raw.get('summary', {}).get('total_return_pct', 0),
-                            'raw_sharpe': result_raw.get('summary', {}).get('sharpe_ratio', 0),
-                            'raw_max_dd': result_raw.get('summary', {}).get('max_drawdown', 0),
-                            'vol_return': result_vol.get('summary', {}).get('total_return_pct', 0),
-                            'vol_sharpe': result_vol.get('summary', {}).get('sharpe_ratio', 0),
-                            'vol_max_dd': result_vol.get('summary', {}).get('max_drawdown', 0)
-                        })
-
-                    except Exception as e:
-                        continue
+        tasks = [
+            (top_n, rebal, lookback, initial_capital)
+            for top_n in top_n_range
+            for rebal in rebalance_range
+            for lookback in lookback_range
+        ]
+
+        # 各參數組合互相獨立，以多個子程序平行執行（結果順序與參數網格一致）
+        # 呼叫端（Streamlit 伺服器）為多執行緒程序，fork 可能繼承被鎖住的鎖，改用 forkserver 啟動
+        workers = min(ROBUSTNESS_MAX_WORKERS, os.cpu_count() or 1, len(tasks))
+        rows = None
+        if workers > 1 and _robustness_pool_slot.acquire(blocking=False):
+            try:
+                with ProcessPoolExecutor(max_workers=workers,
+                                         mp_context=multiprocessing.get_context("forkserver"),
+                                         initializer=_init_robustness_worker,
+                                         initargs=(prices,)) as executor:
+                    rows = list(executor.map(_robustness_task, tasks))
+            except (OSError, ValueError, BrokenProcessPool) as e:
+                logger.warning(f"平行魯棒性檢測失敗，改為逐一執行: {e}")
+            finally:
+                _robustness_pool_slot.release()
+        if rows is None:
+            rows = [_robustness_row(prices, params) for params in tasks]
+
+        param_results = [row for row in rows if row is not None]
 
         if not param_results:
             return {'error': '無法完成魯棒性檢測'}
@@ -1121,8 +1263,11 @@ class PortfolioStrategy:
         results['Buy and Hold'] = bh['summary']
 
         # 技術指標策略
-        for strategy in ['MA', 'RSI', 'MACD', 'BB']:
-            th = analyzer.get_trade_history(symbol, strategy, initial_capital)
-            results[f'{strategy} 策略'] = th['summary']
+        try:
+            for strategy in ['MA', 'RSI', 'MACD', 'BB']:
+                th = analyzer.get_trade_history(symbol, strategy, initial_capital)
+                results[f'{strategy} 策略'] = th['summary']
+        finally:
+            analyzer.close()
 
         return results
@@ -7,10 +7,20 @@
 import sqlite3
 import logging
 from datetime import datetime, timedelta, date
+from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 import pandas as pd
 import numpy as np
 
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from src.utils.keyword_matcher import KeywordMatcher
+
 logger = logging.getLogger(__name__)
 
 # 正面關鍵字
@@ -32,6 +42,79 @@ NEGATIVE_KEYWORDS = [
     "下修", "疲軟", "萎縮", "悲觀", "警示", "風險"
 ]
 
+# 正負面關鍵字比對器（模組載入時建立一次，單次掃描即可計數）
+POSITIVE_MATCHER = KeywordMatcher(POSITIVE_KEYWORDS)
+NEGATIVE_MATCHER = KeywordMatcher(NEGATIVE_KEYWORDS)
+
+# 情緒分數門檻：> 0.2 偏多、< -0.2 偏空（app.py 的情緒燈號也使用此值）
+SENTIMENT_THRESHOLD = 0.2
+
+
+def _score_and_label_numpy(bullish: np.ndarray, bearish: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """NumPy 向量化版本（未安裝 numba 時使用）"""
+    bullish = bullish.astype(np.float64)
+    bearish = bearish.astype(np.float64)
+    total = bullish + bearish
+    scores = np.divide(bullish - bearish, total, out=np.zeros(total.size), where=total > 0)
+    labels = (1 + (scores > SENTIMENT_THRESHOLD).astype(np.int8)
+              - (scores < -SENTIMENT_THRESHOLD).astype(np.int8))
+    return scores, labels
+
+
+def _score_and_label_loop(bullish: np.ndarray, bearish: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """單次迴圈計算分數與等級（供 numba 編譯）"""
+    n = bullish.size
+    scores = np.zeros(n, np.float64)
+    labels = np.ones(n, np.int8)
+    for i in range(n):
+        total = bullish[i] + bearish[i]
+        if total > 0:
+            scores[i] = (bullish[i] - bearish[i]) / total
+        if scores[i] > SENTIMENT_THRESHOLD:
+            labels[i] = 2
+        elif scores[i] < -SENTIMENT_THRESHOLD:
+            labels[i] = 0
+    return scores, labels
+
+
+if njit is not None:
+    # cache=True 將編譯結果寫入磁碟，Streamlit 重跑或重啟時不需重新 JIT
+    _score_and_label_kernel = njit(cache=True)(_score_and_label_loop)
+else:
+    _score_and_label_kernel = _score_and_label_numpy
+
+
+def score_and_label(bullish, bearish) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    批次計算情緒分數與等級
+
+    Args:
+        bullish: 每個項目的看多次數
+        bearish: 每個項目的看空次數
+
+    Returns:
+        (scores, labels)：scores 為 (多-空)/(多+空)（無資料為 0），
+        labels 為 0=偏空 / 1=中性 / 2=偏多
+    """
+    bullish = np.asarray(bullish, dtype=np.int64)
+    bearish = np.asarray(bearish, dtype=np.int64)
+    return _score_and_label_kernel(bullish, bearish)
+
+
+def _apply_sentiment(results: List[Dict], bullish_key: str, bearish_key: str, labels: Tuple[str, str, str]):
+    """為結果列表批次填入 sentiment_score 與 sentiment 欄位"""
+    if not results:
+        return
+    scores, levels = score_and_label([r[bullish_key] for r in results],
+                                     [r[bearish_key] for r in results])
+    for r, score, level in zip(results, scores.tolist(), levels.tolist()):
+        r["sentiment_score"] = score
+        r["sentiment"] = labels[level]
+
+
+STOCK_SENTIMENT_LABELS = ("🔴 看空", "🟡 中性", "🟢 看多")
+KEYWORD_SENTIMENT_LABELS = ("🔴 負面", "🟡 中性", "🟢 正面")
+
 # 產業對應的 ETF
 SECTOR_ETF_MAPPING = {
     "半導體": ["SMH", "SOXX", "VGT", "QQQ"],
@@ -240,8 +323,8 @@ class DailyHotStocksAnalyzer:
                         stock_data[symbol]["sample_titles"].append(news["title"])
 
                     # 計算該新聞的情緒
-                    pos = sum(1 for kw in POSITIVE_KEYWORDS if kw.lower() in text)
-                    neg = sum(1 for kw in NEGATIVE_KEYWORDS if kw.lower() in text)
+                    pos = POSITIVE_MATCHER.count(text)
+                    neg = NEGATIVE_MATCHER.count(text)
 
                     if pos > neg:
                         stock_data[symbol]["bullish"] += 1
@@ -249,31 +332,14 @@ class DailyHotStocksAnalyzer:
                         stock_data[symbol]["bearish"] += 1
 
         # 計算情緒分數並排序
-        results = []
-        for symbol, data in stock_data.items():
-            total = data["bullish"] + data["bearish"]
-            if total > 0:
-                sentiment_score = (data["bullish"] - data["bearish"]) / total
-            else:
-                sentiment_score = 0
-
-            # 判斷情緒
-            if sentiment_score > 0.2:
-                sentiment = "🟢 看多"
-            elif sentiment_score < -0.2:
-                sentiment = "🔴 看空"
-            else:
-                sentiment = "🟡 中性"
-
-            results.append({
-                "symbol": symbol,
-                "mentions": data["mentions"],
-                "bullish": data["bullish"],
-                "bearish": data["bearish"],
-                "sentiment_score": sentiment_score,
-                "sentiment": sentiment,
-                "sample_titles": data["sample_titles"]
-            })
+        results = [{
+            "symbol": symbol,
+            "mentions": data["mentions"],
+            "bullish": data["bullish"],
+            "bearish": data["bearish"],
+            "sample_titles": data["sample_titles"]
+        } for symbol, data in stock_data.items()]
+        _apply_sentiment(results, "bullish", "bearish", STOCK_SENTIMENT_LABELS)
 
         # 按提及次數排序
         results.sort(key=lambda x: x["mentions"], reverse=True)
@@ -306,8 +372,8 @@ class DailyHotStocksAnalyzer:
                     keyword_data[topic]["mentions"] += 1
 
                     # 計算情緒
-                    pos = sum(1 for kw in POSITIVE_KEYWORDS if kw.lower() in text)
-                    neg = sum(1 for kw in NEGATIVE_KEYWORDS if kw.lower() in text)
+                    pos = POSITIVE_MATCHER.count(text)
+                    neg = NEGATIVE_MATCHER.count(text)
 
                     if pos > neg:
                         keyword_data[topic]["bullish"] += 1
@@ -315,29 +381,8 @@ class DailyHotStocksAnalyzer:
                         keyword_data[topic]["bearish"] += 1
 
         # 計算情緒分數
-        results = []
-        for topic, data in keyword_data.items():
-            total = data["bullish"] + data["bearish"]
-            if total > 0:
-                sentiment_score = (data["bullish"] - data["bearish"]) / total
-            else:
-                sentiment_score = 0
-
-            if sentiment_score > 0.2:
-                sentiment = "🟢 正面"
-            elif sentiment_score < -0.2:
-                sentiment = "🔴 負面"
-            else:
-                sentiment = "🟡 中性"
-
-            results.append({
-                "keyword": topic,
-                "mentions": data["mentions"],
-                "bullish": data["bullish"],
-                "bearish": data["bearish"],
-                "sentiment_score": sentiment_score,
-                "sentiment": sentiment
-            })
+        results = list(keyword_data.values())
+        _apply_sentiment(results, "bullish", "bearish", KEYWORD_SENTIMENT_LABELS)
 
         results.sort(key=lambda x: x["mentions"], reverse=True)
         return results
@@ -374,8 +419,8 @@ class DailyHotStocksAnalyzer:
             for n in news_list
         ])
 
-        pos = sum(1 for kw in POSITIVE_KEYWORDS if kw.lower() in all_text)
-        neg = sum(1 for kw in NEGATIVE_KEYWORDS if kw.lower() in all_text)
+        pos = POSITIVE_MATCHER.count(all_text)
+        neg = NEGATIVE_MATCHER.count(all_text)
 
         if pos > neg * 1.3:
             overall = "🟢 整體偏多"
@@ -419,30 +464,14 @@ class DailyHotStocksAnalyzer:
                 all_stocks[symbol]["days_mentioned"] += 1
 
         # 計算情緒並排序
-        results = []
-        for symbol, data in all_stocks.items():
-            total = data["total_bullish"] + data["total_bearish"]
-            if total > 0:
-                score = (data["total_bullish"] - data["total_bearish"]) / total
-            else:
-                score = 0
-
-            if score > 0.2:
-                sentiment = "🟢 看多"
-            elif score < -0.2:
-                sentiment = "🔴 看空"
-            else:
-                sentiment = "🟡 中性"
-
-            results.append({
-                "symbol": symbol,
-                "total_mentions": data["total_mentions"],
-                "days_mentioned": data["days_mentioned"],
-                "bullish": data["total_bullish"],
-                "bearish": data["total_bearish"],
-                "sentiment_score": score,
-                "sentiment": sentiment
-            })
+        results = [{
+            "symbol": symbol,
+            "total_mentions": data["total_mentions"],
+            "days_mentioned": data["days_mentioned"],
+            "bullish": data["total_bullish"],
+            "bearish": data["total_bearish"],
+        } for symbol, data in all_stocks.items()]
+        _apply_sentiment(results, "bullish", "bearish", STOCK_SENTIMENT_LABELS)
 
         results.sort(key=lambda x: x["total_mentions"], reverse=True)
         return results[:30]
@@ -498,15 +527,15 @@ class SentimentBacktester:
             return pd.DataFrame()
 
         # 計算每日情緒
+        df['text'] = (df['title'].fillna('').astype(str) + " " +
+                      df['content'].fillna('').astype(str)).str.lower()
+
         daily_sentiment = []
         for news_date, group in df.groupby('news_date'):
-            text_all = " ".join([
-                (str(row['title']) + " " + str(row['content'] or "")).lower()
-                for _, row in group.iterrows()
-            ])
+            text_all = group['text'].str.cat(sep=" ")
 
-            pos_count = sum(1 for kw in POSITIVE_KEYWORDS if kw in text_all)
-            neg_count = sum(1 for kw in NEGATIVE_KEYWORDS if kw in text_all)
+            pos_count = POSITIVE_MATCHER.count(text_all)
+            neg_count = NEGATIVE_MATCHER.count(text_all)
 
             # 計算情緒分數 (-1 到 1)
             total = pos_count + neg_count
@@ -576,15 +605,15 @@ class SentimentBacktester:
             return pd.DataFrame()
 
         # 計算每日情緒
+        df['text'] = (df['title'].fillna('').astype(str) + " " +
+                      df['content'].fillna('').astype(str)).str.lower()
+
         daily_sentiment = []
         for news_date, group in df.groupby('news_date'):
-            text_all = " ".join([
-                (str(row['title']) + " " + str(row['content'] or "")).lower()
-                for _, row in group.iterrows()
-            ])
+            text_all = group['text'].str.cat(sep=" ")
 
-            pos_count = sum(1 for kw in POSITIVE_KEYWORDS if kw in text_all)
-            neg_count = sum(1 for kw in NEGATIVE_KEYWORDS if kw in text_all)
+            pos_count = POSITIVE_MATCHER.count(text_all)
+            neg_count = NEGATIVE_MATCHER.count(text_all)
 
             total = pos_count + neg_count
             if total > 0:
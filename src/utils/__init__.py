@@ -1,3 +1,4 @@
 from .helpers import parse_date, clean_text, generate_hash
+from .keyword_matcher import KeywordMatcher
 
-__all__ = ["parse_date", "clean_text", "generate_hash"]
+__all__ = ["parse_date", "clean_text", "generate_hash", "KeywordMatcher"]
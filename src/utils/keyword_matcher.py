@@ -0,0 +1,60 @@
+"""
+多關鍵字比對模組
+
+以 Aho-Corasick 自動機一次掃描文字即可找出所有出現的關鍵字，
+取代逐一 `kw in text` 的子字串搜尋。未安裝 pyahocorasick 時
+退回原本的逐一比對，結果完全相同。
+"""
+
+from typing import Any, Dict, Iterable, Mapping, Union
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+
+class KeywordMatcher:
+    """多關鍵字比對器（建立一次，重複使用）"""
+
+    def __init__(self, keywords: Union[Iterable[str], Mapping[str, Any]]):
+        """
+        Args:
+            keywords: 關鍵字列表，或 {關鍵字: 附帶資料} 對照表
+                      (比對區分大小寫，呼叫端需自行統一為小寫)
+        """
+        if isinstance(keywords, Mapping):
+            self._keywords = dict(keywords)
+        else:
+            self._keywords = dict.fromkeys(keywords)
+
+        self._automaton = None
+        if ahocorasick is not None and self._keywords:
+            automaton = ahocorasick.Automaton()
+            for kw in self._keywords:
+                automaton.add_word(kw, kw)
+            automaton.make_automaton()
+            self._automaton = automaton
+
+    def find(self, text: str) -> Dict[str, Any]:
+        """
+        找出文字中出現的關鍵字
+
+        Returns:
+            {關鍵字: 附帶資料}，依關鍵字建立時的順序排列
+        """
+        if not text:
+            return {}
+
+        if self._automaton is None:
+            return {kw: payload for kw, payload in self._keywords.items() if kw in text}
+
+        hits = {kw for _, kw in self._automaton.iter(text)}
+        return {kw: payload for kw, payload in self._keywords.items() if kw in hits}
+
+    def count(self, text: str) -> int:
+        """計算文字中出現的不重複關鍵字數"""
+        return len(self.find(text))
+
+    def __len__(self) -> int:
+        return len(self._keywords)
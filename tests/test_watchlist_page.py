@@ -0,0 +1,32 @@
+"""股票清單頁面渲染測試（複製示範資料庫到暫存目錄執行，不改動專案內的資料庫）"""
+
+import shutil
+from pathlib import Path
+
+import pytest
+
+AppTest = pytest.importorskip("streamlit.testing.v1").AppTest
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture
+def app_path(tmp_path, monkeypatch):
+    shutil.copy(ROOT / "app.py", tmp_path / "app.py")
+    # 資料層以工作目錄下的 news.db / finance.db 為準
+    shutil.copy(ROOT / "demo_news.db", tmp_path / "news.db")
+    shutil.copy(ROOT / "demo_finance.db", tmp_path / "finance.db")
+    for name in ("src", "config"):
+        shutil.copytree(ROOT / name, tmp_path / name, ignore=shutil.ignore_patterns("__pycache__"))
+    # macro.db 等執行期資料庫建立在工作目錄
+    monkeypatch.chdir(tmp_path)
+    return tmp_path / "app.py"
+
+
+def test_watchlist_page_renders_distribution(app_path):
+    at = AppTest.from_file(str(app_path), default_timeout=300)
+    at.run()
+    next(r for r in at.sidebar.radio if r.label == "選擇頁面").set_value("📋 股票清單").run()
+
+    assert not at.exception
+    assert "📊 產業分佈" in [s.value for s in at.subheader]